@@ -3,3 +3,5 @@
 VERSION = (1, 4, 0)
 
 __version__ = '.'.join(map(str, VERSION))
+
+default_app_config = 'linguo.apps.LinguoConfig'
@@ -0,0 +1,274 @@
+import operator
+from functools import reduce
+
+from django import forms
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.contrib.admin.utils import lookup_needs_distinct
+from django.contrib.admin.views.main import ChangeList
+from django.db.models import F, Q
+from django.template.response import TemplateResponse
+from django.utils import six
+from django.utils.translation import ugettext_lazy as _, ungettext
+
+from linguo.exceptions import MultilingualFieldError
+from linguo.forms import MultilingualModelForm, get_form_fields
+from linguo.managers import validate_language, get_column_fields, get_translation_predicates
+from linguo.storage import COLUMNS_STORAGE
+from linguo.utils import get_language_suffix, get_normalized_language, get_real_field_name
+
+
+# The query string parameter that selects the language tab of the change form
+LANGUAGE_VAR = '_language'
+
+
+class MultilingualChangeList(ChangeList):
+
+    def get_queryset(self, request):
+        queryset = super(MultilingualChangeList, self).get_queryset(request)
+        if not hasattr(queryset, 'defer_translations'):
+            return queryset
+        # Only load the translatable fields in the active language (and the ones that are displayed)
+        keep = [name for name in self.list_display if isinstance(name, six.string_types)]
+        return queryset.defer_translations(keep=keep)
+
+
+class TranslationActionForm(forms.Form):
+    """The languages of a translation action of MultilingualModelAdmin"""
+    source = forms.ChoiceField(label=_('From'))
+    language = forms.ChoiceField(label=_('Language'))
+
+    def __init__(self, languages, with_source, *args, **kwargs):
+        super(TranslationActionForm, self).__init__(*args, **kwargs)
+        self.fields['language'].choices = languages
+        if with_source:
+            self.fields['source'].choices = settings.LANGUAGES
+        else:
+            del self.fields['source']
+
+    def clean(self):
+        cleaned_data = super(TranslationActionForm, self).clean()
+        if 'source' in self.fields and cleaned_data.get('source') == cleaned_data.get('language'):
+            raise forms.ValidationError(_('The translations cannot be copied to the same language.'))
+        return cleaned_data
+
+
+class MultilingualModelAdmin(admin.ModelAdmin):
+    """
+    A ModelAdmin for multilingual models (that use a MultilingualManager).
+
+    The changelist only loads the translatable fields in the active language, and is searched,
+    filtered and ordered in it (or searched in all of `search_languages`). The change form has
+    a tab per language, which only loads and edits the translatable fields in that language.
+    """
+    form = MultilingualModelForm
+    change_form_template = 'linguo/admin/change_form.html'
+    translation_action_template = 'linguo/admin/translation_action.html'
+    actions = ['copy_translations', 'clear_translations', 'mark_translations_stale']
+    # The languages that the translatable search_fields are searched in (the active language by default)
+    search_languages = None
+
+    def get_changelist(self, request, **kwargs):
+        return MultilingualChangeList
+
+    def get_search_fields(self, request):
+        search_fields = super(MultilingualModelAdmin, self).get_search_fields(request)
+        if not self.search_languages:
+            return search_fields
+
+        languages = [validate_language(language) for language in self.search_languages]
+        translatable_fields = self.model._meta.translatable_fields
+        new_search_fields = []
+        for search_field in search_fields:
+            prefix = search_field[0] if search_field[:1] in ('^', '=', '@') else ''
+            field = search_field[len(prefix):]
+            if field not in translatable_fields or self.model._meta.translation_storage[field] != COLUMNS_STORAGE:
+                new_search_fields.append(search_field)
+                continue
+            # The name with the suffix of the language, so that the primary language is not
+            # rewritten to the active language
+            new_search_fields.extend([
+                '%s%s_%s' % (prefix, field, get_language_suffix(language)) for language in languages
+                if language in self.model._meta.translation_languages[field]
+            ])
+        return new_search_fields
+
+    def get_search_results(self, request, queryset, search_term):
+        if not self.search_languages:
+            return super(MultilingualModelAdmin, self).get_search_results(request, queryset, search_term)
+
+        # The fields of each language (eg. "name_en") are not model fields, so the lookups are built here
+        lookups = []
+        use_distinct = False
+        language_fields = self.get_search_language_fields()
+        for search_field in self.get_search_fields(request):
+            prefix = search_field[0] if search_field[:1] in ('^', '=', '@') else ''
+            field = search_field[len(prefix):]
+            lookup = {'^': 'istartswith', '=': 'iexact', '@': 'search', '': 'icontains'}[prefix]
+            lookups.append('%s__%s' % (field, lookup))
+            if field not in language_fields:
+                use_distinct = use_distinct or lookup_needs_distinct(self.opts, field)
+        if not lookups:
+            return queryset, use_distinct  # Like Django, a search without search fields does not filter
+        for bit in search_term.split():
+            queryset = queryset.filter(reduce(operator.or_, [Q(**{str(lookup): bit}) for lookup in lookups]))
+        return queryset, use_distinct
+
+    def get_search_language_fields(self):
+        # The names of the fields of each search language (see get_search_fields)
+        return set([
+            '%s_%s' % (field, get_language_suffix(validate_language(language)))
+            for field in self.model._meta.translatable_fields for language in self.search_languages
+        ])
+
+    def get_tab_language(self, request):
+        """Returns the language of the tab of the change form (or None for all the languages)"""
+        language = request.GET.get(LANGUAGE_VAR)
+        if not language:
+            return None
+        try:
+            return validate_language(language)
+        except MultilingualFieldError:
+            return None
+
+    def get_queryset(self, request):
+        queryset = super(MultilingualModelAdmin, self).get_queryset(request)
+        language = self.get_tab_language(request)
+        if language is not None and hasattr(queryset, 'defer_translations'):
+            queryset = queryset.defer_translations(language)
+        return queryset
+
+    def get_fields(self, request, obj=None):
+        language = self.get_tab_language(request)
+        if language is None:
+            return super(MultilingualModelAdmin, self).get_fields(request, obj)
+
+        fields = None
+        if self.fields:
+            # The fields of the other languages are left out, the translatable fields are in the tab's language
+            language_fields = set()
+            for field in self.model._meta.translatable_fields:
+                for lang in self.model._meta.translation_languages[field]:
+                    language_fields.add(get_real_field_name(field, lang))
+            language_fields.difference_update(self.model._meta.translatable_fields)
+            fields = [field for field in self.fields if field not in language_fields]
+        fields = get_form_fields(self.model, [language], fields)
+        return fields + [field for field in self.get_readonly_fields(request, obj) if field not in fields]
+
+    def get_fieldsets(self, request, obj=None):
+        if self.get_tab_language(request) is None:
+            return super(MultilingualModelAdmin, self).get_fieldsets(request, obj)
+        return [(None, {'fields': self.get_fields(request, obj)})]
+
+    def render_change_form(self, request, context, *args, **kwargs):
+        context['language_tabs'] = self.get_language_tabs(request)
+        return super(MultilingualModelAdmin, self).render_change_form(request, context, *args, **kwargs)
+
+    def get_language_tabs(self, request):
+        """Returns the (name, url, selected) of the language tabs of the change form"""
+        current = self.get_tab_language(request)
+        params = request.GET.copy()
+        params.pop(LANGUAGE_VAR, None)
+        tabs = [(_('All languages'), '?%s' % params.urlencode(), current is None)]
+        for code, name in settings.LANGUAGES:
+            params[LANGUAGE_VAR] = code
+            tabs.append((name, '?%s' % params.urlencode(), get_normalized_language(code) == current))
+        return tabs
+
+    def get_actions(self, request):
+        actions = super(MultilingualModelAdmin, self).get_actions(request)
+        if not getattr(self.model._meta, 'track_translations', False):
+            actions.pop('mark_translations_stale', None)
+        if len(settings.LANGUAGES) < 2:
+            # There is no language to copy the translations to, or to clear or mark stale
+            # (the translations in the primary language cannot be)
+            for action in ('copy_translations', 'clear_translations', 'mark_translations_stale'):
+                actions.pop(action, None)
+        return actions
+
+    def copy_translations(self, request, queryset):
+        return self.translation_action(request, queryset, 'copy_translations')
+    copy_translations.short_description = _('Copy the translations of the selected %(verbose_name_plural)s')
+
+    def clear_translations(self, request, queryset):
+        return self.translation_action(request, queryset, 'clear_translations')
+    clear_translations.short_description = _('Clear the translations of the selected %(verbose_name_plural)s')
+
+    def mark_translations_stale(self, request, queryset):
+        return self.translation_action(request, queryset, 'mark_translations_stale')
+    mark_translations_stale.short_description = _('Mark the translations of the selected %(verbose_name_plural)s as stale')
+
+    def translation_action(self, request, queryset, action):
+        """
+        Displays the confirmation page of a translation action (with the number of objects that it
+        changes in the chosen language), and performs it once it is confirmed (see the queryset methods).
+        """
+        primary_lang = get_normalized_language(settings.LANGUAGES[0][0])
+        languages = [
+            (code, name) for code, name in settings.LANGUAGES
+            if action == 'copy_translations' or get_normalized_language(code) != primary_lang
+        ]
+        with_source = action == 'copy_translations'
+        if 'language' in request.POST:
+            form = TranslationActionForm(languages, with_source, request.POST)
+            values = form.cleaned_data if form.is_valid() else None
+        else:
+            initial = {'source': settings.LANGUAGES[0][0], 'language': languages[-1][0] if languages else None}
+            form = TranslationActionForm(languages, with_source, initial=initial)
+            values = initial if languages else None
+
+        count = None
+        if values is not None:
+            language, source = values['language'], values.get('source')
+            if request.POST.get('post'):
+                if action == 'copy_translations':
+                    count = queryset.copy_translations(source, language)
+                elif action == 'clear_translations':
+                    count = queryset.clear_translations(language)
+                else:
+                    count = queryset.mark_stale(language)
+                self.message_user(request, ungettext(
+                    'The translations of %(count)d %(verbose_name)s were updated.',
+                    'The translations of %(count)d %(verbose_name_plural)s were updated.', count
+                ) % {
+                    'count': count, 'verbose_name': self.opts.verbose_name,
+                    'verbose_name_plural': self.opts.verbose_name_plural,
+                }, messages.SUCCESS)
+                return None
+            count = self.get_translation_action_count(queryset, action, language, source)
+
+        context = dict(
+            self.admin_site.each_context(),
+            title=getattr(self, action).short_description % {'verbose_name_plural': self.opts.verbose_name_plural},
+            opts=self.opts,
+            form=form,
+            count=count,
+            action=action,
+            selected=request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            select_across=request.POST.get('select_across'),
+            action_checkbox_name=helpers.ACTION_CHECKBOX_NAME,
+        )
+        return TemplateResponse(request, self.translation_action_template, context, current_app=self.admin_site.name)
+
+    def get_translation_action_count(self, queryset, action, language, source=None):
+        """Returns the number of objects of `queryset` that the action changes (with a single COUNT query)"""
+        from linguo.models import TRANSLATION_STALE_FIELD, TRANSLATION_TIMESTAMP_FIELD  # to avoid circular import
+
+        language = validate_language(language)
+        condition = None
+        if action == 'copy_translations':
+            source = validate_language(source)
+            for field in get_column_fields(self.model, [source, language]):
+                target_field = '%s_%s' % (field, get_language_suffix(language))
+                source_field = '%s_%s' % (field, get_language_suffix(source))
+                field_condition = ~Q(**{target_field: F(source_field)})
+                condition = field_condition if condition is None else (condition | field_condition)
+        elif action == 'clear_translations':
+            for field, present, missing in get_translation_predicates(self.model, language):
+                condition = present if condition is None else (condition | present)
+        else:
+            timestamp_field = get_real_field_name(TRANSLATION_TIMESTAMP_FIELD, language)
+            stale_field = get_real_field_name(TRANSLATION_STALE_FIELD, language)
+            condition = Q(**{stale_field: False, '%s__isnull' % timestamp_field: False})
+        return queryset.filter(condition).count() if condition is not None else 0
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class LinguoConfig(AppConfig):
+    name = 'linguo'
+    verbose_name = 'Linguo'
+
+    def ready(self):
+        import linguo.checks  # NOQA (registers the system checks)
@@ -0,0 +1,120 @@
+from django.apps import apps
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+from django.db import models
+
+from linguo.managers import MultilingualManager
+from linguo.storage import COLUMNS_STORAGE
+from linguo.utils import get_real_field_name
+
+
+# The number of languages that a TextField stored in columns can be translated into without a warning
+MAX_TEXT_LANGUAGES = 4
+# The number of unique_together constraints that a model can have after they are rewritten for each language
+MAX_UNIQUE_CONSTRAINTS = 10
+
+
+def get_translatable_models(app_configs=None):
+    from linguo.models import MultilingualModel  # to avoid circular import
+    if app_configs is None:
+        modelclasses = apps.get_models()
+    else:
+        modelclasses = [modelclass for app_config in app_configs for modelclass in app_config.get_models()]
+    return [
+        modelclass for modelclass in modelclasses
+        if issubclass(modelclass, MultilingualModel) and not modelclass._meta.proxy
+    ]
+
+
+@register(Tags.models)
+def check_multilingual_models(app_configs=None, **kwargs):
+    """Warns about the translatable models whose queries (or writes) are slow"""
+    errors = []
+    for modelclass in get_translatable_models(app_configs):
+        errors.extend(check_ordering_indexes(modelclass))
+        errors.extend(check_text_languages(modelclass))
+        errors.extend(check_unique_together(modelclass))
+        errors.extend(check_managers(modelclass))
+    return errors
+
+
+def is_indexed(modelclass, field_name):
+    field = modelclass._meta.get_field(field_name)
+    if field.db_index or field.unique:
+        return True
+    return [fields for fields in modelclass._meta.index_together if fields[0] == field_name] != []
+
+
+def check_ordering_indexes(modelclass):
+    # The translatable fields in the ordering are rewritten to the field of the active language
+    # (see MultilingualQuerySet.__init__), so each language needs an index
+    opts = modelclass._meta
+    errors = []
+    for name in opts.ordering:
+        field = name.lstrip('-')
+        if field not in opts.translatable_fields or opts.translation_storage[field] != COLUMNS_STORAGE:
+            continue
+        unindexed = [
+            get_real_field_name(field, lang) for lang in opts.translation_languages[field]
+            if not is_indexed(modelclass, get_real_field_name(field, lang))
+        ]
+        if unindexed:
+            errors.append(Warning(
+                'The model is ordered by the translatable field "%s", but %s %s not indexed.' % (
+                    field, ', '.join(['"%s"' % name for name in unindexed]), 'is' if len(unindexed) == 1 else 'are'
+                ),
+                hint='Add db_index=True to "%s" (it is copied to the field of each language).' % field,
+                obj=modelclass,
+                id='linguo.W001',
+            ))
+    return errors
+
+
+def check_text_languages(modelclass):
+    opts = modelclass._meta
+    max_languages = getattr(settings, 'LINGUO_MAX_TEXT_LANGUAGES', MAX_TEXT_LANGUAGES)
+    errors = []
+    for field in opts.translatable_fields:
+        if opts.translation_storage[field] != COLUMNS_STORAGE or \
+                not isinstance(opts.get_field(field), models.TextField):
+            continue
+        if len(opts.translation_languages[field]) > max_languages:
+            errors.append(Warning(
+                'The TextField "%s" is translated into %d languages, which are all loaded with the objects.' % (
+                    field, len(opts.translation_languages[field])
+                ),
+                hint='Store its translations in a table (translate_storage) or defer them (defer_translations).',
+                obj=modelclass,
+                id='linguo.W002',
+            ))
+    return errors
+
+
+def check_unique_together(modelclass):
+    # unique_together is rewritten with a constraint per language for each constraint on a translatable field
+    opts = modelclass._meta
+    max_constraints = getattr(settings, 'LINGUO_MAX_UNIQUE_CONSTRAINTS', MAX_UNIQUE_CONSTRAINTS)
+    if len(opts.unique_together) <= max_constraints:
+        return []
+    return [Warning(
+        'The model has %d unique_together constraints once they are rewritten for each language.' % (
+            len(opts.unique_together)
+        ),
+        hint='Each of them is an index that is updated on every write, reduce the translatable fields in them.',
+        obj=modelclass,
+        id='linguo.W003',
+    )]
+
+
+def check_managers(modelclass):
+    # The queries of the other managers are not rewritten to the active language
+    errors = []
+    for _, name, manager in sorted(modelclass._meta.concrete_managers + modelclass._meta.abstract_managers):
+        if not isinstance(manager, MultilingualManager):
+            errors.append(Warning(
+                'The manager "%s" is not a MultilingualManager.' % name,
+                hint='Its queries on the translatable fields are not done in the active language.',
+                obj=modelclass,
+                id='linguo.W004',
+            ))
+    return errors
@@ -1,10 +1,22 @@
 from django import forms
 from django.conf import settings
+from django.core.exceptions import ValidationError
 
-from linguo.utils import get_normalized_language
+from linguo.managers import get_primary_queryset, validate_language
+from linguo.models import validate_unique_in_bulk
+from linguo.storage import COLUMNS_STORAGE, RowValues
+from linguo.utils import get_normalized_language, get_real_field_name, clear_fallback_values
+
+
+# Cache of the form classes generated by multilingual_modelform_factory
+_form_classes = {}
 
 
 class MultilingualModelForm(forms.ModelForm):
+    # The languages of the translatable fields of the form, when it only edits some of them
+    # (see multilingual_modelform_factory). Saving an existing object then only updates its fields.
+    _languages = None
+
     def __init__(self, data=None, files=None, instance=None, **kwargs):
         # We force the language to the primary, temporarily disabling the
         # routing based on current active language.
@@ -30,3 +42,216 @@ class MultilingualModelForm(forms.ModelForm):
         self.instance._force_language = get_normalized_language(settings.LANGUAGES[0][0])
         super(MultilingualModelForm, self)._post_clean()
         self.instance._force_language = old_force_language
+        # The fields of each language were assigned directly
+        clear_fallback_values(self.instance)
+
+    def save(self, commit=True):
+        if not commit or self._languages is None or self.instance._state.adding:
+            return super(MultilingualModelForm, self).save(commit=commit)
+
+        # Only update the columns of the form, the other languages are left untouched
+        instance = super(MultilingualModelForm, self).save(commit=False)
+        update_fields = [
+            field.name for field in instance._meta.concrete_fields if field.name in self.fields
+        ]
+        instance.save(update_fields=update_fields)
+        self.save_m2m()
+        return instance
+
+
+def multilingual_modelform_factory(model, languages, fields=None, form=MultilingualModelForm):
+    """
+    Returns a MultilingualModelForm for `model` that only has the translatable fields
+    in `languages` (eg. ``name_fr`` for French), along with the other fields in `fields`
+    (all the editable fields by default). Only the fields stored in columns are included.
+
+    The form classes are cached per model, languages and fields.
+    """
+    languages = tuple(validate_language(language) for language in languages)
+    key = (model, languages, tuple(fields) if fields is not None else None, form)
+    if key not in _form_classes:
+        _form_classes[key] = type(form)(
+            str('%sForm' % model.__name__), (form,), {
+                '_languages': languages,
+                'Meta': type(str('Meta'), (object,), {
+                    'model': model, 'fields': get_form_fields(model, languages, fields),
+                }),
+            }
+        )
+    return _form_classes[key]
+
+
+def get_form_fields(model, languages, fields=None):
+    """Returns the names of the form fields of `fields` in `languages` (see multilingual_modelform_factory)"""
+    translatable_fields = getattr(model._meta, 'translatable_fields', [])
+    if fields is None:
+        language_fields = set()
+        for field in translatable_fields:
+            language_fields.update(
+                get_real_field_name(field, lang) for lang in model._meta.translation_languages[field]
+            )
+        language_fields.difference_update(translatable_fields)
+        fields = [
+            field.name for field in model._meta.fields + model._meta.many_to_many
+            if field.editable and not field.auto_created and field.name not in language_fields
+        ]
+
+    primary_lang = get_normalized_language(settings.LANGUAGES[0][0])
+    form_fields = []
+    for field in fields:
+        if field not in translatable_fields:
+            form_fields.append(field)
+            continue
+        for language in languages:
+            if language not in model._meta.translation_languages[field]:
+                continue
+            if language != primary_lang and model._meta.translation_storage[field] != COLUMNS_STORAGE:
+                continue
+            form_fields.append(get_real_field_name(field, language))
+    return form_fields
+
+
+class TranslationForm(MultilingualModelForm):
+    """
+    A form of a BaseTranslationFormSet. Its unique checks are done by the formset,
+    for all of its forms at once.
+    """
+
+    def validate_unique(self):
+        exclude = self._get_validation_exclusions()
+        _, date_checks = self.instance._get_unique_checks(exclude=exclude)
+        errors = self.instance._perform_date_checks(date_checks)
+        if errors:
+            self._update_errors(ValidationError(errors))
+
+
+class LoadedObjectField(forms.ModelChoiceField):
+    """
+    The primary key field of the forms of a BaseTranslationFormSet, which looks up the
+    objects in a dict of the loaded objects (returned by `get_objects`) instead of the database.
+    """
+
+    def __init__(self, get_objects, *args, **kwargs):
+        super(LoadedObjectField, self).__init__(*args, **kwargs)
+        self.get_objects = get_objects
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            return self.get_objects()[self.queryset.model._meta.pk.to_python(value)]
+        except (KeyError, ValidationError):
+            raise ValidationError(self.error_messages['invalid_choice'], code='invalid_choice')
+
+
+class BaseTranslationFormSet(forms.BaseModelFormSet):
+    """
+    A formset that edits the translations of many objects in one language
+    (see translation_formset_factory). Only the fields of the forms are loaded,
+    the unique checks are done with one query per constraint for all the forms,
+    and the changes are saved with one UPDATE per batch of objects.
+
+    The objects are updated with QuerySet.update(), so save() and the
+    pre_save / post_save signals are not called for them.
+    """
+    batch_size = 100
+
+    def get_queryset(self):
+        if not hasattr(self, '_queryset'):
+            fields = [field.name for field in self.model._meta.concrete_fields if field.name in self.form.base_fields]
+            self._queryset = super(BaseTranslationFormSet, self).get_queryset().only(*fields)
+        return self._queryset
+
+    def add_fields(self, form, index):
+        super(BaseTranslationFormSet, self).add_fields(form, index)
+        # Look up the objects of the forms in the queryset of the formset (which is loaded once)
+        # rather than with a query per form
+        field = form.fields.get(self.model._meta.pk.name)
+        if isinstance(field, forms.ModelChoiceField):
+            form.fields[self.model._meta.pk.name] = LoadedObjectField(
+                self._get_loaded_objects, field.queryset,
+                initial=field.initial, required=field.required, widget=field.widget,
+            )
+
+    def _get_loaded_objects(self):
+        if not hasattr(self, '_object_dict'):
+            self._object_dict = dict((obj.pk, obj) for obj in self.get_queryset())
+        return self._object_dict
+
+    def validate_unique(self):
+        super(BaseTranslationFormSet, self).validate_unique()
+
+        # The forms are checked against the database together (per set of excluded fields)
+        forms_to_delete = self.deleted_forms
+        forms_by_exclusions = {}
+        for form in self.forms:
+            if form.is_valid() and form not in forms_to_delete:
+                exclude = tuple(form._get_validation_exclusions())
+                forms_by_exclusions.setdefault(exclude, []).append(form)
+
+        for exclude, form_list in forms_by_exclusions.items():
+            form_by_instance = dict((id(form.instance), form) for form in form_list)
+            instances = [form.instance for form in form_list]
+            for instance, errors in validate_unique_in_bulk(instances, list(exclude), self.batch_size):
+                form_by_instance[id(instance)]._update_errors(ValidationError(errors))
+
+    def save(self, commit=True):
+        if not commit:
+            return super(BaseTranslationFormSet, self).save(commit=False)
+
+        primary_lang = get_normalized_language(settings.LANGUAGES[0][0])
+        self.changed_objects = []
+        self.deleted_objects = []
+        updates = {}
+        for form in self.initial_forms:
+            obj = form.instance
+            if form in self.deleted_forms:
+                self.deleted_objects.append(obj)
+                obj.delete()
+                continue
+            if not form.has_changed():
+                continue
+            obj = form.save(commit=False)
+            self.changed_objects.append((obj, form.changed_data))
+            fields = tuple(sorted(
+                field.name for field in obj._meta.concrete_fields if field.name in form.changed_data
+            ))
+            updates.setdefault(fields, []).append((form, obj))
+
+        for fields, rows in updates.items():
+            for start in range(0, len(rows), self.batch_size):
+                batch = rows[start:start + self.batch_size]
+                values = dict((name, {}) for name in fields)
+                for _, obj in batch:
+                    obj._force_language = primary_lang
+                    for name in fields:
+                        values[name][obj.pk] = getattr(obj, obj._meta.get_field(name).attname)
+                    obj._force_language = None
+                if fields:
+                    queryset = get_primary_queryset(self.model).filter(pk__in=[obj.pk for _, obj in batch])
+                    queryset.update(**dict(
+                        (name, RowValues(self.model._meta.get_field(name), values[name])) for name in fields
+                    ))
+                for form, obj in batch:
+                    form.save_m2m()
+                    if getattr(self.model._meta, 'track_translations', False):
+                        obj._translation_snapshot = obj._get_translation_values()
+
+        return [obj for obj, _ in self.changed_objects] + self.save_new_objects(commit)
+    save.alters_data = True
+
+
+def translation_formset_factory(model, language, fields=None, formset=BaseTranslationFormSet, **kwargs):
+    """
+    Returns a model formset that edits the translatable `fields` of `model` (all of them
+    by default) in `language`, eg. ``name_fr`` and ``description_fr`` for French.
+    The other arguments are passed to ``modelformset_factory``.
+    """
+    if fields is None:
+        fields = [
+            field for field in model._meta.translatable_fields
+            if model._meta.translation_storage[field] == COLUMNS_STORAGE
+        ]
+    form = multilingual_modelform_factory(model, [language], fields=fields, form=TranslationForm)
+    kwargs.setdefault('extra', 0)
+    return forms.modelformset_factory(model, form=form, formset=formset, fields=form._meta.fields, **kwargs)
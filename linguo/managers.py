@@ -1,27 +1,69 @@
-from django.db import models
+import copy
+import sys
+
+from django.apps import apps
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Q, Prefetch
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.expressions import ExpressionNode
+from django.db.models.query import ValuesQuerySet
 from django.db.models.fields.related import RelatedField
+from django.db.models.signals import class_prepared
 from django.conf import settings
+from django.dispatch import receiver
+from django.utils import six, timezone
 from django.utils.translation import get_language
 
-from linguo.utils import get_real_field_name
+from linguo import stats
+from linguo.exceptions import MultilingualFieldError
+from linguo.storage import COLUMNS_STORAGE, TABLE_STORAGE, JSON_STORAGE, get_table_lookup, \
+    get_table_present_q, add_translation_ordering, update_translations, load_translations, \
+    get_translations_field_name, TranslationsPatch
+from linguo.utils import get_real_field_name, get_normalized_language, get_field_language, get_language_suffix, \
+    get_current_language, get_language_chains
+
+
+# The relations of each installed model that lead to a translatable model (see get_fields_to_translatable_models)
+_translatable_relations = {}
+
 
+def rewrite_lookup_key(model, lookup_key, language=None):
+    """
+    Rewrites the translatable fields of the lookup to the fields of `language`
+    (the active language by default).
+    """
+    if not stats.enabled:
+        return _rewrite_lookup_key(model, lookup_key, language)
+    with stats.timer('rewrite_lookup_key'):
+        return _rewrite_lookup_key(model, lookup_key, language)
 
-def rewrite_lookup_key(model, lookup_key):
+
+def _rewrite_lookup_key(model, lookup_key, language=None):
     from linguo.models import MultilingualModel  # to avoid circular import
     if issubclass(model, MultilingualModel):
         pieces = lookup_key.split('__')
+        primary_suffix = get_language_suffix(get_normalized_language(settings.LANGUAGES[0][0]))
         # If we are doing a lookup on a translatable field, we want to rewrite it to the actual field name
         # For example, we want to rewrite "name__startswith" to "name_fr__startswith"
         if pieces[0] in model._meta.translatable_fields:
-            lookup_key = get_real_field_name(pieces[0], get_language().split('-')[0])
+            field_language = get_field_language(model, pieces[0], language or get_language())
+            if stats.enabled:
+                stats.incr('lookup.%s' % field_language)
+            lookup_key = get_real_field_name(pieces[0], field_language)
 
             remaining_lookup = '__'.join(pieces[1:])
-            if remaining_lookup:
+            if model._meta.translation_storage[pieces[0]] == JSON_STORAGE and lookup_key != pieces[0]:
+                # The translation is a key of the JSON field (eg. "name_translations__fr__startswith").
+                # The lookup type is always explicit, so that a language code is never mistaken for one.
+                lookup_key = '%s__%s__%s' % (
+                    get_translations_field_name(pieces[0]), field_language, remaining_lookup or 'exact'
+                )
+            elif remaining_lookup:
                 lookup_key = '%s__%s' % (lookup_key, remaining_lookup)
-        elif pieces[0] in map(lambda field: '%s_%s' % (field, settings.LANGUAGES[0][0]), model._meta.translatable_fields):
+        elif pieces[0] in map(lambda field: '%s_%s' % (field, primary_suffix), model._meta.translatable_fields):
             # If the lookup field explicitly refers to the primary langauge (eg. "name_en"),
             # we want to rewrite that to point to the actual field name.
-            lookup_key = pieces[0][:-3]  # Strip out the language suffix
+            lookup_key = pieces[0][:-len(primary_suffix) - 1]  # Strip out the language suffix
             remaining_lookup = '__'.join(pieces[1:])
             if remaining_lookup:
                 lookup_key = '%s__%s' % (lookup_key, remaining_lookup)
@@ -29,65 +71,912 @@ def rewrite_lookup_key(model, lookup_key):
     pieces = lookup_key.split('__')
     if len(pieces) > 1:
         # Check if we are doing a lookup to a related trans model
-        fields_to_trans_models = get_fields_to_translatable_models(model)
-        for field_to_trans, transmodel in fields_to_trans_models:
-            if pieces[0] == field_to_trans:
-                sub_lookup = '__'.join(pieces[1:])
-                if sub_lookup:
-                    sub_lookup = rewrite_lookup_key(transmodel, sub_lookup)
-                    lookup_key = '%s__%s' % (pieces[0], sub_lookup)
-                break
+        transmodel = get_fields_to_translatable_models(model).get(pieces[0])
+        if transmodel is not None:
+            sub_lookup = '__'.join(pieces[1:])
+            storage_lookup = split_storage_lookup(transmodel, sub_lookup, language)
+            if storage_lookup and storage_lookup[3] == TABLE_STORAGE:
+                # There is no column to rewrite it to, only filters can follow it (see rewrite_lookup)
+                raise MultilingualFieldError(
+                    '`%s` can only be used in a filter because the translations of `%s` are stored in a table'
+                    % (lookup_key, storage_lookup[0])
+                )
+            if sub_lookup:
+                sub_lookup = _rewrite_lookup_key(transmodel, sub_lookup, language)
+                lookup_key = '%s__%s' % (pieces[0], sub_lookup)
 
     return lookup_key
 
 
+def get_loaded_translations(queryset):
+    """
+    Returns the (translatable field, language) that the objects of `queryset` are loaded with
+    (the ones that are not deferred), and all the (translatable field, language) of the model.
+    Only the translations in columns and in JSON fields are loaded with the objects.
+    """
+    model = queryset.model
+    primary_lang = get_normalized_language(settings.LANGUAGES[0][0])
+    names, defer = queryset.query.deferred_loading
+    loaded, translations = set(), set()
+    for field in model._meta.translatable_fields:
+        storage = model._meta.translation_storage[field]
+        if storage == TABLE_STORAGE:
+            continue
+        for lang in model._meta.translation_languages[field]:
+            translations.add((field, lang))
+            if storage == JSON_STORAGE and lang != primary_lang:
+                field_name = get_translations_field_name(field)
+            else:
+                field_name = get_real_field_name(field, lang)
+            if (field_name in names) != defer:
+                loaded.add((field, lang))
+    return loaded, translations
+
+
+def split_storage_lookup(model, lookup_key, language=None):
+    """
+    If `lookup_key` is a lookup on a translatable field whose translation in `language`
+    (the active language by default) is not stored in a column of its own ("table" or "json" storage), returns a tuple
+    of (field, language, remaining lookup, storage). Otherwise returns None.
+    """
+    storage = getattr(model._meta, 'translation_storage', {})
+    pieces = lookup_key.split('__')
+    if storage.get(pieces[0], COLUMNS_STORAGE) == COLUMNS_STORAGE:
+        return None
+
+    language = get_field_language(model, pieces[0], language or get_language())
+    if language == get_normalized_language(settings.LANGUAGES[0][0]):
+        return None  # The primary language is stored on the model's table
+    return (pieces[0], language, '__'.join(pieces[1:]), storage[pieces[0]])
+
+
+def rewrite_expression_key(model, lookup_key, language=None):
+    """
+    Rewrites a field reference used in an expression (aggregate, values(), distinct(), etc.)
+    to the column of the active language. Unlike lookups, they can't be done on a translation
+    that is not stored in a column of its own.
+    """
+    storage_lookup = split_storage_lookup(model, lookup_key, language)
+    if storage_lookup:
+        raise MultilingualFieldError(
+            '`%s` cannot be used in this expression because its translations'
+            ' are not stored in columns' % lookup_key
+        )
+    return rewrite_lookup_key(model, lookup_key, language)
+
+
+def rewrite_expression(model, value, language=None):
+    """
+    Returns `value` with the translatable fields referenced by its F() expressions
+    (eg. `F('name')` or `F('name') + 'x'`) rewritten to the columns of the active language.
+    """
+    if isinstance(value, F):
+        name = rewrite_expression_key(model, value.name, language)
+        if name == value.name:
+            return value
+        expression = copy.deepcopy(value)
+        expression.name = name
+        return expression
+    if isinstance(value, ExpressionNode) and value.children:
+        children = [rewrite_expression(model, child, language) for child in value.children]
+        if children == value.children:
+            return value
+        expression = copy.copy(value)
+        expression.children = children
+        return expression
+    return value
+
+
+def rewrite_lookup(model, lookup_key, value, language=None):
+    """
+    Returns the lookup with its translatable fields (in both the key and the F() expressions of
+    the value) rewritten to the active language. This is either a tuple of (key, value),
+    or a Q object for a lookup that is done on a join to the translation table.
+    """
+    value = rewrite_expression(model, value, language)
+    storage_lookup = split_storage_lookup(model, lookup_key, language)
+    if storage_lookup and storage_lookup[3] == TABLE_STORAGE:
+        field, field_language, lookup, _ = storage_lookup
+        return get_table_lookup(model, field, field_language, lookup, value)
+    related_lookup = split_related_table_lookup(model, lookup_key, language)
+    if related_lookup:
+        return get_related_table_lookup(lookup_key, related_lookup, value)
+    return (rewrite_lookup_key(model, lookup_key, language), value)
+
+
+def split_related_table_lookup(model, lookup_key, language=None):
+    """
+    If `lookup_key` follows relations to a translatable field whose translation in `language`
+    is stored in a table (eg. "myart__body__startswith"), returns a tuple of (relation path,
+    related model, field, language, remaining lookup). Otherwise returns None.
+    """
+    pieces = lookup_key.split('__')
+    transmodel = get_fields_to_translatable_models(model).get(pieces[0])
+    if transmodel is None or len(pieces) < 2:
+        return None
+    sub_lookup = '__'.join(pieces[1:])
+    storage_lookup = split_storage_lookup(transmodel, sub_lookup, language)
+    if storage_lookup and storage_lookup[3] == TABLE_STORAGE:
+        field, field_language, lookup, _ = storage_lookup
+        return (pieces[0], transmodel, field, field_language, lookup)
+    related_lookup = split_related_table_lookup(transmodel, sub_lookup, language)
+    if related_lookup:
+        return ('%s__%s' % (pieces[0], related_lookup[0]),) + related_lookup[1:]
+    return None
+
+
+def get_related_table_lookup(lookup_key, related_lookup, value):
+    """
+    Returns a Q object for a lookup across relations to a "table" field (see split_related_table_lookup).
+    The table lookup is done on the related model, in a subquery that the relation is matched against.
+    """
+    path, transmodel, field, language, lookup = related_lookup
+    if isinstance(value, ExpressionNode):
+        raise MultilingualFieldError(
+            '`%s` cannot be compared to an expression because the translations of `%s` are stored in a table'
+            % (lookup_key, field)
+        )
+    table_lookup = get_table_lookup(transmodel, field, language, lookup, value)
+    return Q(**{'%s__in' % path: transmodel._base_manager.filter(table_lookup).values('pk')})
+
+
+def validate_write_key(model, key, language=None):
+    """
+    Raises a MultilingualFieldError if `key` is a translatable field of `model` that is not
+    translated into `language` (the active language by default): writing it would overwrite
+    the language it falls back to (eg. the primary language), like setting it on an object.
+    """
+    if key not in getattr(model._meta, 'translatable_fields', ()):
+        return
+    language = get_normalized_language(language or get_language())
+    if language not in model._meta.translation_languages[key]:
+        raise MultilingualFieldError(
+            '`%s` cannot be set in "%s" because it is not translated into it' % (key, language)
+        )
+
+
+def rewrite_q(model, q, language=None):
+    """Returns a copy of the Q object with all its lookups rewritten (see rewrite_lookup)"""
+    clone = copy.copy(q)
+    clone.children = [
+        rewrite_q(model, child, language) if isinstance(child, Q) else rewrite_lookup(model, child[0], child[1], language)
+        for child in q.children
+    ]
+    return clone
+
+
+def rewrite_aggregates(model, args, kwargs, language=None):
+    """
+    Returns the aggregates of annotate() or aggregate() (keyed by their alias), with the fields
+    that they reference rewritten. Aggregates passed as positional arguments keep the alias
+    of the field they were given (eg. "name__count").
+    """
+    aggregates = dict(kwargs)
+    for arg in args:
+        if arg.default_alias in aggregates:
+            raise ValueError(
+                "The named annotation '%s' conflicts with the default name for another annotation." % arg.default_alias
+            )
+        aggregates[arg.default_alias] = arg
+
+    for alias, aggregate in aggregates.items():
+        lookup = rewrite_expression_key(model, aggregate.lookup, language)
+        if lookup != aggregate.lookup:
+            aggregates[alias] = copy.copy(aggregate)
+            aggregates[alias].lookup = lookup
+    return aggregates
+
+
 def get_fields_to_translatable_models(model):
-    results = []
+    """
+    Returns a dict of lookup name to related model for each relation of `model` (forward or reverse
+    foreign keys, one-to-ones and many-to-manys) that leads to a translatable model, either directly
+    or through the relations of other models (eg. "foorel__myfoo__name").
+
+    This is computed once for all the installed models (when the app registry is ready),
+    so rewriting a lookup does not walk the relations of the models.
+    """
     from linguo.models import MultilingualModel  # to avoid circular import
 
+    if not _translatable_relations and apps.ready:
+        graph = dict([
+            (modelclass, get_model_relations(modelclass))
+            for modelclass in apps.get_models(include_auto_created=True)
+        ])
+        # The models that lead to a translatable model
+        reaching = set([modelclass for modelclass in graph if issubclass(modelclass, MultilingualModel)])
+        changed = True
+        while changed:
+            changed = False
+            for modelclass, relations in graph.items():
+                if modelclass not in reaching and [name for name, related in relations if related in reaching]:
+                    reaching.add(modelclass)
+                    changed = True
+
+        for modelclass, relations in graph.items():
+            _translatable_relations[modelclass] = dict([
+                (name, related) for name, related in relations if related in reaching
+            ])
+
+    if model in _translatable_relations:
+        if stats.enabled:
+            stats.incr('translatable_relations.hit')
+        return _translatable_relations[model]
+
+    if stats.enabled:
+        stats.incr('translatable_relations.miss')
+
+    # The model is not installed (or the app registry is not ready yet)
+    return dict([
+        (name, related) for name, related in get_model_relations(model)
+        if issubclass(related, MultilingualModel) or _translatable_relations.get(related)
+    ])
+
+
+def get_model_relations(model):
+    """
+    Returns a list of (lookup name, related model) for the relations of `model`
+    (both the relations it defines and the ones that point to it).
+    """
+    relations = []
     for field_name in model._meta.get_all_field_names():
         field_object, modelclass, direct, m2m = model._meta.get_field_by_name(field_name)
         if direct and isinstance(field_object, RelatedField):
-            if issubclass(field_object.related.parent_model, MultilingualModel):
-                results.append((field_name, field_object.related.parent_model))
+            related = field_object.rel.to
+        elif not direct:
+            related = field_object.model
+        else:
+            continue
+        if isinstance(related, type):  # Not a lazy relation (ie. a model name) that was never resolved
+            relations.append((field_name, related))
+    return relations
+
+
+@receiver(class_prepared)
+def clear_translatable_relations(sender, **kwargs):
+    # A new model can add relations to the installed models, but not the classes that
+    # querysets create at runtime for deferred fields, or the models of another registry
+    if getattr(sender, '_deferred', False) or sender._meta.apps is not apps:
+        return
+    _translatable_relations.clear()
+
+
+def get_prefetch_lookups(model, lookups, language=None, deferred_language=None):
+    """
+    Returns the prefetch_related() lookups of a queryset on `model`, where the querysets of the
+    translatable models that are prefetched are bound to `language` (if one is given).
+
+    If `deferred_language` is given (the queryset uses defer_translations), each level of a lookup
+    that prefetches a translatable model also uses a queryset that only loads the fields in that
+    language (see MultilingualQuerySet.defer_translations). Querysets given with Prefetch() are
+    not deferred if they already use only() or defer().
+    """
+    if language is None and deferred_language is None:
+        return lookups
+    lookups = [lookup if isinstance(lookup, Prefetch) else Prefetch(lookup) for lookup in lookups]
+    custom = set([lookup.prefetch_to for lookup in lookups if lookup.queryset is not None])
+    seen = set()
+    results = []
+    for lookup in lookups:
+        # The levels before the last one (eg. "categories" in "categories__foo_set")
+        through_attrs = lookup.prefetch_through.split(LOOKUP_SEP)
+        related_model = model
+        for level, through_attr in enumerate(through_attrs):
+            related_model = get_prefetch_model(related_model, through_attr)
+            if level == len(through_attrs) - 1 or related_model is None:
+                break
+            prefetch_to = lookup.get_current_prefetch_to(level)
+            if prefetch_to in custom or prefetch_to in seen:
+                continue
+            queryset = related_model._default_manager.get_queryset()
+            if isinstance(queryset, MultilingualQuerySet):
+                seen.add(prefetch_to)
+                results.append(Prefetch(
+                    prefetch_to, queryset=get_prefetch_queryset(queryset, language, deferred_language)
+                ))
+
+        # The lookup itself
+        if lookup.prefetch_to in seen and lookup.queryset is None:
+            continue  # Already prefetched by another lookup
+        seen.add(lookup.prefetch_to)
+        queryset = lookup.queryset
+        if queryset is None and related_model is not None:
+            queryset = related_model._default_manager.get_queryset()
+        if isinstance(queryset, MultilingualQuerySet):
+            queryset = get_prefetch_queryset(queryset, language, deferred_language)
+            lookup = Prefetch(lookup.prefetch_through, queryset=queryset, to_attr=lookup.to_attr)
+        results.append(lookup)
     return results
 
 
+def get_prefetch_queryset(queryset, language, deferred_language):
+    # The queryset of a prefetched translatable model (see get_prefetch_lookups)
+    queryset = bind_language(queryset, language)
+    if deferred_language is not None and not queryset.query.deferred_loading[0]:
+        queryset = queryset.defer_translations(deferred_language)
+    return queryset
+
+
+def bind_language(queryset, language):
+    # The queryset in `language` (if a language is given and the queryset is not bound to another one)
+    if language is None or queryset._language is not None:
+        return queryset
+    return queryset.in_language(language)
+
+
+def get_primary_queryset(model, queryset=None):
+    """
+    Returns `queryset` (all the objects of `model` by default) with its translatable fields
+    in the primary language, so that the fields of each language can be used by their own name.
+    """
+    if queryset is None:
+        queryset = MultilingualQuerySet(model)
+    if isinstance(queryset, MultilingualQuerySet):
+        queryset = queryset.in_language(get_normalized_language(settings.LANGUAGES[0][0]))
+    return queryset
+
+
+def get_prefetch_model(model, attr):
+    """
+    Returns the model of the objects that the `attr` relation of `model` prefetches
+    (or None if it is not a relation to a single model).
+    """
+    descriptor = getattr(model, attr, None) if model is not None else None
+    related = getattr(descriptor, 'related', None)
+    if related is not None:  # Reverse relations
+        return related.model
+    field = getattr(descriptor, 'field', None)
+    if getattr(field, 'rel', None) is not None and isinstance(field.rel.to, type):
+        return field.rel.to
+    return None
+
+
+def validate_language(language):
+    """
+    Returns the normalized `language`, or raises MultilingualFieldError
+    if it is not one of the languages in settings.LANGUAGES.
+    """
+    language = get_normalized_language(language)
+    if language not in [get_normalized_language(lang[0]) for lang in settings.LANGUAGES]:
+        raise MultilingualFieldError(
+            '`%s` is not one of the languages in settings.LANGUAGES' % language
+        )
+    return language
+
+
+def get_column_fields(model, languages, fields=None):
+    """
+    Returns the translatable `fields` (all the ones that are translated into all of `languages`
+    by default) of `model`, after checking that their translations are stored in columns.
+    """
+    if fields is None:
+        return [
+            field for field in model._meta.translatable_fields
+            if model._meta.translation_storage[field] == COLUMNS_STORAGE and
+            not [language for language in languages if language not in model._meta.translation_languages[field]]
+        ]
+    for field in fields:
+        if field not in model._meta.translatable_fields:
+            raise MultilingualFieldError(
+                '`%s` is not a translatable field on the model %s' % (field, model.__name__)
+            )
+        if model._meta.translation_storage[field] != COLUMNS_STORAGE:
+            raise MultilingualFieldError(
+                '`%s` cannot be used here because its translations are not stored in columns' % field
+            )
+    return list(fields)
+
+
+def get_translation_predicates(model, language, fields=None):
+    """
+    Returns a list of (field, present, missing) tuples, one per translatable field
+    (only the fields that are translated into `language` by default). `present` matches
+    rows that have a value for the field in `language`, `missing` matches rows that do not.
+
+    The Q objects refer to the field of `language` by its suffixed name (eg. "name_fr", or
+    "name_en" for the primary language), which MultilingualQuerySet rewrites to the column
+    of that language rather than of the active language. They must be used on a
+    MultilingualQuerySet. The translations stored in a table or in json are matched by
+    lookups on their storage.
+    """
+    language = validate_language(language)
+    if fields is None:
+        fields = [
+            field for field in model._meta.translatable_fields
+            if language in model._meta.translation_languages[field]
+        ]
+
+    predicates = []
+    for field in fields:
+        if field not in model._meta.translatable_fields:
+            raise MultilingualFieldError(
+                '`%s` is not a translatable field on the model %s' % (field, model.__name__)
+            )
+        if language not in model._meta.translation_languages[field]:
+            raise MultilingualFieldError(
+                '`%s` is not translated into `%s` on the model %s' % (field, language, model.__name__)
+            )
+        storage = model._meta.translation_storage[field]
+        if storage != COLUMNS_STORAGE and language != get_normalized_language(settings.LANGUAGES[0][0]):
+            if storage == TABLE_STORAGE:
+                present = get_table_present_q(model, field, language)
+                predicates.append((field, present, ~present))
+            else:
+                field_name = '%s__%s' % (get_translations_field_name(field), language)
+                present = Q(**{'%s__gt' % field_name: ''})
+                missing = Q(**{'%s__isnull' % field_name: True}) | Q(**{'%s__exact' % field_name: ''})
+                predicates.append((field, present, missing))
+            continue
+
+        field_object = model._meta.get_field(get_real_field_name(field, language))
+        # The column is referred to by the name of its language (eg. "name_en" for the primary language),
+        # as a lookup on the translatable field itself is for the active language
+        field_name = '%s_%s' % (field, get_language_suffix(language))
+
+        # A single range predicate ("> ''") lets the database use an index on the
+        # column, whereas "NOT (... = '')" generally can not.
+        if field_object.empty_strings_allowed:
+            present = Q(**{'%s__gt' % field_name: ''})
+            missing = Q(**{field_name: ''})
+        else:
+            present = Q(**{'%s__isnull' % field_name: False})
+            missing = None
+        if field_object.null:
+            null = Q(**{'%s__isnull' % field_name: True})
+            missing = null if missing is None else (missing | null)
+        if missing is None:  # The column can never be empty
+            missing = Q(pk__in=[])
+
+        predicates.append((field, present, missing))
+    return predicates
+
+
 class MultilingualQuerySet(models.query.QuerySet):
+    # The language that the queryset (and the objects it returns) is bound to (see in_language)
+    _language = None
+    # Whether the ordering is the default ordering of the model
+    _default_ordering = False
+    # The language of defer_translations(), whose prefetched objects are deferred too
+    _deferred_language = None
+    # The place where the queryset was created, when the fetches are tracked (see linguo.stats)
+    _location = None
 
     def __init__(self, *args, **kwargs):
         super(MultilingualQuerySet, self).__init__(*args, **kwargs)
-        if self.model and (not self.query.order_by):
+        if stats.enabled:
+            stats.incr('queryset.init')
+            if stats.tracking:
+                self._location = stats.get_location()
+        if self.model and (not self.query.order_by) and self.query.default_ordering:
             if self.model._meta.ordering:
                 # If we have default ordering specified on the model, set it now so that
                 # it can be rewritten. Otherwise sql.compiler will grab it directly from _meta
-                ordering = []
-                for key in self.model._meta.ordering:
-                    ordering.append(rewrite_lookup_key(self.model, key))
-                self.query.add_ordering(*ordering)
+                self._add_default_ordering(self.query)
+
+    def _add_default_ordering(self, query):
+        ordering, storage_orderings = self._rewrite_ordering(self.model._meta.ordering)
+        query.add_ordering(*ordering)
+        self._add_storage_orderings(query, storage_orderings)
+        self._default_ordering = True
+
+    def _clone(self, *args, **kwargs):
+        kwargs.setdefault('_language', self._language)
+        kwargs.setdefault('_default_ordering', self._default_ordering)
+        kwargs.setdefault('_deferred_language', self._deferred_language)
+        kwargs.setdefault('_location', self._location)
+        return super(MultilingualQuerySet, self)._clone(*args, **kwargs)
+
+    def in_language(self, language):
+        """
+        Returns a copy of the queryset bound to `language`: the lookups, ordering, etc. applied
+        to it from now on are rewritten to that language (rather than the active language), and
+        so are the values of the translatable fields of the objects it returns. The active language
+        is not looked up for them, and is not modified.
+
+        The lookups and ordering that the queryset already has were rewritten to the language that
+        was active when they were applied, they are kept as they are (only the default ordering of
+        the model is redone). Bind the queryset first (eg. with the manager's for_language).
+        """
+        clone = self._clone(_language=validate_language(language))
+        if clone._default_ordering:
+            clone.query.clear_ordering(force_empty=False)
+            clone._add_default_ordering(clone.query)
+        return clone
+
+    def iterator(self):
+        if stats.enabled and (stats.tracking or stats.is_recording()) and \
+                hasattr(self.model._meta, 'translatable_fields'):
+            return self._recorded_iterator()
+        if self._language is None:
+            return super(MultilingualQuerySet, self).iterator()
+        return self._bound_iterator()
+
+    def _bound_iterator(self):
+        from linguo.models import MultilingualModel  # to avoid circular import
+        for obj in super(MultilingualQuerySet, self).iterator():
+            if isinstance(obj, MultilingualModel):
+                obj._language = self._language
+            yield obj
+
+    def _recorded_iterator(self):
+        # The objects are linked to the record of the queryset, which their translatable fields
+        # mark the languages that are read on (see linguo.stats)
+        from linguo.models import MultilingualModel  # to avoid circular import
+        query = stats.record_query(self.model, *get_loaded_translations(self), location=self._location)
+        for obj in super(MultilingualQuerySet, self).iterator():
+            if isinstance(obj, MultilingualModel):
+                obj._language = self._language
+                query.add(obj)
+            yield obj
+
+    def create(self, **kwargs):
+        if self._language is None:
+            return super(MultilingualQuerySet, self).create(**kwargs)
+        obj = self._new_object(**kwargs)
+        self._for_write = True
+        obj.save(force_insert=True, using=self.db)
+        return obj
+
+    def _create_object_from_params(self, lookup, params):
+        # Used by get_or_create() and update_or_create()
+        if self._language is None:
+            return super(MultilingualQuerySet, self)._create_object_from_params(lookup, params)
+        obj = self._new_object(**params)
+        try:
+            with transaction.atomic(using=self.db):
+                obj.save(force_insert=True, using=self.db)
+            return obj, True
+        except IntegrityError:
+            exc_info = sys.exc_info()
+            try:
+                return self.get(**lookup), False
+            except self.model.DoesNotExist:
+                pass
+            six.reraise(*exc_info)
+
+    def _new_object(self, **kwargs):
+        # A new object whose translatable fields are set in the language of the queryset
+        obj = self.model.__new__(self.model)
+        obj._language = self._language
+        obj.__init__(**kwargs)
+        return obj
 
     def _filter_or_exclude(self, negate, *args, **kwargs):
+        args = [rewrite_q(self.model, arg, self._language) if isinstance(arg, Q) else arg for arg in args]
         for key, val in kwargs.items():
-            new_key = rewrite_lookup_key(self.model, key)
             del kwargs[key]
-            kwargs[new_key] = val
+            lookup = rewrite_lookup(self.model, key, val, self._language)
+            if isinstance(lookup, Q):
+                # The lookup is done on a join to the translation table
+                args.append(lookup)
+            else:
+                kwargs[lookup[0]] = lookup[1]
 
         return super(MultilingualQuerySet, self)._filter_or_exclude(negate, *args, **kwargs)
 
     def order_by(self, *field_names):
+        new_args, storage_orderings = self._rewrite_ordering(field_names)
+        clone = super(MultilingualQuerySet, self).order_by(*new_args)
+        self._add_storage_orderings(clone.query, storage_orderings)
+        clone._default_ordering = False
+        return clone
+
+    def _rewrite_ordering(self, field_names):
+        # Returns the rewritten ordering, along with the "table" translations that need
+        # to be selected (as extra columns) in order to order by them
         new_args = []
+        storage_orderings = []
         for key in field_names:
-            new_args.append(rewrite_lookup_key(self.model, key))
-        return super(MultilingualQuerySet, self).order_by(*new_args)
+            storage_lookup = split_storage_lookup(self.model, key.lstrip('-'), self._language)
+            if storage_lookup and not storage_lookup[2]:
+                field, language, _, _ = storage_lookup
+                alias = '_linguo_%s' % field
+                storage_orderings.append((field, language, alias))
+                new_args.append(key.replace(field, alias))
+            else:
+                new_args.append(rewrite_lookup_key(self.model, key, self._language))
+        return (new_args, storage_orderings)
+
+    def _add_storage_orderings(self, query, storage_orderings):
+        for field, language, alias in storage_orderings:
+            add_translation_ordering(query, self.db, self.model, field, language, alias)
 
     def update(self, **kwargs):
+        table_updates = []
+        json_updates = []
         for key, val in kwargs.items():
-            new_key = rewrite_lookup_key(self.model, key)
             del kwargs[key]
-            kwargs[new_key] = val
-        return super(MultilingualQuerySet, self).update(**kwargs)
+            validate_write_key(self.model, key, self._language)
+            storage_lookup = split_storage_lookup(self.model, key, self._language)
+            if storage_lookup:
+                field, language, _, storage = storage_lookup
+                if storage == TABLE_STORAGE:
+                    table_updates.append((field, language, val))
+                else:
+                    json_updates.append((field, language, val))
+                continue
+
+            new_key = rewrite_lookup_key(self.model, key, self._language)
+            kwargs[new_key] = rewrite_expression(self.model, val, self._language)
+
+        for field, language, val in json_updates:
+            # Only the key of the language is written
+            translations_field = self.model._meta.get_field(get_translations_field_name(field))
+            kwargs[translations_field.name] = TranslationsPatch(translations_field.column, {language: val})
+
+        if getattr(self.model._meta, 'track_translations', False):
+            self._touch_translation_timestamps(kwargs, table_updates + json_updates)
+
+        rows = None
+        for index, (field, language, val) in enumerate(table_updates):
+            # The objects are counted once (by the UPDATE of the columns if there is one)
+            counted = update_translations(self, field, language, val, count=not kwargs and not index)
+            if counted is not None:
+                rows = counted
+        if kwargs or rows is None:
+            rows = super(MultilingualQuerySet, self).update(**kwargs)
+        return rows
     update.alters_data = True
 
+    def _fetch_all(self):
+        fetching = self._result_cache is None
+        super(MultilingualQuerySet, self)._fetch_all()
+
+        # Load the "table" translations of all the objects in the active language at once
+        if fetching and getattr(self.model._meta, 'translation_models', None) and \
+                self._result_cache and isinstance(self._result_cache[0], self.model):
+            load_translations(self.model, self._result_cache, self._language or get_current_language())
+
+    def values(self, *fields):
+        rewritten = [rewrite_expression_key(self.model, field, self._language) for field in fields]
+        # The results are keyed by the names that were given (eg. "name" rather than "name_fr").
+        # A column that was also requested under its own name is kept.
+        field_aliases = tuple([(new, old, new in fields) for new, old in zip(rewritten, fields) if new != old])
+        return self._clone(klass=MultilingualValuesQuerySet, setup=True, _fields=rewritten,
+            _field_aliases=field_aliases)
+
+    def values_list(self, *fields, **kwargs):
+        rewritten = [rewrite_expression_key(self.model, field, self._language) for field in fields]
+        return super(MultilingualQuerySet, self).values_list(*rewritten, **kwargs)
+
+    def annotate(self, *args, **kwargs):
+        return super(MultilingualQuerySet, self).annotate(**rewrite_aggregates(self.model, args, kwargs, self._language))
+
+    def aggregate(self, *args, **kwargs):
+        return super(MultilingualQuerySet, self).aggregate(**rewrite_aggregates(self.model, args, kwargs, self._language))
+
+    def distinct(self, *field_names):
+        rewritten = [rewrite_expression_key(self.model, field, self._language) for field in field_names]
+        return super(MultilingualQuerySet, self).distinct(*rewritten)
+
+    def dates(self, field_name, *args, **kwargs):
+        field_name = rewrite_expression_key(self.model, field_name, self._language)
+        return super(MultilingualQuerySet, self).dates(field_name, *args, **kwargs)
+
+    def datetimes(self, field_name, *args, **kwargs):
+        field_name = rewrite_expression_key(self.model, field_name, self._language)
+        return super(MultilingualQuerySet, self).datetimes(field_name, *args, **kwargs)
+
+    def _prefetch_related_objects(self):
+        # Bind the translatable models that are prefetched to the language of the queryset
+        # (and only load the fields in that language if the queryset defers the translations)
+        self._prefetch_related_lookups = get_prefetch_lookups(
+            self.model, self._prefetch_related_lookups, self._language, self._deferred_language
+        )
+        super(MultilingualQuerySet, self)._prefetch_related_objects()
+
+    def defer_translations(self, language=None, keep=()):
+        """
+        Defers the fields of the translatable fields in every language other than `language`
+        (the language of the queryset by default), the languages it falls back to and the primary
+        language. This reduces the memory used by querysets that only display one language.
+        The fields in `keep` (eg. "name_fr") are not deferred.
+
+        The translatable models prefetched by the queryset (with prefetch_related) only load
+        the fields in `language` too.
+        """
+        if language is None:
+            language = self._language or get_current_language()
+        else:
+            language = validate_language(language)
+        if not hasattr(self.model._meta, 'translatable_fields'):
+            return self._clone(_deferred_language=language)
+
+        kept = get_language_chains().get(language, ()) + (get_normalized_language(settings.LANGUAGES[0][0]),)
+        deferred = []
+        for field in self.model._meta.translatable_fields:
+            if self.model._meta.translation_storage[field] != COLUMNS_STORAGE:
+                continue
+            for lang in self.model._meta.translation_languages[field]:
+                if lang not in kept and get_real_field_name(field, lang) not in keep:
+                    deferred.append(get_real_field_name(field, lang))
+        clone = self.defer(*deferred) if deferred else self._clone()
+        clone._deferred_language = language
+        return clone
+
+    def _touch_translation_timestamps(self, kwargs, storage_updates):
+        from linguo.models import TRANSLATION_STALE_FIELD, TRANSLATION_TIMESTAMP_FIELD  # to avoid circular import
+        now = timezone.now()
+        modified_languages = set()
+        for lang in settings.LANGUAGES:
+            timestamp_field = get_real_field_name(TRANSLATION_TIMESTAMP_FIELD, lang[0])
+            if timestamp_field in kwargs:
+                continue
+            if get_normalized_language(lang[0]) in [language for _, language, _ in storage_updates]:
+                kwargs[timestamp_field] = now
+                modified_languages.add(get_normalized_language(lang[0]))
+                continue
+            for field in self.model._meta.translatable_fields:
+                if get_normalized_language(lang[0]) not in self.model._meta.translation_languages[field]:
+                    continue
+                if get_real_field_name(field, lang[0]) in kwargs:
+                    kwargs[timestamp_field] = now
+                    modified_languages.add(get_normalized_language(lang[0]))
+                    break
+
+        # A modified translation is up to date, the other ones are stale once the primary language is modified
+        primary_lang = get_normalized_language(settings.LANGUAGES[0][0])
+        for lang in settings.LANGUAGES[1:]:
+            lang_code = get_normalized_language(lang[0])
+            stale_field = get_real_field_name(TRANSLATION_STALE_FIELD, lang_code)
+            if stale_field in kwargs or (lang_code not in modified_languages and primary_lang not in modified_languages):
+                continue
+            kwargs[stale_field] = lang_code not in modified_languages
+
+    def stale_translations(self, language, after=None, missing=True):
+        """
+        Returns the objects whose translation in `language` is stale: it was made before the
+        primary language was last modified (or it was marked as stale with `mark_stale`). The
+        objects whose translation was never made are returned too, unless `missing` is False.
+        The model must have `track_translations` enabled in its Meta.
+
+        The stale translations are flagged when the primary language is modified (by save()
+        and update()), so this only filters on indexed fields: `translation_stale_<language>`
+        and, with `missing`, `translated_at_<language>` IS NULL (an OR that most databases
+        combine from the two indexes).
+
+        Ordering and `after` behave the same way as in `missing_translation`.
+        """
+        from linguo.models import TRANSLATION_STALE_FIELD, TRANSLATION_TIMESTAMP_FIELD  # to avoid circular import
+        if not getattr(self.model._meta, 'track_translations', False):
+            raise MultilingualFieldError(
+                'The model %s does not track its translations' % self.model.__name__
+            )
+        language = validate_language(language)
+        if language == get_normalized_language(settings.LANGUAGES[0][0]):
+            return self.none()  # The primary language is the source of the translations
+
+        source_field = TRANSLATION_TIMESTAMP_FIELD
+        target_field = get_real_field_name(TRANSLATION_TIMESTAMP_FIELD, language)
+        stale_field = get_real_field_name(TRANSLATION_STALE_FIELD, language)
+
+        condition = Q(**{stale_field: True, '%s__isnull' % target_field: False})
+        if missing:
+            condition |= Q(**{'%s__isnull' % target_field: True, '%s__isnull' % source_field: False})
+        return self.filter(condition)._keyset_page(after)
+
+    def missing_translation(self, language, fields=None, after=None):
+        """
+        Returns the objects that have a value in the primary language but are missing
+        the translation in `language` for at least one of `fields` (all the
+        translatable fields by default).
+
+        The result is ordered by primary key. Pass the primary key of the last
+        object of the previous page as `after` to fetch the next page (keyset pagination).
+        """
+        target = get_translation_predicates(self.model, language, fields)
+        primary = get_translation_predicates(
+            self.model, settings.LANGUAGES[0][0], [field for field, _, _ in target]
+        )
+        if not target:
+            return self.none()
+
+        condition = None
+        for (_, source_present, _), (_, _, target_missing) in zip(primary, target):
+            field_condition = source_present & target_missing
+            condition = field_condition if condition is None else (condition | field_condition)
+
+        return self.filter(condition)._keyset_page(after)
+
+    def translated_in(self, language, fields=None, after=None):
+        """
+        Returns the objects that have a value in `language` for all of `fields`
+        (all the translatable fields by default).
+
+        Ordering and `after` behave the same way as in `missing_translation`.
+        """
+        qs = self
+        for _, present, _ in get_translation_predicates(self.model, language, fields):
+            qs = qs.filter(present)
+        return qs._keyset_page(after)
+
+    def copy_translations(self, source, target, fields=None):
+        """
+        Copies the translatable `fields` (all the ones translated into both languages by default)
+        from the `source` language to the `target` language with a single UPDATE, and returns the
+        number of objects. Only the fields whose translations are stored in columns can be copied.
+        """
+        source, target = validate_language(source), validate_language(target)
+        updates = {}
+        for field in get_column_fields(self.model, [source, target], fields):
+            source_field = '%s_%s' % (field, get_language_suffix(source))
+            updates['%s_%s' % (field, get_language_suffix(target))] = F(source_field)
+        return self.update(**updates) if updates else 0
+    copy_translations.alters_data = True
+
+    def clear_translations(self, language, fields=None):
+        """
+        Clears the translation in `language` (which cannot be the primary language) of the
+        translatable `fields` (all the ones translated into it by default) with a single UPDATE,
+        and returns the number of objects. The translations are set to None for nullable fields
+        and to an empty string otherwise. The translations stored in a table are deleted instead
+        (with a DELETE per translation table, and a COUNT if no column is updated).
+        """
+        from linguo.models import TRANSLATION_STALE_FIELD, TRANSLATION_TIMESTAMP_FIELD  # to avoid circular import
+        language = validate_language(language)
+        if language == get_normalized_language(settings.LANGUAGES[0][0]):
+            raise MultilingualFieldError('The translations in the primary language cannot be cleared')
+
+        updates = {}
+        for field, _, _ in get_translation_predicates(self.model, language, fields):
+            updates[field] = None if self.model._meta.get_field(field).null else ''
+        if not updates:
+            return 0
+        if getattr(self.model._meta, 'track_translations', False):
+            # The language is not translated anymore (rather than just translated or stale)
+            updates[get_real_field_name(TRANSLATION_TIMESTAMP_FIELD, language)] = None
+            updates[get_real_field_name(TRANSLATION_STALE_FIELD, language)] = False
+        return self.in_language(language).update(**updates)
+    clear_translations.alters_data = True
+
+    def mark_stale(self, language):
+        """
+        Marks the translations in `language` (which cannot be the primary language) as stale,
+        so that they are returned by `stale_translations`, with a single UPDATE. Returns the
+        number of objects. The model must have `track_translations` enabled in its Meta.
+
+        Only the translations that were made are marked (and counted): the time they
+        were made is kept, so they are still told apart from the missing translations.
+        """
+        from linguo.models import TRANSLATION_STALE_FIELD, TRANSLATION_TIMESTAMP_FIELD  # to avoid circular import
+        if not getattr(self.model._meta, 'track_translations', False):
+            raise MultilingualFieldError(
+                'The model %s does not track its translations' % self.model.__name__
+            )
+        language = validate_language(language)
+        if language == get_normalized_language(settings.LANGUAGES[0][0]):
+            raise MultilingualFieldError('The translations in the primary language cannot be marked as stale')
+        translated = self.filter(**{'%s__isnull' % get_real_field_name(TRANSLATION_TIMESTAMP_FIELD, language): False})
+        return translated.update(**{get_real_field_name(TRANSLATION_STALE_FIELD, language): True})
+    mark_stale.alters_data = True
+
+    def _keyset_page(self, after):
+        qs = self
+        if after is not None:
+            qs = qs.filter(pk__gt=after)
+        return qs.order_by('pk')
+
+
+class MultilingualValuesQuerySet(ValuesQuerySet):
+    # The values() of a MultilingualQuerySet: the columns of the active language are
+    # returned under the names of the translatable fields
+    _field_aliases = ()
+
+    def iterator(self):
+        field_aliases = self._field_aliases
+        for row in super(MultilingualValuesQuerySet, self).iterator():
+            # All the values are read before any is renamed, as an alias can be the name of another column
+            # (eg. "name" for "name_fr", when "name_en" is also requested)
+            row.update([
+                (alias, row[field_name] if keep else row.pop(field_name))
+                for field_name, alias, keep in field_aliases
+            ])
+            yield row
+
+    def _clone(self, *args, **kwargs):
+        kwargs.setdefault('_field_aliases', self._field_aliases)
+        return super(MultilingualValuesQuerySet, self)._clone(*args, **kwargs)
+
 
 class MultilingualManager(models.Manager):
     use_for_related_fields = True
@@ -97,3 +986,28 @@ class MultilingualManager(models.Manager):
 
     def get_query_set(self):  # For Django < 1.6 compatibility
         return self.get_queryset()
+
+    def missing_translation(self, *args, **kwargs):
+        return self.get_queryset().missing_translation(*args, **kwargs)
+
+    def translated_in(self, *args, **kwargs):
+        return self.get_queryset().translated_in(*args, **kwargs)
+
+    def stale_translations(self, *args, **kwargs):
+        return self.get_queryset().stale_translations(*args, **kwargs)
+
+    def defer_translations(self, *args, **kwargs):
+        return self.get_queryset().defer_translations(*args, **kwargs)
+
+    def copy_translations(self, *args, **kwargs):
+        return self.get_queryset().copy_translations(*args, **kwargs)
+
+    def clear_translations(self, *args, **kwargs):
+        return self.get_queryset().clear_translations(*args, **kwargs)
+
+    def mark_stale(self, *args, **kwargs):
+        return self.get_queryset().mark_stale(*args, **kwargs)
+
+    def for_language(self, language):
+        """Returns a queryset bound to `language` (see MultilingualQuerySet.in_language)"""
+        return self.get_queryset().in_language(language)
@@ -0,0 +1,47 @@
+import logging
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from linguo import stats
+
+
+logger = logging.getLogger('linguo')
+
+
+class LinguoProfileMiddleware(object):
+    """
+    Reports the linguo activity of each request: the lookups that were rewritten, the languages
+    that were used and, for each translatable model, the languages that were loaded and read
+    (and the querysets that loaded every language when at most one was read).
+
+    It is only used in debug mode (and enables linguo.stats). The report is logged on the
+    "linguo" logger and its summary is added to the response in the X-Linguo-Profile header.
+    """
+    header = 'X-Linguo-Profile'
+
+    def __init__(self):
+        if not settings.DEBUG:
+            raise MiddlewareNotUsed
+        stats.enable()
+
+    def process_request(self, request):
+        if stats.enabled:
+            request._linguo_recorder = stats.start_recording()
+
+    def process_response(self, request, response):
+        recorder = getattr(request, '_linguo_recorder', None)
+        if recorder is None:
+            return response
+        stats.stop_recording(recorder)
+        del request._linguo_recorder
+
+        logger.debug('%s %s\n%s', request.method, request.path, recorder.get_report())
+        for query in recorder.get_overfetched_queries():
+            logger.debug(
+                '%s %s: a queryset of %s loaded the translations in %s but only %s were read',
+                request.method, request.path, query.model._meta.object_name,
+                ','.join(sorted(query.fetched)), ','.join(sorted(query.used)) or 'none',
+            )
+        response[self.header] = recorder.get_summary()
+        return response
@@ -1,13 +1,59 @@
-import copy
-
-from django.db import models
+from django.core.exceptions import NON_FIELD_ERRORS
+from django.db import connection, models
+from django.db.models import Q
 from django.db.models.base import ModelBase
+from django.db.models.query_utils import DeferredAttribute
 from django.conf import settings
+from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
+from linguo import stats
 from linguo.exceptions import MultilingualFieldError
-from linguo.managers import MultilingualManager
-from linguo.utils import get_real_field_name, get_normalized_language, get_current_language
+from linguo.managers import MultilingualManager, get_primary_queryset
+from linguo.storage import STORAGES, COLUMNS_STORAGE, TABLE_STORAGE, JSON_STORAGE, \
+    create_translation_model, get_table_value, set_table_value, get_table_cache, save_translations, \
+    TranslationsField, get_translations_field_name, get_json_value, set_json_value, clear_json_dirty
+from linguo.utils import get_real_field_name, get_normalized_language, get_current_language, \
+    get_field_language, get_language_table, get_language_suffix, get_language_suffixes, \
+    renumber_creation_counters, get_language_resolution, get_language_fallbacks, clear_fallback_values
+
+
+# Name of the (per-language) fields that record when a translation was last modified
+TRANSLATION_TIMESTAMP_FIELD = 'translated_at'
+# Name of the (per-language, except the primary language) fields that mark a translation
+# as older than the primary language (see MultilingualQuerySet.stale_translations)
+TRANSLATION_STALE_FIELD = 'translation_stale'
+
+
+class FallbackResetAttribute(object):
+    """
+    Holds a translation (eg. "title_fr") in the __dict__ of the instance like a plain attribute,
+    but assigning it resets the values that the translatable fields resolved with the fallback
+    chains (see `translate_fallback`).
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        try:
+            return instance.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name)
+
+    def __set__(self, instance, value):
+        instance.__dict__.pop('_fallback_values', None)
+        instance.__dict__[self.name] = value
+
+
+class FallbackResetDeferredAttribute(DeferredAttribute):
+    """A deferred translation, assigning it resets the resolved values like FallbackResetAttribute"""
+
+    def __set__(self, instance, value):
+        instance.__dict__.pop('_fallback_values', None)
+        instance.__dict__[self.field_name] = value
 
 
 class MultilingualModelBase(ModelBase):
@@ -19,11 +65,41 @@ class MultilingualModelBase(ModelBase):
         if ('Meta' in attrs) and hasattr(attrs['Meta'], 'translate'):
             delattr(attrs['Meta'], 'translate')
 
-        attrs = cls.rewrite_trans_fields(local_trans_fields, attrs)
-        attrs = cls.rewrite_unique_together(local_trans_fields, attrs)
+        local_trans_languages, inherited_trans_languages = \
+            cls.get_trans_languages(name, bases, attrs, local_trans_fields)
+
+        local_trans_storage, inherited_trans_storage = \
+            cls.get_trans_storage(name, bases, attrs, local_trans_fields)
+
+        track_translations, inherited_track_translations = \
+            cls.get_track_translations(name, bases, attrs)
+
+        translation_fallback = cls.get_translation_fallback(name, bases, attrs)
+
+        attrs = cls.rewrite_trans_fields(local_trans_fields, local_trans_languages, local_trans_storage, attrs)
+        attrs = cls.rewrite_unique_together(local_trans_fields, local_trans_languages, local_trans_storage, attrs)
+        if track_translations and not inherited_track_translations:
+            attrs = cls.add_translation_timestamps(name, attrs)
 
         new_obj = super(MultilingualModelBase, cls).__new__(cls, name, bases, attrs)
         new_obj._meta.translatable_fields = inherited_trans_fields + local_trans_fields
+        new_obj._meta.translation_languages = dict(inherited_trans_languages, **local_trans_languages)
+        new_obj._meta.translation_resolution = dict([
+            (field, get_language_resolution(languages))
+            for field, languages in new_obj._meta.translation_languages.items()
+        ])
+        new_obj._meta.translation_storage = dict(inherited_trans_storage, **local_trans_storage)
+        new_obj._meta.track_translations = track_translations or inherited_track_translations
+        new_obj._meta.translation_fallback = translation_fallback
+        # The attributes that hold the translations, writing them resets the values
+        # resolved with the fallback chains (see FallbackResetAttribute)
+        translation_attnames = set()
+        for field in new_obj._meta.translatable_fields:
+            languages = new_obj._meta.translation_languages[field]
+            translation_attnames.update(cls.get_language_attrnames(field, languages)[1].values())
+            translation_attnames.update([field, get_translations_field_name(field)])
+        new_obj._meta.translation_attnames = frozenset(translation_attnames)
+        cls.add_translation_models(new_obj, bases)
 
         # Add a property that masks the translatable fields
         for field_name in local_trans_fields:
@@ -36,14 +112,26 @@ class MultilingualModelBase(ModelBase):
             # Some fields add a descriptor (ie. FileField), we want to keep that on the model
             if field_name in new_obj.__dict__:
                 primary_lang_field_name = '%s_%s' % (
-                    field_name, get_normalized_language(settings.LANGUAGES[0][0])
+                    field_name, get_language_suffix(get_normalized_language(settings.LANGUAGES[0][0]))
                 )
                 setattr(new_obj, primary_lang_field_name, new_obj.__dict__[field_name])
 
-            getter = cls.generate_field_getter(field_name)
-            setter = cls.generate_field_setter(field_name)
+            getter = cls.generate_field_getter(
+                field_name, local_trans_languages[field_name], local_trans_storage[field_name]
+            )
+            setter = cls.generate_field_setter(
+                field_name, local_trans_languages[field_name], local_trans_storage[field_name]
+            )
             setattr(new_obj, field_name, property(getter, setter))
 
+        if translation_fallback:
+            # Only the models with `translate_fallback` pay for resetting the resolved values
+            for attname in new_obj._meta.translation_attnames:
+                if isinstance(new_obj.__dict__.get(attname), DeferredAttribute):
+                    setattr(new_obj, attname, FallbackResetDeferredAttribute(attname, new_obj))
+                elif not hasattr(new_obj, attname):
+                    setattr(new_obj, attname, FallbackResetAttribute(attname))
+
         return new_obj
 
     @classmethod
@@ -70,55 +158,330 @@ class MultilingualModelBase(ModelBase):
         return (local_trans_fields, inherited_trans_fields)
 
     @classmethod
-    def rewrite_trans_fields(cls, local_trans_fields, attrs):
-        """Create copies of the local translatable fields for each language"""
+    def get_trans_languages(cls, name, bases, attrs, local_trans_fields):
+        """
+        Returns the languages that each translatable field is translated into
+        (including the primary language). By default this is every language in settings.LANGUAGES
+        but it can be restricted with `translate_languages` in the Meta, either for all the
+        fields (a list of language codes) or per field (a dict of field name to language codes).
+        """
+        all_languages = [get_normalized_language(lang[0]) for lang in settings.LANGUAGES]
+
+        languages = None
+        if ('Meta' in attrs) and hasattr(attrs['Meta'], 'translate_languages'):
+            languages = attrs['Meta'].translate_languages
+            delattr(attrs['Meta'], 'translate_languages')
+
+        if isinstance(languages, dict):
+            for field in languages:
+                if field not in local_trans_fields:
+                    raise MultilingualFieldError(
+                        '`%s` is in translate_languages but it'
+                        ' is not a translatable field on the model %s' % (field, name)
+                    )
+            field_languages = languages
+        else:
+            field_languages = dict([(field, languages) for field in local_trans_fields])
+
+        local_trans_languages = {}
         for field in local_trans_fields:
+            if field_languages.get(field) is None:
+                local_trans_languages[field] = tuple(all_languages)
+                continue
 
-            for lang in settings.LANGUAGES[1:]:
-                lang_code = lang[0]
+            codes = [get_normalized_language(code) for code in field_languages[field]]
+            for code in codes:
+                if code not in all_languages:
+                    raise MultilingualFieldError(
+                        '`%s` cannot be translated into `%s` because it is'
+                        ' not one of the languages in settings.LANGUAGES' % (field, code)
+                    )
+            # The primary language is always there (it is the original field)
+            local_trans_languages[field] = tuple(
+                [lang for lang in all_languages if lang == all_languages[0] or lang in codes]
+            )
+
+        inherited_trans_languages = {}
+        for base in bases:
+            if hasattr(base, '_meta') and hasattr(base._meta, 'translation_languages'):
+                inherited_trans_languages.update(base._meta.translation_languages)
 
-                lang_field = copy.copy(attrs[field])
-                # The new field cannot have the same creation_counter (else the ordering will be arbitrary)
-                # We increment by a decimal point because we don't want to have
-                # to adjust the creation_counter of ALL other subsequent fields
-                lang_field.creation_counter += 0.0001  # Limitation this trick: only supports upto 10,000 languages
-                lang_fieldname = get_real_field_name(field, lang_code)
-                lang_field.name = lang_fieldname
+        return (local_trans_languages, inherited_trans_languages)
 
-                if lang_field.verbose_name is not None:
-                    # This is to extract the original value that was passed into ugettext_lazy
-                    # We do this so that we avoid evaluating the lazy object.
-                    raw_verbose_name = lang_field.verbose_name._proxy____args[0]
-                else:
-                    raw_verbose_name = field.replace('-', ' ')
-                lang_field.verbose_name = _(u'%(verbose_name)s (%(language)s)' %
-                    {'verbose_name': raw_verbose_name, 'language': lang[1]}
+    @classmethod
+    def get_trans_storage(cls, name, bases, attrs, local_trans_fields):
+        """
+        Returns how each translatable field stores its translations.
+        By default this is "columns" (a field per language on the model) but it can be changed
+        per field with `translate_storage` in the Meta (a dict of field name to storage).
+        """
+        storage = {}
+        if ('Meta' in attrs) and hasattr(attrs['Meta'], 'translate_storage'):
+            storage = attrs['Meta'].translate_storage
+            delattr(attrs['Meta'], 'translate_storage')
+
+        for field, field_storage in storage.items():
+            if field not in local_trans_fields:
+                raise MultilingualFieldError(
+                    '`%s` is in translate_storage but it'
+                    ' is not a translatable field on the model %s' % (field, name)
+                )
+            if field_storage not in STORAGES:
+                raise MultilingualFieldError(
+                    '`%s` is not a valid storage for `%s` (choose from %s)' % (
+                        field_storage, field, ', '.join(STORAGES)
+                    )
+                )
+            if field_storage != COLUMNS_STORAGE and \
+                    not isinstance(attrs[field], (models.CharField, models.TextField)):
+                raise MultilingualFieldError(
+                    '`%s` cannot use the "%s" storage because it'
+                    ' is not a text field on the model %s' % (field, field_storage, name)
                 )
 
+        local_trans_storage = dict([
+            (field, storage.get(field, COLUMNS_STORAGE)) for field in local_trans_fields
+        ])
+
+        inherited_trans_storage = {}
+        for base in bases:
+            if hasattr(base, '_meta') and hasattr(base._meta, 'translation_storage'):
+                inherited_trans_storage.update(base._meta.translation_storage)
+
+        return (local_trans_storage, inherited_trans_storage)
+
+    @classmethod
+    def add_translation_models(cls, new_obj, bases):
+        """Create the model that stores the translations of the fields that use "table" storage"""
+        translation_models = {}
+        for base in bases:
+            if hasattr(base, '_meta') and hasattr(base._meta, 'translation_models'):
+                translation_models.update(base._meta.translation_models)
+        new_obj._meta.translation_models = translation_models
+
+        # Abstract models don't have a table to refer to and proxy models use the one of their parent
+        if new_obj._meta.abstract or new_obj._meta.proxy:
+            return
+
+        fields = [
+            field for field in new_obj._meta.translatable_fields
+            if new_obj._meta.translation_storage[field] == TABLE_STORAGE and field not in translation_models
+        ]
+        if fields:
+            translation_model = create_translation_model(new_obj, fields)
+            for field in fields:
+                translation_models[field] = translation_model
+
+    @classmethod
+    def get_track_translations(cls, name, bases, attrs):
+        track_translations = False
+        if ('Meta' in attrs) and hasattr(attrs['Meta'], 'track_translations'):
+            track_translations = attrs['Meta'].track_translations
+            delattr(attrs['Meta'], 'track_translations')
+
+        inherited_track_translations = False
+        for base in bases:
+            if hasattr(base, '_meta') and getattr(base._meta, 'track_translations', False):
+                inherited_track_translations = True
+
+        return (track_translations, inherited_track_translations)
+
+    @classmethod
+    def get_translation_fallback(cls, name, bases, attrs):
+        """
+        Returns whether an empty translation falls back to the next language of its fallback chain
+        (set with `translate_fallback` in the Meta, it is inherited by subclasses).
+        """
+        if ('Meta' in attrs) and hasattr(attrs['Meta'], 'translate_fallback'):
+            translation_fallback = attrs['Meta'].translate_fallback
+            delattr(attrs['Meta'], 'translate_fallback')
+            return translation_fallback
+
+        for base in bases:
+            if hasattr(base, '_meta') and getattr(base._meta, 'translation_fallback', False):
+                return True
+        return False
+
+    @classmethod
+    def add_translation_timestamps(cls, name, attrs):
+        """
+        Create a field for each language that records when its translation was last modified,
+        and an indexed flag for each language other than the primary one that marks its
+        translation as stale.
+        """
+        for position, lang in enumerate(settings.LANGUAGES):
+            lang_fieldnames = [get_real_field_name(TRANSLATION_TIMESTAMP_FIELD, lang[0])]
+            if position:
+                lang_fieldnames.append(get_real_field_name(TRANSLATION_STALE_FIELD, lang[0]))
+            for lang_fieldname in lang_fieldnames:
+                if lang_fieldname in attrs:
+                    raise MultilingualFieldError(
+                        '`%s` is reserved for tracking translations'
+                        ' and cannot be a field on the model %s' % (lang_fieldname, name)
+                    )
+            attrs[lang_fieldnames[0]] = models.DateTimeField(
+                null=True, blank=True, editable=False, db_index=True,
+                verbose_name=_(u'%(verbose_name)s (%(language)s)' %
+                    {'verbose_name': TRANSLATION_TIMESTAMP_FIELD.replace('_', ' '), 'language': lang[1]}
+                )
+            )
+            if position:
+                attrs[lang_fieldnames[1]] = models.BooleanField(
+                    default=False, editable=False, db_index=True,
+                    verbose_name=_(u'%(verbose_name)s (%(language)s)' %
+                        {'verbose_name': TRANSLATION_STALE_FIELD.replace('_', ' '), 'language': lang[1]}
+                    )
+                )
+        return attrs
+
+    @classmethod
+    def rewrite_trans_fields(cls, local_trans_fields, local_trans_languages, local_trans_storage, attrs):
+        """Create copies of the local translatable fields for each language"""
+        # The copies of each field, in the order they go after it (see renumber_creation_counters)
+        copies = {}
+        # Nothing is called for each copy: the languages are only looked up in these tables
+        language_table = get_language_table()
+        suffixes = get_language_suffixes()
+        for field in local_trans_fields:
+            if local_trans_storage[field] == JSON_STORAGE:
+                attrs = cls.add_translations_field(field, attrs)
+                copies[field] = [attrs[get_translations_field_name(field)]]
+            if local_trans_storage[field] != COLUMNS_STORAGE:
+                continue
+
+            # Everything that does not depend on the language is computed once per field,
+            # the copies only differ by their name and verbose name
+            template = attrs[field]
+            raw_verbose_name = cls.get_raw_verbose_name(field, template)
+            field_languages = set(local_trans_languages[field])
+            copies[field] = []
+
+            for lang_code, normalized_code, lang_name in language_table[1:]:
+                if normalized_code not in field_languages:
+                    continue
+
+                lang_field = template.__copy__()
+                lang_fieldname = '%s_%s' % (field, suffixes[normalized_code])
+                lang_field.name = lang_fieldname
+                lang_field.verbose_name = _(u'%s (%s)' % (raw_verbose_name, lang_name))
+
                 attrs[lang_fieldname] = lang_field
+                copies[field].append(lang_field)
+
+        if copies:
+            # The copies cannot keep the creation_counter of their field (else the ordering will be arbitrary)
+            copied = set([id(copy_field) for field_copies in copies.values() for copy_field in field_copies])
+            renumber_creation_counters([
+                [value] + copies.get(name, []) for name, value in attrs.items()
+                if isinstance(value, models.Field) and id(value) not in copied
+            ])
+        return attrs
+
+    @classmethod
+    def get_raw_verbose_name(cls, field, field_object):
+        if field_object.verbose_name is not None:
+            # This is to extract the original value that was passed into ugettext_lazy
+            # We do this so that we avoid evaluating the lazy object.
+            return field_object.verbose_name._proxy____args[0]
+        else:
+            return field.replace('-', ' ')
 
+    @classmethod
+    def add_translations_field(cls, field, attrs):
+        """Create the JSON field that stores the translations of a field that uses "json" storage"""
+        translations_field = TranslationsField()
+        translations_field.translated_field = attrs[field]
+        # Keep it right after the field (see rewrite_trans_fields)
+        translations_field.creation_counter = attrs[field].creation_counter
+        raw_verbose_name = cls.get_raw_verbose_name(field, attrs[field])
+        translations_field.verbose_name = _(u'%(verbose_name)s (translations)' % {
+            'verbose_name': raw_verbose_name
+        })
+        attrs[get_translations_field_name(field)] = translations_field
         return attrs
 
     @classmethod
-    def generate_field_getter(cls, field):
+    def generate_field_getter(cls, field, languages, storage):
         # Property that masks the getter of a translatable field
+        primary_lang = get_normalized_language(settings.LANGUAGES[0][0])
+        resolution, attrnames = cls.get_language_attrnames(field, languages)
+        # The languages (that the field is translated into) whose value is used when a translation is empty
+        fallbacks = get_language_fallbacks(languages)
+
+        def get_value(self_reference, lang):
+            if stats.enabled and not self_reference._force_language:
+                stats.record_read(self_reference, field, lang)
+            if storage == TABLE_STORAGE and lang != primary_lang:
+                return get_table_value(self_reference, field, lang)
+            if storage == JSON_STORAGE and lang != primary_lang:
+                return get_json_value(self_reference, field, lang)
+            return getattr(self_reference, attrnames[lang])
+
         def getter(self_reference):
-            lang = self_reference._force_language or get_current_language()
-            attrname = '%s_%s' % (field, lang)
-            return getattr(self_reference, attrname)
+            lang = self_reference._force_language or self_reference._language or get_current_language()
+            # Not translated into this language: use its fallback chain
+            lang = resolution.get(lang) or resolution.get(get_normalized_language(lang), primary_lang)
+            if stats.enabled and not self_reference._force_language:
+                stats.incr('descriptor.get.%s' % lang)
+            if self_reference._force_language or not self_reference._meta.translation_fallback:
+                return get_value(self_reference, lang)
+
+            # The resolved value (and the language it comes from) is kept until the field is set,
+            # so that reading it repeatedly (ie. in templates) does not walk the fallback chain each time
+            memo = self_reference.__dict__.setdefault('_fallback_values', {})
+            if stats.enabled:
+                stats.incr('descriptor.fallback.%s' % ('hit' if lang in memo.get(field, ()) else 'miss'))
+            if lang not in memo.setdefault(field, {}):
+                memo[field][lang] = (get_value(self_reference, lang), lang)
+                for code in fallbacks[lang]:
+                    value = get_value(self_reference, code)
+                    if value is not None and value != '':
+                        memo[field][lang] = (value, code)
+                        break
+            return memo[field][lang][0]
         return getter
 
     @classmethod
-    def generate_field_setter(cls, field):
+    def generate_field_setter(cls, field, languages, storage):
         # Property that masks a setter of the translatable field
+        primary_lang = get_normalized_language(settings.LANGUAGES[0][0])
+        attrnames = cls.get_language_attrnames(field, languages)[1]
+        translated = frozenset(languages)
+
         def setter(self_reference, value):
-            lang = self_reference._force_language or get_current_language()
-            attrname = '%s_%s' % (field, lang)
-            setattr(self_reference, attrname, value)
+            clear_fallback_values(self_reference)
+            lang = self_reference._force_language or self_reference._language or get_current_language()
+            if lang not in translated:
+                # Not translated into this language: writing the language it falls back to
+                # would overwrite another translation (eg. the primary language)
+                lang = get_normalized_language(lang)
+                if lang not in translated:
+                    raise MultilingualFieldError(
+                        '`%s` cannot be set in "%s" because it is not translated into it' % (field, lang)
+                    )
+            if stats.enabled and not self_reference._force_language:
+                stats.incr('descriptor.set.%s' % lang)
+            if storage == TABLE_STORAGE and lang != primary_lang:
+                set_table_value(self_reference, field, lang, value)
+                return
+            if storage == JSON_STORAGE and lang != primary_lang:
+                set_json_value(self_reference, field, lang, value)
+                return
+            setattr(self_reference, attrnames[lang], value)
         return setter
 
     @classmethod
-    def rewrite_unique_together(cls, local_trans_fields, attrs):
+    def get_language_attrnames(cls, field, languages):
+        # The language in which the field is stored for each language (see get_language_chains)
+        # and the name of the attribute that holds the value in each of those languages.
+        # They are computed once so that accessing the field is only dict lookups.
+        resolution = get_language_resolution(languages)
+        suffixes = get_language_suffixes()
+        attrnames = dict([(lang, '%s_%s' % (field, suffixes[lang])) for lang in languages])
+        return resolution, attrnames
+
+    @classmethod
+    def rewrite_unique_together(cls, local_trans_fields, local_trans_languages, local_trans_storage, attrs):
         if ('Meta' not in attrs) or not hasattr(attrs['Meta'], 'unique_together'):
             return attrs
 
@@ -144,15 +507,26 @@ class MultilingualModelBase(ModelBase):
 
         # Now perform the re-writing
         for constraint in constraints_to_rewrite:
+            for field in constraint:
+                if field in local_trans_fields and local_trans_storage[field] != COLUMNS_STORAGE:
+                    raise MultilingualFieldError(
+                        '`%s` cannot be in unique_together because its'
+                        ' translations are not stored in columns' % field
+                    )
+
             for lang in settings.LANGUAGES:
                 lang_code = lang[0]
                 new_constraint = []
                 for field in constraint:
                     if field in local_trans_fields:
-                        field = get_real_field_name(field, lang_code)
+                        if get_normalized_language(lang_code) in local_trans_languages[field]:
+                            field = get_real_field_name(field, lang_code)
                     new_constraint.append(field)
 
-                new_ut.append(tuple(new_constraint))
+                # Fields that are not translated into every language can produce the same
+                # constraint more than once
+                if tuple(new_constraint) not in new_ut:
+                    new_ut.append(tuple(new_constraint))
 
         attrs['Meta'].unique_together = tuple(new_ut)
         return attrs
@@ -163,20 +537,36 @@ class MultilingualModel(models.Model):
 
     objects = MultilingualManager()
 
+    # The language that the object is bound to, instead of the active language
+    # (set on the objects of querysets bound to a language, see MultilingualQuerySet.in_language)
+    _language = None
+
     class Meta:
         abstract = True
 
     def __init__(self, *args, **kwargs):
         self._force_language = None
 
-        # Rewrite any keyword arguments for translatable fields
-        language = get_current_language()
-        for field in self._meta.translatable_fields:
-            if field in kwargs.keys():
-                attrname = get_real_field_name(field, language)
-                if attrname != field:
-                    kwargs[attrname] = kwargs[field]
-                    del kwargs[field]
+        # Rewrite any keyword arguments for translatable fields (the objects loaded from the
+        # database only have positional arguments, or the names of the columns when fields are deferred)
+        rewrite = bool(kwargs) and not self._deferred
+        if stats.enabled:
+            stats.incr('model.init.slow' if rewrite else 'model.init.fast')
+        storage_values = {}
+        if rewrite:
+            language = self._language or get_current_language()
+            for field in self._meta.translatable_fields:
+                if field in kwargs:
+                    field_language = get_field_language(self, field, language)
+                    attrname = get_real_field_name(field, field_language)
+                    if attrname == field:
+                        continue
+                    if self._meta.translation_storage[field] != COLUMNS_STORAGE:
+                        # There is no field for this language, it is set once the object is initialized
+                        storage_values[(field, field_language)] = kwargs.pop(field)
+                    else:
+                        kwargs[attrname] = kwargs[field]
+                        del kwargs[field]
 
         # We have to force the primary language before initializing or else
         # our "proxy" property will prevent the primary language values from being returned.
@@ -184,21 +574,229 @@ class MultilingualModel(models.Model):
         super(MultilingualModel, self).__init__(*args, **kwargs)
         self._force_language = None
 
+        for (field, field_language), value in storage_values.items():
+            self._force_language = field_language
+            setattr(self, field, value)
+        self._force_language = None
+
+        if self._meta.track_translations:
+            self._translation_snapshot = self._get_translation_values()
+
     def save(self, *args, **kwargs):
+        clear_fallback_values(self)
+        if self._meta.track_translations:
+            self._touch_translation_timestamps(kwargs)
+
         # We have to force the primary language before saving or else
         # our "proxy" property will prevent the primary language values from being returned.
         old_forced_language = self._force_language
         self._force_language = get_normalized_language(settings.LANGUAGES[0][0])
+        if stats.enabled:
+            stats.incr('model.save.forced')
         super(MultilingualModel, self).save(*args, **kwargs)
         # Now we can switch back
         self._force_language = old_forced_language
 
+        if self._meta.translation_models:
+            save_translations(self)
+        clear_json_dirty(self)
+
+        if self._meta.track_translations:
+            self._translation_snapshot = self._get_translation_values()
+
+    def _get_translation_values(self):
+        # Returns the values of the translatable fields (keyed by the actual field name),
+        # grouped by language. Deferred fields and "table" translations that were not loaded
+        # are skipped so that we don't trigger a query for them.
+        deferred = set([
+            attname for attname, value in self.__class__.__dict__.items()
+            if isinstance(value, DeferredAttribute)
+        ])
+        primary_lang = get_normalized_language(settings.LANGUAGES[0][0])
+        table_cache = get_table_cache(self) if self._meta.translation_models else {}
+        values = {}
+        for lang in settings.LANGUAGES:
+            lang_code = get_normalized_language(lang[0])
+            values[lang_code] = {}
+            for field in self._meta.translatable_fields:
+                if lang_code not in self._meta.translation_languages[field]:
+                    continue
+                field_name = get_real_field_name(field, lang_code)
+                if self._meta.translation_storage[field] == TABLE_STORAGE and lang_code != primary_lang:
+                    if (field, lang_code) in table_cache:
+                        values[lang_code][field_name] = table_cache[(field, lang_code)]
+                elif self._meta.translation_storage[field] == JSON_STORAGE and lang_code != primary_lang:
+                    if get_translations_field_name(field) not in deferred:
+                        values[lang_code][field_name] = get_json_value(self, field, lang_code)
+                elif field_name not in deferred:
+                    values[lang_code][field_name] = getattr(self, '%s_%s' % (field, get_language_suffix(lang_code)))
+        return values
+
+    def _touch_translation_timestamps(self, save_kwargs):
+        # Update the timestamp of every language whose translation was modified
+        # since the object was loaded (or last saved), and the stale flag of the other languages
+        now = timezone.now()
+        update_fields = save_kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = list(update_fields)
+        # update_fields does not apply to translations that are not stored in columns
+        concrete_fields = set([f.name for f in self._meta.concrete_fields])
+
+        modified_languages = set()
+        for lang_code, values in self._get_translation_values().items():
+            old_values = self._translation_snapshot.get(lang_code, {})
+            modified = False
+            for field_name, value in values.items():
+                if update_fields is not None and field_name not in update_fields and \
+                        field_name in concrete_fields:
+                    continue
+                if self._state.adding:
+                    modified = modified or bool(value)
+                else:
+                    modified = modified or (value != old_values.get(field_name))
+
+            if modified:
+                modified_languages.add(lang_code)
+                timestamp_field = get_real_field_name(TRANSLATION_TIMESTAMP_FIELD, lang_code)
+                setattr(self, timestamp_field, now)
+                if update_fields is not None and timestamp_field not in update_fields:
+                    update_fields.append(timestamp_field)
+
+        # A modified translation is up to date, the other ones are stale once the primary language is modified
+        primary_lang = get_normalized_language(settings.LANGUAGES[0][0])
+        for lang in settings.LANGUAGES[1:]:
+            lang_code = get_normalized_language(lang[0])
+            if lang_code not in modified_languages and primary_lang not in modified_languages:
+                continue
+            stale_field = get_real_field_name(TRANSLATION_STALE_FIELD, lang_code)
+            setattr(self, stale_field, lang_code not in modified_languages)
+            if update_fields is not None and stale_field not in update_fields:
+                update_fields.append(stale_field)
+
+        if update_fields is not None:
+            save_kwargs['update_fields'] = update_fields
+
+    def _perform_unique_checks(self, unique_checks):
+        # The constraints of each model (eg. the variants of a translatable constraint in every language)
+        # are checked with a single query. They are only checked one by one, to report the ones that
+        # are violated, when that query finds a conflict.
+        lookups = []
+        for model_class, unique_check in unique_checks:
+            lookup = get_unique_lookup(self, unique_check)
+            if lookup is not None:
+                if not lookups or lookups[-1][0] is not model_class:
+                    lookups.append((model_class, []))
+                lookups[-1][1].append((unique_check, lookup))
+
+        errors = {}
+        for model_class, checks in lookups:
+            queryset = get_primary_queryset(model_class, model_class._default_manager.all())
+            pk = self._get_pk_val(model_class._meta)
+            if not self._state.adding and pk is not None:
+                queryset = queryset.exclude(pk=pk)
+
+            if len(checks) > 1:
+                condition = Q()
+                for unique_check, lookup in checks:
+                    condition |= Q(**lookup)
+                if not queryset.filter(condition).exists():
+                    continue
+            for unique_check, lookup in checks:
+                if queryset.filter(**lookup).exists():
+                    key = unique_check[0] if len(unique_check) == 1 else NON_FIELD_ERRORS
+                    errors.setdefault(key, []).append(self.unique_error_message(model_class, unique_check))
+        return errors
+
+    def get_translation_source(self, field):
+        """
+        Returns the language that the value of the translatable `field` (in the active language,
+        or the language the object is bound to) comes from. This is not that language if the field
+        is not translated into it, or if its translation is empty and the model has `translate_fallback`.
+        """
+        language = get_field_language(
+            self, field, self._force_language or self._language or get_current_language()
+        )
+        getattr(self, field)
+        memo = self.__dict__.get('_fallback_values', {}).get(field, {})
+        if language in memo:
+            return memo[language][1]
+        return language
+
     def translate(self, language, **kwargs):
         # Temporarily force this objects language
         old_forced_language = self._force_language
         self._force_language = language
-        # Set the values
-        for key, val in kwargs.iteritems():
-            setattr(self, key, val)  # Set values on the object
-        # Now switch back
-        self._force_language = old_forced_language
+        try:
+            # Set the values
+            for key, val in kwargs.iteritems():
+                setattr(self, key, val)  # Set values on the object
+        finally:
+            # Now switch back
+            self._force_language = old_forced_language
+
+
+def get_unique_lookup(instance, unique_check):
+    """
+    Returns the lookup (as keyword arguments) of the objects that have the same values as
+    `instance` for the fields of `unique_check`, or None if the check does not apply to it
+    (ie. one of the values is None).
+    """
+    old_forced_language = instance._force_language
+    # Read the value of each language from its own field
+    instance._force_language = get_normalized_language(settings.LANGUAGES[0][0])
+    try:
+        lookup = {}
+        for field_name in unique_check:
+            field = instance._meta.get_field(field_name)
+            value = getattr(instance, field.attname)
+            if value is None or (value == '' and connection.features.interprets_empty_strings_as_nulls):
+                return None
+            if field.primary_key and not instance._state.adding:
+                return None
+            lookup[str(field_name)] = value
+        return lookup
+    finally:
+        instance._force_language = old_forced_language
+
+
+def validate_unique_in_bulk(instances, exclude=None, batch_size=100):
+    """
+    Runs the unique checks of many `instances` of a model against the database with
+    one query per constraint (and per `batch_size` instances), instead of one query per
+    constraint and instance. The instances are not checked against each other.
+
+    Returns a list of (instance, errors) for the instances that are not unique, where
+    `errors` is a dict of messages like the one of the ValidationError of validate_unique().
+    """
+    instances = list(instances)
+    if not instances:
+        return []
+    unique_checks = instances[0]._get_unique_checks(exclude=exclude)[0]
+
+    errors = [{} for instance in instances]
+    for model_class, unique_check in unique_checks:
+        rows = []
+        for index, instance in enumerate(instances):
+            lookup = get_unique_lookup(instance, unique_check)
+            if lookup is not None:
+                rows.append((index, lookup))
+
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            condition = Q()
+            for index, lookup in batch:
+                condition |= Q(**lookup)
+            existing = {}
+            queryset = get_primary_queryset(model_class, model_class._default_manager.all()).filter(condition)
+            for row in queryset.values_list('pk', *unique_check):
+                existing.setdefault(tuple(row[1:]), set()).add(row[0])
+
+            for index, lookup in batch:
+                instance = instances[index]
+                pk = None if instance._state.adding else instance._get_pk_val(model_class._meta)
+                if existing.get(tuple([lookup[field] for field in unique_check]), set()) - set([pk]):
+                    key = unique_check[0] if len(unique_check) == 1 else NON_FIELD_ERRORS
+                    errors[index].setdefault(key, []).append(
+                        instance.unique_error_message(model_class, unique_check)
+                    )
+    return [(instance, errors[index]) for index, instance in enumerate(instances) if errors[index]]
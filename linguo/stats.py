@@ -0,0 +1,356 @@
+"""
+Opt-in counters (and timings) of the work that linguo does on its hot paths: rewriting lookups,
+reading and setting translatable fields, initializing and saving objects and creating querysets.
+
+They are only collected once enabled, with the LINGUO_STATS setting or `enable()`. When they are
+disabled the hot paths only check the `enabled` flag, so the overhead is negligible.
+
+The tracking mode (the LINGUO_TRACK_FETCHES setting or `enable_tracking()`) also records, for
+each place where a queryset of a translatable model is created, the languages that were loaded
+and the ones that were read, and suggests how to load less (see get_fetch_sites).
+
+    from linguo import stats
+
+    stats.enable()
+    ...
+    stats.snapshot()
+    {'counters': {'descriptor.get.fr': 12, 'queryset.init': 2, ...}, 'timings': {'rewrite_lookup_key': 0.0004}}
+"""
+import sys
+import threading
+from contextlib import contextmanager
+from timeit import default_timer
+
+from django.conf import settings
+from django.dispatch import receiver
+
+from linguo.storage import COLUMNS_STORAGE, JSON_STORAGE, get_translations_field_name
+from linguo.utils import get_normalized_language, get_real_field_name
+
+try:
+    from django.core.signals import setting_changed
+except ImportError:  # Django < 1.8
+    from django.test.signals import setting_changed
+
+
+tracking = bool(getattr(settings, 'LINGUO_TRACK_FETCHES', False))
+enabled = bool(getattr(settings, 'LINGUO_STATS', False)) or tracking
+
+_counters = {}
+# The total time (in seconds) of each timed counter
+_timings = {}
+_lock = threading.Lock()
+# The recorders of the current thread (see start_recording)
+_local = threading.local()
+# The FetchSite of each place where querysets are evaluated, when tracking
+_sites = {}
+
+# The modules whose frames are skipped when looking for the place where a queryset is created or
+# evaluated (the templates, paginators, generic views, etc. of Django evaluate the querysets of the project)
+TRACKING_SKIPPED_MODULES = ('linguo.managers', 'linguo.models', 'linguo.stats', 'django.')
+
+
+@receiver(setting_changed)
+def update_enabled(**kwargs):
+    global enabled, tracking
+    if kwargs['setting'] == 'LINGUO_STATS':
+        enabled = bool(kwargs['value']) or tracking
+    elif kwargs['setting'] == 'LINGUO_TRACK_FETCHES':
+        tracking = bool(kwargs['value'])
+        enabled = tracking or bool(getattr(settings, 'LINGUO_STATS', False))
+
+
+def enable():
+    global enabled
+    enabled = True
+
+
+def disable():
+    global enabled, tracking
+    enabled = tracking = False
+
+
+def enable_tracking():
+    """Enables the stats and the tracking of the languages loaded and read by each queryset"""
+    global enabled, tracking
+    enabled = tracking = True
+
+
+def disable_tracking():
+    global tracking
+    tracking = False
+
+
+def incr(name, count=1):
+    """Adds `count` to the counter `name`"""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + count
+    for recorder in getattr(_local, 'recorders', ()):
+        recorder.counters[name] = recorder.counters.get(name, 0) + count
+
+
+@contextmanager
+def timer(name):
+    """Counts the block in the counter `name` and adds the time that it takes to its timing"""
+    start = default_timer()
+    try:
+        yield
+    finally:
+        elapsed = default_timer() - start
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + 1
+            _timings[name] = _timings.get(name, 0.0) + elapsed
+        for recorder in getattr(_local, 'recorders', ()):
+            recorder.counters[name] = recorder.counters.get(name, 0) + 1
+            recorder.timings[name] = recorder.timings.get(name, 0.0) + elapsed
+
+
+def snapshot():
+    """Returns a copy of the counters and the timings collected so far"""
+    with _lock:
+        return {'counters': dict(_counters), 'timings': dict(_timings)}
+
+
+def reset():
+    """Clears the counters, the timings and the tracked fetch sites"""
+    with _lock:
+        _counters.clear()
+        _timings.clear()
+        _sites.clear()
+
+
+class QueryRecord(object):
+    """The languages whose columns a queryset loaded, and the ones that were read from its objects"""
+
+    def __init__(self, model, loaded, translations, site=None):
+        self.model = model
+        self.fetched = frozenset([lang for field, lang in loaded])
+        # The languages that the model has translations for
+        self.languages = frozenset([lang for field, lang in translations])
+        self.used = set()
+        self.objects = 0
+        # The FetchSite of the queryset, when tracking
+        self.site = site
+
+    def add(self, obj):
+        """Links an object loaded by the queryset to the record"""
+        obj._recorded_query = self
+        self.objects += 1
+        if self.site is not None:
+            self.site.objects += 1
+
+    @property
+    def overfetched(self):
+        # Every language was loaded but at most one was read (the primary language
+        # is not counted as unused, the other languages fall back to it)
+        primary_lang = get_normalized_language(settings.LANGUAGES[0][0])
+        return self.objects > 0 and self.fetched == self.languages and len(self.used) <= 1 and \
+            bool(self.fetched - self.used - set([primary_lang]))
+
+
+class Recorder(object):
+    """The linguo activity of the current thread between start_recording and stop_recording"""
+
+    def __init__(self):
+        self.counters = {}
+        self.timings = {}
+        self.queries = []
+
+    def get_languages(self):
+        """Returns the languages of the rewritten lookups and of the fields that were read or set"""
+        languages = set()
+        for name in self.counters:
+            prefix, _, language = name.rpartition('.')
+            if prefix in ('lookup', 'descriptor.get', 'descriptor.set'):
+                languages.add(language)
+        return sorted(languages)
+
+    def get_models(self):
+        """
+        Returns a dict of model label to the number of objects loaded, and the languages
+        that were loaded and read, for each translatable model that was queried.
+        """
+        models = {}
+        for query in self.queries:
+            label = '%s.%s' % (query.model._meta.app_label, query.model._meta.object_name)
+            info = models.setdefault(label, {'objects': 0, 'fetched': set(), 'used': set()})
+            info['objects'] += query.objects
+            info['fetched'].update(query.fetched)
+            info['used'].update(query.used)
+        return models
+
+    def get_overfetched_queries(self):
+        """Returns the queries that loaded the translations in every language when at most one was read"""
+        return [query for query in self.queries if query.overfetched]
+
+    def get_summary(self):
+        """Returns a one line summary of the activity (eg. for a response header)"""
+        return 'lookups=%d; languages=%s; objects=%d; overfetched=%d' % (
+            self.counters.get('rewrite_lookup_key', 0), ','.join(self.get_languages()),
+            sum([query.objects for query in self.queries]), len(self.get_overfetched_queries()),
+        )
+
+    def get_report(self):
+        """Returns the activity, with the columns loaded and read of each model, as lines of text"""
+        lines = [self.get_summary()]
+        for label, info in sorted(self.get_models().items()):
+            lines.append('%s: %d objects, fetched %s, used %s' % (
+                label, info['objects'], ','.join(sorted(info['fetched'])) or '-',
+                ','.join(sorted(info['used'])) or '-',
+            ))
+        return '\n'.join(lines)
+
+
+def start_recording():
+    """Starts recording the linguo activity of the current thread, and returns the Recorder"""
+    recorder = Recorder()
+    _local.recorders = getattr(_local, 'recorders', ()) + (recorder,)
+    return recorder
+
+
+def stop_recording(recorder):
+    _local.recorders = tuple([other for other in getattr(_local, 'recorders', ()) if other is not recorder])
+
+
+def is_recording():
+    return bool(getattr(_local, 'recorders', ()))
+
+
+@contextmanager
+def record():
+    """Records the linguo activity of the block on the current thread (the stats must be enabled)"""
+    recorder = start_recording()
+    try:
+        yield recorder
+    finally:
+        stop_recording(recorder)
+
+
+def record_query(model, loaded, translations, location=None):
+    """
+    Adds a queryset of `model` that loaded the `loaded` (translatable field, language)
+    (out of all its `translations`) to the recorders, and to its fetch site when tracking.
+    The fetch site is at `location` (where the queryset was created), or where it is evaluated.
+    """
+    site = None
+    if tracking:
+        if location is None:
+            location = get_location()
+        with _lock:
+            site = _sites.get((model, location))
+            if site is None:
+                site = _sites[(model, location)] = FetchSite(model, location)
+            site.queries += 1
+            site.loaded.update(loaded)
+    query = QueryRecord(model, loaded, translations, site)
+    for recorder in getattr(_local, 'recorders', ()):
+        recorder.queries.append(query)
+    return query
+
+
+def record_read(obj, field, language):
+    """Marks `field` as read in `language` on the queryset that loaded `obj` (if it is recorded)"""
+    query = obj.__dict__.get('_recorded_query')
+    if query is not None:
+        query.used.add(language)
+        if query.site is not None:
+            query.site.used.add(language)
+            query.site.read_fields.add((field, language))
+
+
+def get_location():
+    """
+    Returns the (file name, line number, function name) of the code that creates or evaluates
+    a queryset, the first frame outside of the modules in TRACKING_SKIPPED_MODULES.
+    """
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if not module.startswith(TRACKING_SKIPPED_MODULES):
+            return (frame.f_code.co_filename, frame.f_lineno, frame.f_code.co_name)
+        frame = frame.f_back
+    return ('<unknown>', 0, '<unknown>')
+
+
+class FetchSite(object):
+    """The languages loaded and read by the querysets of a model evaluated at the same place"""
+
+    def __init__(self, model, location):
+        self.model = model
+        self.location = location
+        self.queries = 0
+        self.objects = 0
+        # The (translatable field, language) that were loaded and the ones that were read
+        self.loaded = set()
+        self.read_fields = set()
+        # The languages that were read
+        self.used = set()
+
+    def __repr__(self):
+        return '<FetchSite: %s at %s>' % (self.model._meta.object_name, self.get_location_display())
+
+    def get_location_display(self):
+        return '%s:%d in %s' % self.location
+
+    @property
+    def fetched(self):
+        # The languages that were loaded
+        return set([lang for field, lang in self.loaded])
+
+    def get_unused_languages(self):
+        """Returns the languages that were loaded but never read (the primary language is always used)"""
+        return self.fetched - self.used - set([get_normalized_language(settings.LANGUAGES[0][0])])
+
+    def get_unused_translations(self):
+        """
+        Returns the (translatable field, language) that were loaded but never read
+        (the primary language is always used).
+        """
+        primary_lang = get_normalized_language(settings.LANGUAGES[0][0])
+        return set([
+            (field, lang) for field, lang in self.loaded - self.read_fields if lang != primary_lang
+        ])
+
+    def get_suggestion(self):
+        """
+        Returns how the querysets could load less, or None: defer_translations() when the objects are
+        read in a single language, otherwise only() with the translations that were read.
+        """
+        unused = self.get_unused_translations()
+        if not self.objects or not unused:
+            return None
+        primary_lang = get_normalized_language(settings.LANGUAGES[0][0])
+        opts = self.model._meta
+        read_languages = self.used - set([primary_lang])
+        language = (list(read_languages) or [primary_lang])[0]
+        if len(read_languages) <= 1 and language not in [lang for field, lang in unused]:
+            return '.defer_translations(%r)' % str(language)
+
+        # The columns of the translations that are loaded with the objects (see get_loaded_translations)
+        translation_columns = set()
+        for field in opts.translatable_fields:
+            if opts.translation_storage[field] == COLUMNS_STORAGE:
+                translation_columns.update([
+                    get_real_field_name(field, lang) for lang in opts.translation_languages[field]
+                ])
+            elif opts.translation_storage[field] == JSON_STORAGE:
+                translation_columns.update([field, get_translations_field_name(field)])
+        columns = [f.name for f in opts.concrete_fields if f.name not in translation_columns]
+        for field, lang in sorted(self.read_fields):
+            if opts.translation_storage[field] == JSON_STORAGE and lang != primary_lang:
+                column = get_translations_field_name(field)
+            else:
+                column = get_real_field_name(field, lang)
+            if column not in columns:
+                columns.append(column)
+        return '.only(%s)' % ', '.join([repr(str(column)) for column in columns])
+
+
+def get_fetch_sites():
+    """
+    Returns the tracked fetch sites, the ones that loaded the most unused translations first
+    (see FetchSite.get_suggestion).
+    """
+    with _lock:
+        sites = list(_sites.values())
+    return sorted(sites, key=lambda site: -site.objects * len(site.get_unused_translations()))
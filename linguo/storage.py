@@ -0,0 +1,473 @@
+"""
+Alternative storage for translatable fields.
+
+By default, linguo stores each translation in its own column on the model's table
+("columns" storage). Fields listed in `translate_storage` keep only the primary language
+in their column, while the other languages are stored either:
+
+* as rows of a generated translation model with the columns (object, language, field, value)
+  ("table" storage), or
+* in a single JSON column keyed by language ("json" storage).
+"""
+import json
+
+from django.conf import settings
+from django.db import connections, models, transaction
+from django.db.models import Q
+from django.db.models.expressions import ExpressionNode
+from django.db.models.lookups import Transform
+from django.utils import six
+
+from linguo.exceptions import MultilingualFieldError
+from linguo.utils import get_normalized_language, get_real_field_name
+
+
+COLUMNS_STORAGE = 'columns'
+TABLE_STORAGE = 'table'
+JSON_STORAGE = 'json'
+
+STORAGES = (COLUMNS_STORAGE, TABLE_STORAGE, JSON_STORAGE,)
+
+# Upper bound on the number of primary keys in a single `IN` clause
+# (SQLite does not allow more than 999 parameters per query)
+BATCH_SIZE = 500
+
+
+def create_translation_model(model, fields):
+    """
+    Creates the model that stores the translations of the "table" `fields` of `model`.
+    """
+    name = '%sTranslation' % model.__name__
+    related_name = '%s_translations' % model.__name__.lower()
+
+    class Meta:
+        app_label = model._meta.app_label
+        db_table = '%s_translation' % model._meta.db_table
+        # The index on (object, field, language) lets loading the translations of
+        # a batch of objects (and the joins used for filtering) avoid a table scan
+        unique_together = (('object', 'field', 'language'),)
+
+    translation_model = type(name, (models.Model,), {
+        '__module__': model.__module__,
+        'Meta': Meta,
+        'object': models.ForeignKey(model, related_name=related_name),
+        'language': models.CharField(max_length=15),
+        'field': models.CharField(max_length=100),
+        'value': models.TextField(blank=True),
+    })
+    translation_model.translated_fields = tuple(fields)
+    return translation_model
+
+
+def get_translation_model(model, field):
+    """
+    Returns the translation model that stores `field` (if it uses "table" storage),
+    otherwise None.
+    """
+    return model._meta.translation_models.get(field)
+
+
+def get_related_name(translation_model):
+    return translation_model._meta.get_field('object').rel.related_name
+
+
+def get_table_cache(instance):
+    # Holds the "table" translations of the instance: {(field, language): value}
+    return instance.__dict__.setdefault('_table_translations', {})
+
+
+def get_table_value(instance, field, language):
+    """
+    Returns the value of the "table" field in the given (non-primary) language,
+    loading the translations of the instance in that language if needed.
+    """
+    cache = get_table_cache(instance)
+    if (field, language) not in cache:
+        load_translations(instance.__class__, [instance], language)
+    return cache[(field, language)]
+
+
+def set_table_value(instance, field, language, value):
+    get_table_cache(instance)[(field, language)] = value
+    instance.__dict__.setdefault('_dirty_table_translations', set()).add((field, language))
+
+
+def load_translations(model, instances, language):
+    """
+    Loads the "table" translations in `language` of all the given instances,
+    using one query per translation model (per batch of objects).
+    """
+    language = get_normalized_language(language)
+    if language == get_normalized_language(settings.LANGUAGES[0][0]):
+        return  # The primary language is stored on the model's table
+
+    for translation_model in set(model._meta.translation_models.values()):
+        fields = [
+            field for field in translation_model.translated_fields
+            if language in model._meta.translation_languages[field]
+        ]
+        pending = [
+            instance for instance in instances if instance.pk is not None and
+            [field for field in fields if (field, language) not in get_table_cache(instance)]
+        ]
+
+        for i in range(0, len(pending), BATCH_SIZE):
+            batch = pending[i:i + BATCH_SIZE]
+            rows = translation_model._default_manager.filter(
+                object__in=[instance.pk for instance in batch], language=language, field__in=fields,
+            ).values_list('object_id', 'field', 'value')
+
+            values = {}
+            for object_id, field, value in rows:
+                values[(object_id, field)] = value
+
+            for instance in batch:
+                cache = get_table_cache(instance)
+                # The loaded values are the ones the translations are compared to when the
+                # object is saved (see MultilingualModel._touch_translation_timestamps)
+                snapshot = instance.__dict__.get('_translation_snapshot')
+                for field in fields:
+                    if (field, language) in cache:  # Don't overwrite unsaved values
+                        continue
+                    default = model._meta.get_field(field).get_default()
+                    cache[(field, language)] = values.get((instance.pk, field), default)
+                    if snapshot is not None:
+                        snapshot.setdefault(language, {})[get_real_field_name(field, language)] = \
+                            cache[(field, language)]
+
+        # Unsaved objects can't have translations yet
+        for instance in instances:
+            if instance.pk is None:
+                cache = get_table_cache(instance)
+                for field in fields:
+                    if (field, language) not in cache:
+                        cache[(field, language)] = model._meta.get_field(field).get_default()
+
+
+def save_translations(instance):
+    """
+    Saves the "table" translations that were modified on the instance.
+    """
+    dirty = instance.__dict__.get('_dirty_table_translations')
+    if not dirty:
+        return
+
+    cache = get_table_cache(instance)
+    translation_models = {}
+    for field, language in dirty:
+        translation_model = get_translation_model(instance.__class__, field)
+        translation_models.setdefault(translation_model, []).append((field, language))
+
+    # The translations are replaced (deleted and inserted again) all together or not at all
+    with transaction.atomic(using=instance._state.db):
+        for translation_model, keys in translation_models.items():
+            condition = Q()
+            for field, language in keys:
+                condition |= Q(field=field, language=language)
+            translation_model._default_manager.using(instance._state.db).filter(condition, object=instance).delete()
+            translation_model._default_manager.using(instance._state.db).bulk_create([
+                translation_model(object=instance, field=field, language=language, value=cache[(field, language)])
+                for field, language in keys
+            ])
+
+    dirty.clear()
+
+
+def update_translations(queryset, field, language, value, count=True):
+    """
+    Sets the "table" translation of `field` in `language` to `value` for all
+    the objects of the queryset, and returns the number of objects (unless `count` is False).
+
+    Setting the default value of the field (eg. clearing the translation) only deletes the
+    translations, since that is the value of a missing translation.
+    """
+    translation_model = get_translation_model(queryset.model, field)
+    manager = translation_model._default_manager.db_manager(queryset.db)
+    pk_query = queryset.order_by().values('pk')
+    with transaction.atomic(using=queryset.db):
+        manager.filter(object__in=pk_query, field=field, language=language).delete()
+        if not isinstance(value, ExpressionNode) and value == queryset.model._meta.get_field(field).get_default():
+            return pk_query.count() if count else None
+
+        pks = list(queryset.order_by().values_list('pk', flat=True))
+        for i in range(0, len(pks), BATCH_SIZE):
+            manager.bulk_create([
+                translation_model(object_id=pk, field=field, language=language, value=value)
+                for pk in pks[i:i + BATCH_SIZE]
+            ])
+    return len(pks)
+
+
+def get_table_lookup(model, field, language, lookup, value):
+    """
+    Returns a Q object for a lookup on a "table" field in the given (non-primary) language.
+
+    It is a subquery on the translation table, so that exclude() and negated Q objects exclude
+    the objects whose translation matches. The objects without a translation have the default
+    value of the field (as when it is read on the object), so they match when the default does.
+    Expressions (eg. F('title')) refer to the model, so they are compared on a join instead.
+    """
+    translation_model = get_translation_model(model, field)
+    if isinstance(value, ExpressionNode):
+        related_name = get_related_name(translation_model)
+        lookup_key = '%s__value' % related_name
+        if lookup:
+            lookup_key = '%s__%s' % (lookup_key, lookup)
+        # The conditions are combined in a single filter so that they apply to the same joined row
+        return Q(**{
+            '%s__language' % related_name: language,
+            '%s__field' % related_name: field,
+            lookup_key: value,
+        })
+
+    translations = translation_model._default_manager.filter(language=language, field=field)
+    value_lookup = 'value__%s' % lookup if lookup else 'value'
+    q = Q(pk__in=translations.filter(**{value_lookup: value}).values('object'))
+    if matches_default(model._meta.get_field(field), lookup, value):
+        q = q | ~Q(pk__in=translations.values('object'))
+    return q
+
+
+def matches_default(field, lookup, value):
+    """Returns whether the lookup matches the default value of `field` (which is a text field)"""
+    default = field.get_default()
+    if lookup == 'isnull':
+        return bool(value) == (default is None)
+    if default is None:
+        return False
+    default = six.text_type(default)
+    if lookup == 'in':
+        return default in [six.text_type(item) for item in value]
+    value = six.text_type(value)
+    checks = {
+        'exact': lambda: default == value,
+        'iexact': lambda: default.lower() == value.lower(),
+        'contains': lambda: value in default,
+        'icontains': lambda: value.lower() in default.lower(),
+        'startswith': lambda: default.startswith(value),
+        'istartswith': lambda: default.lower().startswith(value.lower()),
+        'endswith': lambda: default.endswith(value),
+        'iendswith': lambda: default.lower().endswith(value.lower()),
+        'gt': lambda: default > value,
+        'gte': lambda: default >= value,
+        'lt': lambda: default < value,
+        'lte': lambda: default <= value,
+    }
+    check = checks.get(lookup or 'exact')
+    return check is not None and check()
+
+
+def get_table_present_q(model, field, language):
+    """
+    Returns a Q object matching the objects that have a non-empty
+    "table" translation of `field` in `language`.
+    """
+    translation_model = get_translation_model(model, field)
+    return Q(pk__in=translation_model._default_manager.filter(
+        language=language, field=field, value__gt=''
+    ).values('object'))
+
+
+def add_translation_ordering(query, using, model, field, language, alias):
+    """
+    Adds a select of the translation of `field` in `language` (as `alias`) to the query,
+    so that it can be used for ordering. The field must use the "table" or "json" storage.
+    """
+    qn = connections[using].ops.quote_name
+    if model._meta.translation_storage[field] == JSON_STORAGE:
+        translations_field = model._meta.get_field(get_translations_field_name(field))
+        column = '%s.%s' % (qn(translations_field.model._meta.db_table), qn(translations_field.column))
+        sql, params = get_json_key_sql(connections[using], column, language)
+        query.add_extra({alias: sql}, params, None, None, None, None)
+        return
+
+    translation_model = get_translation_model(model, field)
+    sql = '(SELECT %(value)s FROM %(table)s WHERE %(table)s.%(object)s = %(model_table)s.%(pk)s' \
+        ' AND %(table)s.%(language)s = %%s AND %(table)s.%(field)s = %%s)' % {
+            'value': qn('value'),
+            'table': qn(translation_model._meta.db_table),
+            'object': qn(translation_model._meta.get_field('object').column),
+            'model_table': qn(model._meta.db_table),
+            'pk': qn(model._meta.pk.column),
+            'language': qn('language'),
+            'field': qn('field'),
+        }
+    query.add_extra({alias: sql}, [language, field], None, None, None, None)
+
+
+def get_translations_field_name(field):
+    """
+    Returns the name of the JSON field that stores the translations of `field`
+    (when it uses "json" storage).
+    """
+    return '%s_translations' % field
+
+
+def get_json_key_sql(connection, column, language):
+    """
+    Returns the SQL (and params) that extracts the translation in `language`
+    from the JSON `column`.
+    """
+    if connection.vendor == 'sqlite':
+        return ('json_extract(%s, %%s)' % column, ['$."%s"' % language])
+    elif connection.vendor == 'postgresql':
+        return ('(%s ->> %%s)' % column, [language])
+    elif connection.vendor == 'mysql':
+        return ('JSON_UNQUOTE(JSON_EXTRACT(%s, %%s))' % column, ['$."%s"' % language])
+    raise MultilingualFieldError(
+        'The "%s" storage is not supported by the %s database backend' % (JSON_STORAGE, connection.vendor)
+    )
+
+
+class LanguageTransform(Transform):
+    """
+    Extracts the translation in a language from a TranslationsField
+    (eg. "name_translations__fr__startswith").
+    A missing translation is the default value of the field, as when it is read on an object.
+    """
+    language = None
+    default = None
+
+    def as_sql(self, qn, connection):
+        lhs, params = qn.compile(self.lhs)
+        sql, key_params = get_json_key_sql(connection, lhs, self.language)
+        if self.default is None:
+            return sql, params + key_params
+        return 'COALESCE(%s, %%s)' % sql, params + key_params + [self.default]
+
+    @property
+    def output_field(self):
+        return models.TextField()
+
+
+class TranslationsPatch(object):
+    """
+    An update of some of the languages of a TranslationsField. It is compiled to
+    an expression that only changes those keys (instead of rewriting the whole column).
+    """
+
+    def __init__(self, column, values):
+        self.column = column
+        self.values = values
+
+    def as_sql(self, qn, connection):
+        column = qn(self.column)
+        if not self.values:
+            return column, []
+
+        if connection.vendor == 'postgresql':
+            return ("COALESCE(%s, '{}'::jsonb) || %%s::jsonb" % column, [json.dumps(self.values)])
+
+        pairs, params = [], []
+        for language, value in sorted(self.values.items()):
+            pairs.append('%s, %s')
+            params.extend(['$."%s"' % language, value])
+        if connection.vendor == 'sqlite':
+            return ("json_set(COALESCE(NULLIF(%s, ''), '{}'), %s)" % (column, ', '.join(pairs)), params)
+        elif connection.vendor == 'mysql':
+            return ("JSON_SET(COALESCE(%s, '{}'), %s)" % (column, ', '.join(pairs)), params)
+        raise MultilingualFieldError(
+            'The "%s" storage is not supported by the %s database backend' % (JSON_STORAGE, connection.vendor)
+        )
+
+
+class RowValues(ExpressionNode):
+    """
+    The values that an update sets in a column, per primary key. It is compiled to a CASE
+    expression so that rows with different values are updated with a single query.
+    The rows that are not in `values` keep their value.
+    """
+
+    def __init__(self, field, values):
+        super(RowValues, self).__init__()
+        self.field = field
+        self.values = values
+
+    def evaluate(self, evaluator, qn, connection):
+        # An expression is used (rather than a value) so that it is not converted by the field
+        return self.as_sql(qn, connection)
+
+    def as_sql(self, qn, connection):
+        pk = self.field.model._meta.pk
+        cases, params = [], []
+        for pk_value, value in self.values.items():
+            cases.append('WHEN %s THEN %s')
+            params.extend([
+                pk.get_db_prep_value(pk_value, connection),
+                self.field.get_db_prep_save(value, connection),
+            ])
+        sql = 'CASE %s %s ELSE %s END' % (qn(pk.column), ' '.join(cases), qn(self.field.column))
+        return sql, params
+
+
+class TranslationsField(six.with_metaclass(models.SubfieldBase, models.TextField)):
+    """
+    Stores the (non-primary) translations of a field as a JSON object keyed by language.
+    Updates of existing objects only write the languages that were modified.
+    """
+    # The field whose translations are stored (see MultilingualModelBase.add_translations_field)
+    translated_field = None
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('default', dict)
+        kwargs.setdefault('blank', True)
+        kwargs.setdefault('editable', False)
+        super(TranslationsField, self).__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super(TranslationsField, self).deconstruct()
+        if kwargs.get('default') is dict:
+            del kwargs['default']
+        if kwargs.get('blank') is True:
+            del kwargs['blank']
+        if kwargs.get('editable') is False:
+            del kwargs['editable']
+        return name, path, args, kwargs
+
+    def db_type(self, connection):
+        if connection.vendor == 'postgresql':
+            return 'jsonb'
+        return super(TranslationsField, self).db_type(connection)
+
+    def to_python(self, value):
+        if isinstance(value, dict):
+            return value
+        if not value:
+            return {}
+        return json.loads(value)
+
+    def get_prep_value(self, value):
+        if isinstance(value, TranslationsPatch):
+            return value
+        return json.dumps(value or {})
+
+    def pre_save(self, model_instance, add):
+        translations = getattr(model_instance, self.attname)
+        if add:
+            return translations
+        dirty = model_instance.__dict__.get('_dirty_json_translations', {}).get(self.attname, ())
+        return TranslationsPatch(self.column, dict([(lang, translations.get(lang)) for lang in dirty]))
+
+    def get_transform(self, lookup_name):
+        if lookup_name in [get_normalized_language(lang[0]) for lang in settings.LANGUAGES]:
+            default = self.translated_field.get_default() if self.translated_field is not None else None
+            return type('LanguageTransform', (LanguageTransform,), {'language': lookup_name, 'default': default})
+        return super(TranslationsField, self).get_transform(lookup_name)
+
+
+def get_json_value(instance, field, language):
+    translations = getattr(instance, get_translations_field_name(field))
+    if language in translations:
+        return translations[language]
+    return instance._meta.get_field(field).get_default()
+
+
+def set_json_value(instance, field, language, value):
+    translations_field_name = get_translations_field_name(field)
+    getattr(instance, translations_field_name)[language] = value
+    dirty = instance.__dict__.setdefault('_dirty_json_translations', {})
+    dirty.setdefault(translations_field_name, set()).add(language)
+
+
+def clear_json_dirty(instance):
+    instance.__dict__.pop('_dirty_json_translations', None)
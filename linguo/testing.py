@@ -0,0 +1,136 @@
+"""
+Helpers for the tests of projects that use linguo, to check the queries of translatable models.
+
+    from linguo.testing import MultilingualTestMixin, for_each_language
+
+    class ProductTests(MultilingualTestMixin, TestCase):
+
+        @for_each_language
+        def testList(self):
+            with self.assertSelectedLanguages([get_current_language()]), self.assertMaxQueries(2):
+                self.client.get('/products/')
+"""
+import functools
+import sys
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+from django.utils import six, translation
+
+from linguo.storage import COLUMNS_STORAGE
+from linguo.utils import get_normalized_language, get_real_field_name
+
+
+def get_translation_columns(connection, model=None):
+    """
+    Returns a dict of the quoted "table"."column" of each translation stored in a column
+    (of `model` or of every translatable model) to its language.
+    """
+    from linguo.models import MultilingualModel  # to avoid circular import
+    modelclasses = [model] if model is not None else [
+        modelclass for modelclass in apps.get_models() if issubclass(modelclass, MultilingualModel)
+    ]
+    qn = connection.ops.quote_name
+    columns = {}
+    for modelclass in modelclasses:
+        opts = modelclass._meta
+        for field in opts.translatable_fields:
+            if opts.translation_storage[field] != COLUMNS_STORAGE:
+                continue
+            for lang in opts.translation_languages[field]:
+                model_field = opts.get_field(get_real_field_name(field, lang))
+                columns['%s.%s' % (qn(model_field.model._meta.db_table), qn(model_field.column))] = lang
+    return columns
+
+
+def get_selected_translations(connection, queries, model=None):
+    """
+    Returns the language of each translation column in the SELECT clause of `queries`
+    (captured with CaptureQueriesContext), once for every time that it is selected.
+    """
+    columns = get_translation_columns(connection, model)
+    selected = []
+    for query in queries:
+        # Some backends add the parameters to the SQL (eg. "QUERY = u'SELECT ...' - PARAMS = ()")
+        sql = query['sql']
+        start = sql.find('SELECT ')
+        if start == -1:
+            continue
+        end = sql.find(' FROM ', start)
+        select = sql[start + len('SELECT '):end if end != -1 else len(sql)]
+        for column in select.replace(' ', '').split(','):
+            # Skip the aliases (eg. "table"."column" AS "alias") and the expressions
+            if column in columns:
+                selected.append(columns[column])
+    return selected
+
+
+def for_each_language(test_func):
+    """
+    Runs the decorated test once in each language of settings.LANGUAGES (activated with
+    translation.override). The message of a failure tells which language it happened in.
+    """
+    @functools.wraps(test_func)
+    def wrapper(*args, **kwargs):
+        for code, name in settings.LANGUAGES:
+            with translation.override(code):
+                try:
+                    test_func(*args, **kwargs)
+                except AssertionError as e:
+                    six.reraise(
+                        AssertionError, AssertionError('%s (in the language "%s")' % (e, code)), sys.exc_info()[2]
+                    )
+    return wrapper
+
+
+class MultilingualTestMixin(object):
+    """Assertions on the queries of translatable models, for django.test.TestCase"""
+
+    @contextmanager
+    def assertNumTranslationColumns(self, num, model=None, using=DEFAULT_DB_ALIAS):
+        """
+        Asserts that the SELECT queries of the block load `num` translation columns
+        (of `model` or of every translatable model), in every language.
+        """
+        connection = connections[using]
+        with CaptureQueriesContext(connection) as context:
+            yield context
+        selected = get_selected_translations(connection, context.captured_queries, model)
+        self.assertEqual(
+            len(selected), num, '%d translation columns were selected, %d expected. Queries:\n%s' % (
+                len(selected), num, '\n'.join([query['sql'] for query in context.captured_queries])
+            )
+        )
+
+    @contextmanager
+    def assertSelectedLanguages(self, languages, model=None, using=DEFAULT_DB_ALIAS):
+        """
+        Asserts that the SELECT queries of the block only load the translation columns
+        (of `model` or of every translatable model) in `languages` and the primary language.
+        """
+        connection = connections[using]
+        with CaptureQueriesContext(connection) as context:
+            yield context
+        expected = set([get_normalized_language(language) for language in languages])
+        expected.add(get_normalized_language(settings.LANGUAGES[0][0]))
+        selected = set(get_selected_translations(connection, context.captured_queries, model))
+        self.assertTrue(
+            selected <= expected, 'The translations in %s were selected, only %s expected. Queries:\n%s' % (
+                ', '.join(sorted(selected - expected)), ', '.join(sorted(expected)),
+                '\n'.join([query['sql'] for query in context.captured_queries])
+            )
+        )
+
+    @contextmanager
+    def assertMaxQueries(self, num, using=DEFAULT_DB_ALIAS):
+        """Asserts that the block runs at most `num` queries"""
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+        self.assertTrue(
+            len(context) <= num, '%d queries were executed, at most %d expected. Queries:\n%s' % (
+                len(context), num, '\n'.join([query['sql'] for query in context.captured_queries])
+            )
+        )
@@ -1,7 +1,8 @@
 from django.contrib import admin
 
+from linguo.admin import MultilingualModelAdmin
 from linguo.tests.forms import MultilingualBarFormAllFields
-from linguo.tests.models import Bar
+from linguo.tests.models import Bar, Foo, Pag
 
 
 class BarAdmin(admin.ModelAdmin):
@@ -12,3 +13,19 @@ class BarAdmin(admin.ModelAdmin):
 
 
 admin.site.register(Bar, BarAdmin)
+
+
+class FooAdmin(MultilingualModelAdmin):
+    list_display = ('name', 'price',)
+    search_fields = ('name',)
+    search_languages = ('en', 'fr',)
+
+
+admin.site.register(Foo, FooAdmin)
+
+
+class PagAdmin(MultilingualModelAdmin):
+    list_display = ('title', 'position',)
+
+
+admin.site.register(Pag, PagAdmin)
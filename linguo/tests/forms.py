@@ -1,7 +1,7 @@
 from django import forms
 
 from linguo.forms import MultilingualModelForm
-from linguo.tests.models import Bar
+from linguo.tests.models import Bar, Kit
 
 
 class BarForm(forms.ModelForm):
@@ -32,3 +32,10 @@ class MultilingualBarFormAllFields(MultilingualModelForm):
         model = Bar
         if hasattr(forms, 'ALL_FIELDS'):  # For Django < 1.6 compatibility
             fields = forms.ALL_FIELDS
+
+
+class MultilingualKitForm(MultilingualModelForm):
+    class Meta:
+        model = Kit
+        if hasattr(forms, 'ALL_FIELDS'):  # For Django < 1.6 compatibility
+            fields = forms.ALL_FIELDS
@@ -130,6 +130,100 @@ class Lan(MultilingualModel):
         translate = ('name',)
 
 
+class Pag(MultilingualModel):
+    title = models.CharField(max_length=255, verbose_name=_('title'))
+    body = models.TextField(blank=True)
+    position = models.PositiveIntegerField(default=0)
+
+    objects = MultilingualManager()
+
+    class Meta:
+        translate = ('title', 'body',)
+        track_translations = True
+
+
+class Kit(MultilingualModel):
+    name = models.CharField(max_length=255, verbose_name=_('name'))
+    note = models.CharField(max_length=255, blank=True)
+
+    objects = MultilingualManager()
+
+    class Meta:
+        translate = ('name', 'note',)
+        translate_languages = {'note': ()}
+        unique_together = ('name', 'note',)
+
+
+class Bin(MultilingualModel):
+    name = models.CharField(max_length=255, verbose_name=_('name'))
+
+    objects = MultilingualManager()
+
+    class Meta:
+        translate = ('name',)
+        translate_languages = ('en',)
+
+
+class Art(MultilingualModel):
+    title = models.CharField(max_length=255, verbose_name=_('title'))
+    body = models.TextField(blank=True)
+
+    objects = MultilingualManager()
+
+    class Meta:
+        ordering = ('body', 'id',)
+        translate = ('title', 'body',)
+        translate_storage = {'body': 'table'}
+
+
+class ArtRel(models.Model):
+    myart = models.ForeignKey(Art)
+    desc = models.CharField(max_length=255)
+
+    objects = MultilingualManager()
+
+
+class Pen(MultilingualModel):
+    name = models.CharField(max_length=255, verbose_name=_('name'))
+    blurb = models.TextField(blank=True, verbose_name=_('blurb'))
+    price = models.PositiveIntegerField(default=0)
+
+    objects = MultilingualManager()
+
+    class Meta:
+        translate = ('name', 'blurb',)
+        translate_storage = {'blurb': 'json'}
+
+
+class PenRel(models.Model):
+    mypen = models.ForeignKey(Pen)
+
+    objects = MultilingualManager()
+
+
+class Rev(MultilingualModel):
+    title = models.CharField(max_length=255, verbose_name=_('title'))
+    body = models.TextField(blank=True)
+
+    objects = MultilingualManager()
+
+    class Meta:
+        translate = ('title', 'body',)
+        translate_storage = {'body': 'table'}
+        track_translations = True
+
+
+class Tip(MultilingualModel):
+    title = models.CharField(max_length=255, verbose_name=_('title'))
+    body = models.TextField(blank=True)
+
+    objects = MultilingualManager()
+
+    class Meta:
+        translate = ('title', 'body',)
+        translate_fallback = True
+
+
 """
 class AbstractCar(models.Model):
     name = models.CharField(max_length=255, verbose_name=_('name'), default=None)
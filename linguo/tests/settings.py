@@ -54,6 +54,9 @@ MIDDLEWARE_CLASSES = (
 
 ROOT_URLCONF = 'linguo.tests.urls'
 
+# Some of the test models are ordered by unindexed translatable fields or have plain managers
+SILENCED_SYSTEM_CHECKS = ['linguo.W001', 'linguo.W004']
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
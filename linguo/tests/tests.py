@@ -1,19 +1,46 @@
 # coding=utf-8
 
+import datetime
+import os
+import sys
+import threading
+import time
+
 import django
+from django.conf import settings
+from django.contrib import admin
+from django.apps import apps
+from django.apps.registry import Apps
 from django.contrib.auth.models import User
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.core.paginator import Paginator
 from django.core.urlresolvers import reverse
-from django.db import IntegrityError
-from django.test import TestCase
-from django.utils import translation
-
+from django.db import IntegrityError, connection, models
+from django.db.models import Count, F, Max, Prefetch, Q
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import six, translation
+from django.utils.translation import ugettext_lazy as _
+
+from linguo import stats
+from linguo.admin import MultilingualModelAdmin
+from linguo.checks import check_multilingual_models, check_ordering_indexes
+from linguo.exceptions import MultilingualFieldError
+from linguo.forms import multilingual_modelform_factory, translation_formset_factory
+from linguo.managers import get_fields_to_translatable_models
+from linguo.models import FallbackResetAttribute, MultilingualModel, MultilingualModelBase, \
+    validate_unique_in_bulk
+from linguo.testing import MultilingualTestMixin, for_each_language
 from linguo.tests.forms import BarForm, BarFormWithFieldsSpecified, \
-    BarFormWithFieldsExcluded, MultilingualBarFormAllFields
-from linguo.tests.models import Foo, FooRel, Moo, Bar, BarRel, Moe, Gem, \
-    FooCategory, Hop, Ord, Doc, Lan
+    BarFormWithFieldsExcluded, MultilingualBarFormAllFields, MultilingualKitForm
+from linguo.tests.models import Foo, FooRel, Moo, Bar, BarRel, Moe, Gem, Rev, \
+    FooCategory, Hop, Ord, Doc, Lan, Pag, Kit, Bin, Art, ArtRel, Pen, PenRel, Tip
+from linguo.utils import get_current_language, get_language_chains, \
+    get_normalized_language, propagate_language
 
 
-class LinguoTests(TestCase):
+class LinguoTests(MultilingualTestMixin, TestCase):
 
     def setUp(self):
         self.old_lang = translation.get_language()
@@ -1422,6 +1449,2007 @@ class TestMultilingualForm(LinguoTests):
         self.assertEqual(form.initial['description_fr'], 'French Hello')
 
 
+class TranslationQueueTests(LinguoTests):
+
+    def setUp(self):
+        super(TranslationQueueTests, self).setUp()
+        self.done = Hop.objects.create(name='done', description='desc', price=1)
+        self.done.translate(name='done fr', description='desc fr', language='fr')
+        self.done.save()
+
+        self.no_name = Hop.objects.create(name='no name', description='desc', price=2)
+        self.no_name.translate(description='desc fr', language='fr')
+        self.no_name.save()
+
+        self.untranslated = Hop.objects.create(name='untranslated', description='desc', price=3)
+
+        # Nothing to translate from, so it is not part of the queue
+        self.empty = Hop.objects.create(name='', description='', price=4)
+
+    def testMissingTranslation(self):
+        qs = Hop.objects.missing_translation('fr')
+        self.assertEqual(list(qs), [self.no_name, self.untranslated])
+
+    def testMissingTranslationForSpecificFields(self):
+        qs = Hop.objects.missing_translation('fr', fields=['description'])
+        self.assertEqual(list(qs), [self.untranslated])
+
+    def testMissingTranslationDoesNotDependOnActiveLanguage(self):
+        translation.activate('fr')
+        qs = Hop.objects.missing_translation('fr')
+        self.assertEqual(list(qs), [self.no_name, self.untranslated])
+
+    def testMissingTranslationKeysetPagination(self):
+        page = Hop.objects.missing_translation('fr')[:1]
+        self.assertEqual(list(page), [self.no_name])
+
+        page = Hop.objects.missing_translation('fr', after=page[0].pk)[:1]
+        self.assertEqual(list(page), [self.untranslated])
+
+        page = Hop.objects.missing_translation('fr', after=page[0].pk)[:1]
+        self.assertEqual(list(page), [])
+
+    def testTranslatedIn(self):
+        self.assertEqual(list(Hop.objects.translated_in('fr')), [self.done])
+        self.assertEqual(list(Hop.objects.translated_in('fr', fields=['description'])),
+            [self.done, self.no_name]
+        )
+        self.assertEqual(list(Hop.objects.translated_in('en')),
+            [self.done, self.no_name, self.untranslated]
+        )
+
+    def testCanBeCombinedWithOtherFilters(self):
+        qs = Hop.objects.filter(price__gte=3).missing_translation('fr')
+        self.assertEqual(list(qs), [self.untranslated])
+
+    def testInvalidFieldOrLanguage(self):
+        self.assertRaises(MultilingualFieldError, Hop.objects.missing_translation, 'fr', ['price'])
+        self.assertRaises(MultilingualFieldError, Hop.objects.translated_in, 'de')
+
+
+class StaleTranslationTests(LinguoTests):
+
+    def setUp(self):
+        super(StaleTranslationTests, self).setUp()
+        self.page = Pag.objects.create(title='Title', body='Body')
+        self.page.translate(title='Titre', body='Corps', language='fr')
+        self.page.save()
+
+    def backdate(self, obj, field, days=1):
+        timestamp = getattr(obj, field) - datetime.timedelta(days=days)
+        setattr(obj, field, timestamp)
+        Pag.objects.filter(pk=obj.pk).update(**{field: timestamp})
+
+    def testTimestampFieldsAreCreated(self):
+        field_names = [f.name for f in Pag._meta.fields]
+        self.assertTrue('translated_at' in field_names)
+        self.assertTrue('translated_at_fr' in field_names)
+        self.assertFalse('translated_at' in Pag._meta.translatable_fields)
+        self.assertTrue(Pag._meta.get_field('translated_at_fr').db_index)
+        # The stale flag (which the primary language does not have)
+        self.assertTrue(Pag._meta.get_field('translation_stale_fr').db_index)
+        self.assertFalse('translation_stale' in field_names)
+
+    def testModelsWithoutTrackingHaveNoTimestamps(self):
+        field_names = [f.name for f in Foo._meta.fields]
+        self.assertFalse('translated_at' in field_names)
+        self.assertRaises(MultilingualFieldError, Foo.objects.stale_translations, 'fr')
+
+    def testCreationSetsTimestampsOfLanguagesWithContent(self):
+        page = Pag.objects.create(title='Only English')
+        self.assertTrue(page.translated_at is not None)
+        self.assertTrue(page.translated_at_fr is None)
+
+    def testSavingOnlyTouchesModifiedLanguages(self):
+        self.backdate(self.page, 'translated_at')
+        self.backdate(self.page, 'translated_at_fr')
+        page = Pag.objects.get(pk=self.page.pk)
+        source_timestamp = page.translated_at
+
+        translation.activate('fr')
+        page.body = 'Nouveau corps'
+        page.save()
+
+        page = Pag.objects.get(pk=self.page.pk)
+        self.assertEqual(page.translated_at, source_timestamp)
+        self.assertTrue(page.translated_at_fr > source_timestamp)
+
+    def testSavingWithoutChangesDoesNotTouchTimestamps(self):
+        page = Pag.objects.get(pk=self.page.pk)
+        timestamps = (page.translated_at, page.translated_at_fr)
+        page.position = 3
+        page.save()
+
+        page = Pag.objects.get(pk=self.page.pk)
+        self.assertEqual((page.translated_at, page.translated_at_fr), timestamps)
+
+    def testSavingWithUpdateFields(self):
+        self.backdate(self.page, 'translated_at_fr')
+        page = Pag.objects.get(pk=self.page.pk)
+        old_timestamp = page.translated_at_fr
+
+        page.translate(title='Nouveau titre', language='fr')
+        page.save(update_fields=['title_fr'])
+
+        page = Pag.objects.get(pk=self.page.pk)
+        self.assertEqual(page.title_fr, 'Nouveau titre')
+        self.assertTrue(page.translated_at_fr > old_timestamp)
+
+    def testEditingTheSourceMakesTranslationStale(self):
+        self.assertEqual(list(Pag.objects.stale_translations('fr')), [])
+
+        self.backdate(self.page, 'translated_at_fr')
+        self.page.body = 'New body'
+        self.page.save()
+        self.assertEqual(list(Pag.objects.stale_translations('fr')), [self.page])
+
+        translation.activate('fr')
+        self.page.body = 'Nouveau corps'
+        self.page.save()
+        self.assertEqual(list(Pag.objects.stale_translations('fr')), [])
+
+    def testNeverTranslatedIsStale(self):
+        page = Pag.objects.create(title='Only English')
+        self.assertEqual(list(Pag.objects.stale_translations('fr')), [page])
+        self.assertEqual(list(Pag.objects.stale_translations('fr', missing=False)), [])
+        self.assertEqual(list(Pag.objects.stale_translations('en')), [])
+
+    def testStaleFlag(self):
+        page = Pag.objects.get(pk=self.page.pk)
+        self.assertFalse(page.translation_stale_fr)
+        page.title = 'New title'
+        page.save(update_fields=['title'])
+        self.assertTrue(Pag.objects.get(pk=self.page.pk).translation_stale_fr)
+
+        translation.activate('fr')
+        page.title = 'Nouveau titre'
+        page.save(update_fields=['title_fr'])
+        self.assertFalse(Pag.objects.get(pk=self.page.pk).translation_stale_fr)
+
+        # Only indexed fields are filtered on, the timestamps are not compared
+        with CaptureQueriesContext(connection) as context:
+            list(Pag.objects.stale_translations('fr'))
+        self.assertFalse('< "tests_pag"."translated_at"' in context.captured_queries[0]['sql'])
+
+    def testQuerysetUpdateTouchesTimestamps(self):
+        self.backdate(self.page, 'translated_at', days=2)
+        self.backdate(self.page, 'translated_at_fr')
+        self.assertEqual(list(Pag.objects.stale_translations('fr')), [])
+
+        Pag.objects.update(title='Updated title')
+        self.assertEqual(list(Pag.objects.stale_translations('fr')), [self.page])
+
+        translation.activate('fr')
+        Pag.objects.update(title='Titre')
+        self.assertEqual(list(Pag.objects.stale_translations('fr')), [])
+
+    def testLoadedTableTranslationsAreNotModified(self):
+        rev = Rev.objects.create(title='Title', body='Body')
+        rev.translate(title='Titre', body='Corps', language='fr')
+        rev.save()
+        rev = Rev.objects.get(pk=rev.pk)
+        self.assertFalse(rev.translation_stale_fr)
+        translated_at_fr = rev.translated_at_fr
+
+        # The "table" translations are loaded by the queryset after the object is created
+        translation.activate('fr')
+        rev = list(Rev.objects.filter(pk=rev.pk))[0]
+        self.assertEqual(rev.body, 'Corps')
+        translation.activate('en')
+        rev.title = 'New title'
+        rev.save()
+
+        rev = Rev.objects.get(pk=rev.pk)
+        self.assertTrue(rev.translation_stale_fr)
+        self.assertEqual(rev.translated_at_fr, translated_at_fr)
+
+        # And the ones loaded when they are read
+        rev.translate(body='Nouveau corps', language='fr')
+        rev.save()
+        self.assertFalse(Rev.objects.get(pk=rev.pk).translation_stale_fr)
+
+    def testQuerysetUpdateOfOtherFieldsDoesNotTouchTimestamps(self):
+        page = Pag.objects.get(pk=self.page.pk)
+        Pag.objects.update(position=5)
+        self.assertEqual(Pag.objects.get(pk=self.page.pk).translated_at, page.translated_at)
+
+
+class TranslationLanguagesTests(LinguoTests):
+
+    def testOnlyConfiguredLanguagesHaveFields(self):
+        self.assertEqual([f.name for f in Kit._meta.fields], ['id', 'name', 'name_fr', 'note'])
+        self.assertEqual([f.name for f in Bin._meta.fields], ['id', 'name'])
+        self.assertEqual(Kit._meta.translation_languages, {'name': ('en', 'fr'), 'note': ('en',)})
+
+    def testUnsupportedLanguageFallsBackToPrimary(self):
+        kit = Kit.objects.create(name='Kit', note='Note')
+
+        translation.activate('fr')
+        self.assertEqual(kit.note, 'Note')
+        kit.name = 'Trousse'
+        kit.save()
+
+        kit = Kit.objects.get(pk=kit.pk)
+        self.assertEqual(kit.name, 'Trousse')
+        self.assertEqual(kit.note, 'Note')
+
+        translation.activate('en')
+        self.assertEqual(kit.name, 'Kit')
+
+    def testCannotSetUnsupportedLanguage(self):
+        kit = Kit.objects.create(name='Kit', note='Note')
+
+        # Setting it would overwrite the primary language
+        translation.activate('fr')
+        with self.assertRaises(MultilingualFieldError):
+            kit.note = 'Remarque'
+        self.assertRaises(MultilingualFieldError, kit.translate, language='fr', note='Remarque')
+        self.assertEqual(kit.note_en, 'Note')
+
+        translation.activate('en')
+        kit.note = 'Changed note'
+        self.assertEqual(kit.note, 'Changed note')
+
+    def testCannotUpdateUnsupportedLanguage(self):
+        kit = Kit.objects.create(name='Kit', note='Note')
+        obj = Bin.objects.create(name='Bin')
+
+        translation.activate('fr')
+        self.assertRaises(MultilingualFieldError, Kit.objects.filter(pk=kit.pk).update, note='Remarque')
+        self.assertRaises(MultilingualFieldError, Bin.objects.filter(pk=obj.pk).update, name='Poubelle')
+        self.assertRaises(MultilingualFieldError, Kit.objects.for_language('fr').update, note='Remarque')
+        self.assertEqual(Kit.objects.filter(pk=kit.pk).update(name='Trousse'), 1)
+
+        translation.activate('en')
+        self.assertEqual((Kit.objects.get(pk=kit.pk).note, Bin.objects.get(pk=obj.pk).name), ('Note', 'Bin'))
+        self.assertEqual(Kit.objects.filter(pk=kit.pk).update(note='Changed note'), 1)
+        self.assertEqual(Kit.objects.filter(pk=kit.pk).update(note_en='Note'), 1)
+
+    def testCreationInUnsupportedLanguage(self):
+        translation.activate('fr')
+        obj = Bin.objects.create(name='Bin')
+        translation.activate('en')
+        self.assertEqual(Bin.objects.get(pk=obj.pk).name, 'Bin')
+
+    def testLookupsInUnsupportedLanguageUsePrimaryField(self):
+        kit = Kit.objects.create(name='Kit', note='Note')
+        kit.translate(name='Trousse', language='fr')
+        kit.save()
+
+        translation.activate('fr')
+        self.assertEqual(list(Kit.objects.filter(note='Note', name='Trousse')), [kit])
+        self.assertEqual(list(Kit.objects.order_by('note')), [kit])
+
+    def testFormOnlyHasConfiguredLanguages(self):
+        form = MultilingualKitForm()
+        self.assertEqual(sorted(form.fields.keys()), ['name', 'name_fr', 'note'])
+
+    def testUniqueTogetherIsRewrittenForConfiguredLanguages(self):
+        self.assertEqual(sorted(Kit._meta.unique_together),
+            [('name', 'note'), ('name_fr', 'note')]
+        )
+
+    def testTranslationQueueSkipsUntranslatedFields(self):
+        kit = Kit.objects.create(name='Kit', note='Note')
+        self.assertEqual(list(Kit.objects.missing_translation('fr')), [kit])
+        self.assertEqual(list(Bin.objects.missing_translation('fr')), [])
+        self.assertRaises(MultilingualFieldError, Kit.objects.missing_translation, 'fr', ['note'])
+
+    def testInvalidLanguage(self):
+        def create_model():
+            class Zap(MultilingualModel):
+                name = models.CharField(max_length=255)
+
+                class Meta:
+                    translate = ('name',)
+                    translate_languages = ('de',)
+        self.assertRaises(MultilingualFieldError, create_model)
+
+    def testLanguagesForFieldThatIsNotTranslatable(self):
+        def create_model():
+            class Zap(MultilingualModel):
+                name = models.CharField(max_length=255)
+
+                class Meta:
+                    translate = ('name',)
+                    translate_languages = {'price': ('fr',)}
+        self.assertRaises(MultilingualFieldError, create_model)
+
+
+class TableStorageTests(LinguoTests):
+
+    def setUp(self):
+        super(TableStorageTests, self).setUp()
+        self.a1 = Art.objects.create(title='First', body='B english')
+        self.a1.translate(title='Premier', body='C francais', language='fr')
+        self.a1.save()
+        self.a2 = Art.objects.create(title='Second', body='A english')
+        self.a2.translate(title='Deuxieme', body='D francais', language='fr')
+        self.a2.save()
+
+    def testOnlyPrimaryLanguageIsStoredOnTheModel(self):
+        self.assertEqual([f.name for f in Art._meta.fields], ['id', 'title', 'title_fr', 'body'])
+        translation_model = Art._meta.translation_models['body']
+        self.assertEqual(translation_model._meta.db_table, 'tests_art_translation')
+        self.assertEqual(
+            list(translation_model.objects.values_list('object', 'language', 'field', 'value').order_by('value')),
+            [(self.a1.pk, 'fr', 'body', 'C francais'), (self.a2.pk, 'fr', 'body', 'D francais')]
+        )
+
+    def testReadingAndWriting(self):
+        art = Art.objects.get(pk=self.a1.pk)
+        self.assertEqual(art.body, 'B english')
+        translation.activate('fr')
+        self.assertEqual(art.body, 'C francais')
+
+        art.body = 'Nouveau'
+        art.save()
+        art = Art.objects.get(pk=self.a1.pk)
+        self.assertEqual(art.body, 'Nouveau')
+        translation.activate('en')
+        self.assertEqual(art.body, 'B english')
+
+    def testCreationInSecondaryLanguage(self):
+        translation.activate('fr')
+        art = Art.objects.create(title='Titre', body='Corps')
+        art = Art.objects.get(pk=art.pk)
+        self.assertEqual(art.body, 'Corps')
+        translation.activate('en')
+        self.assertEqual(art.body, '')
+
+    def testMissingTranslationIsEmpty(self):
+        art = Art.objects.create(title='Third', body='Body')
+        translation.activate('fr')
+        self.assertEqual(Art.objects.get(pk=art.pk).body, '')
+
+    def testTranslationsAreLoadedInBatch(self):
+        translation.activate('fr')
+        with self.assertNumQueries(2):
+            bodies = [art.body for art in Art.objects.order_by('pk')]
+        self.assertEqual(bodies, ['C francais', 'D francais'])
+
+        # The primary language does not need the translation table
+        translation.activate('en')
+        with self.assertNumQueries(1):
+            bodies = [art.body for art in Art.objects.order_by('pk')]
+        self.assertEqual(bodies, ['B english', 'A english'])
+
+    def testFiltering(self):
+        translation.activate('fr')
+        self.assertEqual(list(Art.objects.filter(body='C francais')), [self.a1])
+        self.assertEqual(list(Art.objects.filter(body__startswith='D', title='Deuxieme')), [self.a2])
+        self.assertEqual(list(Art.objects.exclude(body__startswith='D')), [self.a1])
+
+        translation.activate('en')
+        self.assertEqual(list(Art.objects.filter(body='A english')), [self.a2])
+
+    def testMissingTranslationLookups(self):
+        # An object without a translation matches the value the field has on the object
+        a3 = Art.objects.create(title='Third', body='E english')
+        translation.activate('fr')
+        self.assertEqual(Art.objects.get(pk=a3.pk).body, '')
+        self.assertEqual(list(Art.objects.filter(body='')), [a3])
+        self.assertEqual(list(Art.objects.filter(body__isnull=True)), [])
+        self.assertEqual(Art.objects.filter(body__isnull=False).count(), 3)
+        self.assertEqual(list(Art.objects.filter(body__in=['', 'C francais']).order_by('pk')), [self.a1, a3])
+        self.assertEqual(list(Art.objects.exclude(body='C francais').order_by('pk')), [self.a2, a3])
+        self.assertEqual(list(Art.objects.filter(~Q(body='C francais')).order_by('pk')), [self.a2, a3])
+        self.assertEqual(list(Art.objects.exclude(body='').order_by('pk')), [self.a1, self.a2])
+        self.assertEqual(list(Art.objects.exclude(body__startswith='C', title='Premier').order_by('pk')), [self.a2, a3])
+
+    def testFilteringOnRelatedObjects(self):
+        r1 = ArtRel.objects.create(myart=self.a1, desc='First')
+        r2 = ArtRel.objects.create(myart=self.a2, desc='Second')
+        a3 = Art.objects.create(title='Third', body='E english')
+        r3 = ArtRel.objects.create(myart=a3, desc='Third')
+
+        translation.activate('fr')
+        self.assertEqual(list(ArtRel.objects.filter(myart__body='C francais')), [r1])
+        self.assertEqual(list(ArtRel.objects.filter(myart__body__startswith='D')), [r2])
+        self.assertEqual(list(ArtRel.objects.exclude(myart__body='C francais').order_by('pk')), [r2, r3])
+        self.assertEqual(list(ArtRel.objects.filter(Q(myart__body='') | Q(desc='First')).order_by('pk')), [r1, r3])
+        self.assertEqual(list(Art.objects.filter(artrel__desc='Second', body='D francais')), [self.a2])
+
+        translation.activate('en')
+        self.assertEqual(list(ArtRel.objects.filter(myart__body='A english')), [r2])
+
+    def testRelatedObjectsCannotBeOrderedByTable(self):
+        ArtRel.objects.create(myart=self.a1, desc='First')
+        translation.activate('fr')
+        self.assertRaises(MultilingualFieldError, ArtRel.objects.order_by, 'myart__body')
+        self.assertRaises(MultilingualFieldError, ArtRel.objects.values, 'myart__body')
+        self.assertRaises(MultilingualFieldError, ArtRel.objects.filter, myart__body=F('desc'))
+
+        translation.activate('en')
+        self.assertEqual(list(ArtRel.objects.values_list('myart__body', flat=True)), ['B english'])
+
+    def testOrdering(self):
+        self.assertEqual(list(Art.objects.all()), [self.a2, self.a1])
+        self.assertEqual(list(Art.objects.order_by('-body')), [self.a1, self.a2])
+
+        translation.activate('fr')
+        self.assertEqual(list(Art.objects.all()), [self.a1, self.a2])
+        self.assertEqual(list(Art.objects.order_by('-body')), [self.a2, self.a1])
+
+    def testQuerysetUpdate(self):
+        translation.activate('fr')
+        self.assertEqual(Art.objects.filter(pk=self.a1.pk).update(body='Mis a jour'), 1)
+        self.assertEqual(Art.objects.get(pk=self.a1.pk).body, 'Mis a jour')
+        self.assertEqual(Art.objects.get(pk=self.a2.pk).body, 'D francais')
+
+        translation.activate('en')
+        self.assertEqual(Art.objects.get(pk=self.a1.pk).body, 'B english')
+
+    def testMissingTranslation(self):
+        art = Art.objects.create(title='Third', body='Body')
+        art.translate(title='Troisieme', language='fr')
+        art.save()
+        self.assertEqual(list(Art.objects.missing_translation('fr')), [art])
+        self.assertEqual(list(Art.objects.translated_in('fr')), [self.a1, self.a2])
+
+    def testDeletingRemovesTranslations(self):
+        self.a1.delete()
+        self.assertEqual(Art._meta.translation_models['body'].objects.count(), 1)
+
+    def testTableStorageIsOnlyForTextFields(self):
+        def create_model():
+            class Zip(MultilingualModel):
+                price = models.PositiveIntegerField()
+
+                class Meta:
+                    translate = ('price',)
+                    translate_storage = {'price': 'table'}
+        self.assertRaises(MultilingualFieldError, create_model)
+
+
+class JsonStorageTests(LinguoTests):
+
+    def setUp(self):
+        super(JsonStorageTests, self).setUp()
+        self.p1 = Pen.objects.create(name='Pen', blurb='B english')
+        self.p1.translate(name='Stylo', blurb='C francais', language='fr')
+        self.p1.save()
+        self.p2 = Pen.objects.create(name='Pencil', blurb='A english')
+        self.p2.translate(name='Crayon', blurb='D francais', language='fr')
+        self.p2.save()
+
+    def testTranslationsAreStoredInOneField(self):
+        self.assertEqual([f.name for f in Pen._meta.fields],
+            ['id', 'name', 'name_fr', 'blurb', 'blurb_translations', 'price']
+        )
+        pen = Pen.objects.get(pk=self.p1.pk)
+        self.assertEqual(pen.blurb_translations, {'fr': 'C francais'})
+
+    def testReadingAndWriting(self):
+        pen = Pen.objects.get(pk=self.p1.pk)
+        self.assertEqual(pen.blurb, 'B english')
+        translation.activate('fr')
+        self.assertEqual(pen.blurb, 'C francais')
+
+        pen.blurb = 'Nouveau'
+        pen.save()
+        pen = Pen.objects.get(pk=self.p1.pk)
+        self.assertEqual(pen.blurb, 'Nouveau')
+        translation.activate('en')
+        self.assertEqual(pen.blurb, 'B english')
+
+    def testMissingTranslationLookups(self):
+        # A missing translation matches the value the field has on the object
+        p3 = Pen.objects.create(name='Marker', blurb='E english')
+        translation.activate('fr')
+        self.assertEqual(Pen.objects.get(pk=p3.pk).blurb, '')
+        self.assertEqual(set(Pen.objects.exclude(blurb='C francais')), set([self.p2, p3]))
+        self.assertEqual(set(Pen.objects.filter(~Q(blurb='C francais'))), set([self.p2, p3]))
+        self.assertEqual(list(Pen.objects.filter(blurb='')), [p3])
+        self.assertEqual(list(Pen.objects.filter(blurb__isnull=True)), [])
+        self.assertEqual(Pen.objects.filter(blurb__isnull=False).count(), 3)
+        self.assertEqual(list(Pen.objects.exclude(blurb__isnull=False)), [])
+
+    def testCreationInSecondaryLanguage(self):
+        translation.activate('fr')
+        pen = Pen.objects.create(name='Feutre', blurb='Corps')
+        pen = Pen.objects.get(pk=pen.pk)
+        self.assertEqual(pen.blurb, 'Corps')
+        translation.activate('en')
+        self.assertEqual(pen.blurb, '')
+
+    def testSavingOnlyWritesModifiedLanguages(self):
+        pen = Pen.objects.get(pk=self.p1.pk)
+        stale = Pen.objects.get(pk=self.p1.pk)
+
+        translation.activate('fr')
+        pen.blurb = 'Nouveau'
+        with CaptureQueriesContext(connection) as queries:
+            pen.save()
+        self.assertTrue('json_set' in queries[-1]['sql'])
+
+        # Saving another copy does not overwrite the translation
+        stale.price = 5
+        stale.save()
+        pen = Pen.objects.get(pk=self.p1.pk)
+        self.assertEqual(pen.blurb, 'Nouveau')
+        self.assertEqual(pen.price, 5)
+
+    def testFiltering(self):
+        translation.activate('fr')
+        self.assertEqual(list(Pen.objects.filter(blurb='C francais')), [self.p1])
+        self.assertEqual(list(Pen.objects.filter(blurb__startswith='D')), [self.p2])
+        self.assertEqual(list(Pen.objects.exclude(blurb__startswith='D')), [self.p1])
+        self.assertEqual(list(PenRel.objects.filter(mypen__blurb='C francais')), [])
+
+        rel = PenRel.objects.create(mypen=self.p1)
+        self.assertEqual(list(PenRel.objects.filter(mypen__blurb='C francais')), [rel])
+
+        translation.activate('en')
+        self.assertEqual(list(Pen.objects.filter(blurb='A english')), [self.p2])
+
+    def testOrdering(self):
+        self.assertEqual(list(Pen.objects.order_by('blurb')), [self.p2, self.p1])
+        translation.activate('fr')
+        self.assertEqual(list(Pen.objects.order_by('blurb')), [self.p1, self.p2])
+        self.assertEqual(list(Pen.objects.order_by('-blurb')), [self.p2, self.p1])
+
+    def testQuerysetUpdate(self):
+        translation.activate('fr')
+        Pen.objects.filter(pk=self.p1.pk).update(blurb='Mis a jour', price=3)
+        pen = Pen.objects.get(pk=self.p1.pk)
+        self.assertEqual(pen.blurb, 'Mis a jour')
+        self.assertEqual(pen.price, 3)
+        self.assertEqual(Pen.objects.get(pk=self.p2.pk).blurb, 'D francais')
+
+        translation.activate('en')
+        self.assertEqual(Pen.objects.get(pk=self.p1.pk).blurb, 'B english')
+
+    def testMissingTranslation(self):
+        pen = Pen.objects.create(name='Marker', blurb='Blurb')
+        pen.translate(name='Marqueur', language='fr')
+        pen.save()
+        self.assertEqual(list(Pen.objects.missing_translation('fr')), [pen])
+        self.assertEqual(list(Pen.objects.translated_in('fr')), [self.p1, self.p2])
+
+
+class FieldOrderingTests(LinguoTests):
+
+    def testLanguageFieldsFollowTheirField(self):
+        self.assertEqual([field.name for field in Moe._meta.fields],
+            ['id', 'name', 'name_fr', 'price', 'description', 'description_fr', 'quantity']
+        )
+
+    def testCreationCountersAreIntegers(self):
+        self.assertEqual(
+            [field.creation_counter for field in Moe._meta.fields[1:]],
+            sorted(set([field.creation_counter for field in Moe._meta.fields[1:]]))
+        )
+        for field in Moe._meta.fields:
+            self.assertTrue(isinstance(field.creation_counter, six.integer_types))
+
+        # A field that is declared after the model is numbered after its fields
+        self.assertTrue(models.CharField(max_length=1).creation_counter > Moe._meta.get_field('quantity').creation_counter)
+
+    def testMoreThanTenThousandLanguages(self):
+        languages = [('en', 'English')] + [('l%d' % i, 'Language %d' % i) for i in range(10001)]
+        with override_settings(LANGUAGES=languages):
+            attrs = {
+                '__module__': __name__,
+                'name': models.CharField(max_length=255, verbose_name=_('name')),
+                'price': models.PositiveIntegerField(verbose_name=_('price')),
+            }
+
+            class Meta:
+                app_label = 'tests'
+                apps = Apps()
+                translate = ('name',)
+            attrs['Meta'] = Meta
+            model = MultilingualModelBase('Lot', (MultilingualModel,), attrs)
+
+        self.assertEqual([field.name for field in model._meta.fields],
+            ['id', 'name'] + ['name_l%d' % i for i in range(10001)] + ['price']
+        )
+
+
+@override_settings(LANGUAGES=(('en', 'English'), ('pt', 'Portuguese'), ('pt-br', 'Brazilian Portuguese'),
+    ('fr', 'French')))
+class RegionalLanguageTests(LinguoTests):
+
+    def create_model(self):
+        class Loc(MultilingualModel):
+            name = models.CharField(max_length=255, verbose_name=_('name'))
+            note = models.CharField(max_length=255, blank=True, verbose_name=_('note'))
+
+            class Meta:
+                app_label = 'tests'
+                apps = Apps()
+                translate = ('name', 'note',)
+                translate_languages = {'note': ('pt',)}
+        return Loc
+
+    def testFallbackChains(self):
+        self.assertEqual(get_language_chains(), {
+            'en': ('en',), 'pt': ('pt', 'en'), 'pt-br': ('pt-br', 'pt', 'en'), 'fr': ('fr', 'en'),
+        })
+
+    def testNormalizedLanguage(self):
+        self.assertEqual(get_normalized_language('pt-br'), 'pt-br')
+        self.assertEqual(get_normalized_language('pt-BR'), 'pt-br')
+        self.assertEqual(get_normalized_language('pt-pt'), 'pt')
+        self.assertEqual(get_normalized_language('fr-ca'), 'fr')
+        self.assertEqual(get_normalized_language('en-us'), 'en')
+
+    def testRegionalFields(self):
+        model = self.create_model()
+        self.assertEqual([field.name for field in model._meta.fields],
+            ['id', 'name', 'name_pt', 'name_pt_br', 'name_fr', 'note', 'note_pt']
+        )
+        self.assertEqual(model._meta.get_field('name_pt_br').verbose_name, 'name (Brazilian Portuguese)')
+
+    def testGetAndSetRegionalValues(self):
+        model = self.create_model()
+        obj = model(name='Bus', note='Note')
+        obj.translate(language='pt', name='Autocarro', note='Nota')
+        obj.translate(language='pt-br', name='Onibus')
+
+        self.assertEqual(obj.name_pt, 'Autocarro')
+        self.assertEqual(obj.name_pt_br, 'Onibus')
+        # note is not translated into pt-br, so it falls back to pt
+        self.assertEqual(obj.note_pt, 'Nota')
+        with translation.override('pt-br'):
+            self.assertEqual(obj.name, 'Onibus')
+            self.assertEqual(obj.note, 'Nota')
+        with translation.override('pt-pt'):
+            self.assertEqual(obj.name, 'Autocarro')
+        with translation.override('fr'):
+            self.assertEqual(obj.note, 'Note')
+
+    def testLookupsUseTheFallbackChain(self):
+        model = self.create_model()
+        with translation.override('pt-br'):
+            self.assertTrue('"name_pt_br" = ' in str(model.objects.filter(name='Onibus').query))
+            self.assertTrue('"note_pt" = ' in str(model.objects.filter(note='Nota').query))
+        with translation.override('pt-pt'):
+            self.assertTrue('"name_pt" = ' in str(model.objects.filter(name='Autocarro').query))
+
+
+class FallbackTests(LinguoTests):
+
+    def testEmptyTranslationFallsBackToPrimary(self):
+        obj = Tip.objects.create(title='Hello', body='Body')
+        translation.activate('fr')
+        self.assertEqual(obj.title, 'Hello')
+        self.assertEqual(obj.get_translation_source('title'), 'en')
+
+        obj.title = 'Bonjour'
+        self.assertEqual(obj.title, 'Bonjour')
+        self.assertEqual(obj.get_translation_source('title'), 'fr')
+        # The primary language is not modified by the fallback
+        self.assertEqual(obj.title_en, 'Hello')
+        self.assertEqual(obj.body, 'Body')
+
+    def testFallbackAfterLoading(self):
+        obj = Tip.objects.create(title='Hello', body='Body')
+        obj.translate(language='fr', body='Corps')
+        obj.save()
+
+        obj = Tip.objects.get(pk=obj.pk)
+        translation.activate('fr')
+        self.assertEqual(obj.title, 'Hello')
+        self.assertEqual(obj.body, 'Corps')
+        self.assertEqual(obj.get_translation_source('body'), 'fr')
+        # Lookups are not affected
+        self.assertEqual(Tip.objects.filter(title='Hello').count(), 0)
+
+    def testResolvedValuesAreMemoized(self):
+        obj = Tip.objects.create(title='Hello')
+        translation.activate('fr')
+        self.assertEqual(obj.title, 'Hello')
+        self.assertEqual(obj._fallback_values['title'], {'fr': ('Hello', 'en')})
+
+        # The memo is reset when a translation is written
+        obj.title_en = 'Changed'
+        self.assertEqual(obj.title, 'Changed')
+        obj.translate(language='en', title='Again')
+        self.assertEqual(obj.title, 'Again')
+        obj.title_fr = 'Bonjour'
+        self.assertEqual(obj.title, 'Bonjour')
+        self.assertEqual(obj.get_translation_source('title'), 'fr')
+        obj.title_fr = ''
+        self.assertEqual(obj.title, 'Again')
+
+    def testMemoIsResetOnSaveAndDeferredLoading(self):
+        obj = Tip.objects.create(title='Hello')
+        translation.activate('fr')
+        self.assertEqual(obj.title, 'Hello')
+        obj.save()
+        self.assertNotIn('_fallback_values', obj.__dict__)
+
+        Tip.objects.filter(pk=obj.pk).update(title_fr='Bonjour')
+        obj = Tip.objects.defer('title_fr').get(pk=obj.pk)
+        # The deferred translation is loaded to resolve the value
+        self.assertEqual(obj.title, 'Bonjour')
+        obj.title_fr = ''
+        self.assertEqual(obj.title, 'Hello')
+
+    def testOnlyModelsWithFallbackResetTheMemo(self):
+        # The models without translate_fallback assign their translations as plain attributes
+        self.assertFalse('__setattr__' in MultilingualModel.__dict__)
+        self.assertFalse([name for name in Foo._meta.translation_attnames if name in Foo.__dict__
+            and not isinstance(Foo.__dict__[name], property)])
+        self.assertTrue(isinstance(Tip.__dict__['title_fr'], FallbackResetAttribute))
+
+        obj = Tip(title='Hello')
+        translation.activate('fr')
+        self.assertEqual(obj.title, 'Hello')
+        obj.title_fr = 'Bonjour'
+        self.assertEqual(obj.title, 'Bonjour')
+        self.assertEqual(obj.__dict__['title_fr'], 'Bonjour')
+
+    def testForcedLanguageDoesNotFallBack(self):
+        obj = Tip(title='Hello')
+        obj._force_language = 'fr'
+        self.assertEqual(obj.title, '')
+        self.assertEqual(obj.get_translation_source('title'), 'fr')
+
+    def testNoFallbackByDefault(self):
+        obj = Foo.objects.create(name='Hello', price=10)
+        translation.activate('fr')
+        self.assertEqual(obj.name, '')
+        self.assertEqual(obj.get_translation_source('name'), 'fr')
+
+
+class RelationLookupTests(LinguoTests):
+
+    def setUp(self):
+        super(RelationLookupTests, self).setUp()
+        self.foo = Foo.objects.create(name='English Foo', price=10)
+        self.foo.translate(language='fr', name='French Foo')
+        self.foo.save()
+        self.cat = self.foo.categories.create(name='C1')
+        self.cat.translate(language='fr', name='C1 fr')
+        self.cat.save()
+        self.foorel = FooRel.objects.create(myfoo=self.foo, desc='Rel')
+
+    def testReverseManyToMany(self):
+        translation.activate('fr')
+        self.assertEqual(list(FooCategory.objects.filter(foo__name='French Foo')), [self.cat])
+        self.assertEqual(FooCategory.objects.filter(foo__name='English Foo').count(), 0)
+
+    def testForwardManyToMany(self):
+        translation.activate('fr')
+        self.assertEqual(list(Foo.objects.filter(categories__name='C1 fr')), [self.foo])
+        self.assertEqual(list(FooRel.objects.filter(myfoo__categories__name='C1 fr')), [self.foorel])
+
+    def testReverseForeignKey(self):
+        translation.activate('fr')
+        self.assertEqual(list(Foo.objects.filter(foorel__myfoo__name='French Foo')), [self.foo])
+        self.assertEqual(list(FooCategory.objects.filter(foo__foorel__myfoo__name='French Foo')), [self.cat])
+        self.assertEqual(Foo.objects.filter(foorel__myfoo__name='English Foo').count(), 0)
+
+    def testReverseParentLink(self):
+        bar = Bar.objects.create(name='English Bar', price=1, quantity=1, description='Desc')
+        bar.translate(language='fr', name='French Bar', description='Desc fr')
+        bar.save()
+        BarRel.objects.create(mybar=bar, desc='Rel')
+
+        translation.activate('fr')
+        self.assertEqual(Foo.objects.filter(bar__description='Desc fr').count(), 1)
+        self.assertEqual(Foo.objects.filter(bar__barrel__mybar__description='Desc fr').count(), 1)
+
+    def testRelationsAreComputedOnce(self):
+        relations = get_fields_to_translatable_models(Foo)
+        self.assertTrue(relations is get_fields_to_translatable_models(Foo))
+        self.assertEqual(relations['foorel'], FooRel)
+        self.assertEqual(relations['categories'], FooCategory)
+        self.assertEqual(get_fields_to_translatable_models(FooCategory)['foo'], Foo)
+
+    def testRelationsAreKeptForDeferredClasses(self):
+        Foo.objects.create(name='Foo', price=1)
+        relations = get_fields_to_translatable_models(Foo)
+        # A deferred class is created for this combination of fields
+        list(Foo.objects.defer('price', 'name_fr', 'name'))
+        list(FooCategory.objects.only('id'))
+        self.assertTrue(relations is get_fields_to_translatable_models(Foo))
+
+
+class PrefetchTests(LinguoTests):
+
+    def setUp(self):
+        super(PrefetchTests, self).setUp()
+        self.foo = Foo.objects.create(name='English Foo', price=10)
+        self.foo.translate(language='fr', name='French Foo')
+        self.foo.save()
+        self.cat = self.foo.categories.create(name='C1')
+        self.cat.translate(language='fr', name='C1 fr')
+        self.cat.save()
+        self.foorel = FooRel.objects.create(myfoo=self.foo, desc='Rel')
+
+    def testDeferTranslations(self):
+        obj = Foo.objects.defer_translations().get(pk=self.foo.pk)
+        self.assertTrue('name_en' in obj.__dict__)
+        self.assertFalse('name_fr' in obj.__dict__)
+        self.assertEqual(obj.name, 'English Foo')
+
+        obj = Foo.objects.defer_translations('fr').get(pk=self.foo.pk)
+        self.assertTrue('name_fr' in obj.__dict__)
+
+        translation.activate('fr')
+        obj = Foo.objects.defer_translations().get(pk=self.foo.pk)
+        self.assertTrue('name_fr' in obj.__dict__)
+        self.assertEqual(obj.name, 'French Foo')
+
+    def testPrefetchLoadsEveryLanguageByDefault(self):
+        with self.assertNumQueries(2):
+            foos = list(Foo.objects.prefetch_related('categories'))
+            cat = foos[0].categories.all()[0]
+            self.assertEqual(cat.name, 'C1')
+            self.assertEqual(cat.name_fr, 'C1 fr')
+        self.assertTrue('name_fr' in cat.__dict__)
+
+        rels = list(FooRel.objects.prefetch_related('myfoo'))
+        self.assertTrue('name_fr' in rels[0].myfoo.__dict__)
+
+    def testDeferredPrefetchOnlyLoadsTheActiveLanguage(self):
+        with self.assertNumQueries(2):
+            foos = list(Foo.objects.defer_translations().prefetch_related('categories'))
+            cat = foos[0].categories.all()[0]
+            self.assertEqual(cat.name, 'C1')
+        self.assertFalse('name_fr' in cat.__dict__)
+        self.assertEqual(cat.name_fr, 'C1 fr')  # Loaded on demand
+
+        translation.activate('fr')
+        foos = list(Foo.objects.prefetch_related('categories').defer_translations())
+        self.assertEqual(foos[0].categories.all()[0].name, 'C1 fr')
+
+        # With the language given to defer_translations
+        translation.activate('en')
+        foos = list(Foo.objects.defer_translations('fr').prefetch_related('categories'))
+        self.assertTrue('name_fr' in foos[0].categories.all()[0].__dict__)
+
+    def testPrefetchAcrossRelations(self):
+        with self.assertNumQueries(3):
+            cats = list(FooCategory.objects.defer_translations().prefetch_related('foo_set__foorel_set'))
+            foo = cats[0].foo_set.all()[0]
+            self.assertEqual(foo.name, 'English Foo')
+            self.assertEqual(list(foo.foorel_set.all()), [self.foorel])
+        self.assertFalse('name_fr' in foo.__dict__)
+
+        # The model of the queryset does not need to be translatable
+        rels = list(FooRel.objects.defer_translations().prefetch_related('myfoo'))
+        self.assertFalse('name_fr' in rels[0].myfoo.__dict__)
+        self.assertEqual(rels[0].myfoo, self.foo)
+
+    def testDeferredPrefetchQueryset(self):
+        qs = FooCategory.objects.defer_translations()
+        foo = Foo.objects.prefetch_related(Prefetch('categories', queryset=qs))[0]
+        self.assertFalse('name_fr' in foo.categories.all()[0].__dict__)
+
+    def testCustomPrefetchQueryset(self):
+        FooCategory.objects.create(name='D1')
+        translation.activate('fr')
+        qs = FooCategory.objects.filter(name__startswith='C1')
+        foo = Foo.objects.prefetch_related(Prefetch('categories', queryset=qs, to_attr='cats'))[0]
+        self.assertEqual([cat.name for cat in foo.cats], ['C1 fr'])
+
+        translation.activate('en')
+        qs = FooCategory.objects.only('id', 'name', 'name_fr')
+        foo = Foo.objects.prefetch_related(Prefetch('categories', queryset=qs))[0]
+        self.assertTrue('name_fr' in foo.categories.all()[0].__dict__)
+
+    def testFallbackLanguagesAreLoaded(self):
+        Tip.objects.create(title='Hello')
+        translation.activate('fr')
+        obj = Tip.objects.defer_translations()[0]
+        self.assertTrue('title_en' in obj.__dict__)
+        self.assertTrue('title_fr' in obj.__dict__)
+
+
+class AggregationTests(LinguoTests):
+
+    def setUp(self):
+        super(AggregationTests, self).setUp()
+        for name, french_name, price in [('A', 'X', 1), ('B', 'X', 2), ('C', 'Y', 3)]:
+            obj = Foo.objects.create(name=name, price=price)
+            obj.translate(language='fr', name=french_name)
+            obj.save()
+
+    def testGroupByTranslatableField(self):
+        translation.activate('fr')
+        self.assertEqual(list(Foo.objects.values('name').annotate(n=Count('id')).order_by('name')),
+            [{'name': 'X', 'n': 2}, {'name': 'Y', 'n': 1}]
+        )
+        translation.activate('en')
+        self.assertEqual(Foo.objects.values('name').annotate(n=Count('id')).count(), 3)
+
+    def testAggregate(self):
+        translation.activate('fr')
+        self.assertEqual(Foo.objects.aggregate(Max('name')), {'name__max': 'Y'})
+        self.assertEqual(Foo.objects.aggregate(n=Count('name', distinct=True)), {'n': 2})
+        translation.activate('en')
+        self.assertEqual(Foo.objects.aggregate(Max('name')), {'name__max': 'C'})
+        self.assertEqual(Foo.objects.aggregate(n=Count('name', distinct=True)), {'n': 3})
+
+    def testAnnotateAcrossRelations(self):
+        cat = FooCategory.objects.create(name='Cat')
+        for obj in Foo.objects.all():
+            obj.categories.add(cat)
+        translation.activate('fr')
+        cat = FooCategory.objects.annotate(Count('foo__name', distinct=True)).get(pk=cat.pk)
+        self.assertEqual(cat.foo__name__count, 2)
+        qs = Foo.objects.annotate(longest=Max('name')).order_by('-longest', 'price')
+        self.assertEqual([obj.price for obj in qs], [3, 1, 2])
+
+    def testValuesList(self):
+        translation.activate('fr')
+        self.assertEqual(sorted(Foo.objects.values_list('name', flat=True)), ['X', 'X', 'Y'])
+        self.assertEqual(sorted(Foo.objects.values_list('name', flat=True).distinct()), ['X', 'Y'])
+        self.assertEqual(Foo.objects.values('name', 'name_en').order_by('price')[0], {'name': 'X', 'name_en': 'A'})
+
+    def testDistinctFields(self):
+        translation.activate('fr')
+        self.assertEqual(tuple(Foo.objects.distinct('name').query.distinct_fields), ('name_fr',))
+
+    def testNotStoredInColumns(self):
+        translation.activate('fr')
+        self.assertRaises(MultilingualFieldError, Art.objects.values, 'body')
+        self.assertRaises(MultilingualFieldError, Art.objects.aggregate, Max('body'))
+
+
+class ExpressionTests(LinguoTests):
+
+    def setUp(self):
+        super(ExpressionTests, self).setUp()
+        self.same = Foo.objects.create(name='Taxi', price=1)
+        self.same.translate(language='fr', name='Taxi')
+        self.same.save()
+        self.other = Foo.objects.create(name='Car', price=2)
+        self.other.translate(language='fr', name='Voiture')
+        self.other.save()
+
+    def testFExpression(self):
+        translation.activate('fr')
+        self.assertEqual(list(Foo.objects.filter(name=F('name_en'))), [self.same])
+        self.assertEqual(list(Foo.objects.exclude(name=F('name_en'))), [self.other])
+
+        FooRel.objects.create(myfoo=self.other, desc='Voiture')
+        FooRel.objects.create(myfoo=self.same, desc='Car')
+        self.assertEqual([rel.desc for rel in FooRel.objects.filter(desc=F('myfoo__name'))], ['Voiture'])
+
+    def testQObjects(self):
+        translation.activate('fr')
+        self.assertEqual(Foo.objects.filter(Q(name='Voiture') | Q(name='Car')).count(), 1)
+        self.assertEqual(Foo.objects.filter(~Q(name=F('name_en'))).count(), 1)
+        self.assertEqual(Foo.objects.filter(Q(price=1) | Q(name__startswith='Voi')).count(), 2)
+
+    def testUpdateWithFExpression(self):
+        translation.activate('fr')
+        Foo.objects.filter(pk=self.other.pk).update(name=F('name_en'))
+        self.assertEqual(Foo.objects.get(pk=self.other.pk).name, 'Car')
+
+    def testSubqueryOnTranslatableField(self):
+        cat = FooCategory.objects.create(name='Vehicle')
+        cat.translate(language='fr', name='Voiture')
+        cat.save()
+
+        translation.activate('fr')
+        qs = Foo.objects.filter(name__in=FooCategory.objects.values('name'))
+        self.assertEqual(list(qs), [self.other])
+        translation.activate('en')
+        self.assertEqual(qs.count(), 1)  # Built in French
+        self.assertEqual(Foo.objects.filter(name__in=FooCategory.objects.values('name')).count(), 0)
+
+    def testTableStorage(self):
+        art = Art.objects.create(title='Title', body='Body')
+        art.translate(language='fr', body='Corps')
+        art.save()
+
+        translation.activate('fr')
+        self.assertEqual(Art.objects.filter(Q(body='Corps') | Q(title='Other')).count(), 1)
+        self.assertRaises(MultilingualFieldError, Art.objects.filter, title=F('body'))
+
+
+class LanguageBindingTests(LinguoTests):
+
+    def setUp(self):
+        super(LanguageBindingTests, self).setUp()
+        self.car = Foo.objects.create(name='Car', price=1)
+        self.car.translate(language='fr', name='Voiture')
+        self.car.save()
+        self.bike = Foo.objects.create(name='Bike', price=2)
+        self.bike.translate(language='fr', name='Velo')
+        self.bike.save()
+
+    def testLookupsAndOrdering(self):
+        qs = Foo.objects.for_language('fr')
+        self.assertEqual(list(qs.filter(name='Voiture')), [self.car])
+        self.assertEqual(qs.filter(name='Car').count(), 0)
+        self.assertEqual([obj.pk for obj in qs.order_by('-name')], [self.car.pk, self.bike.pk])
+        self.assertEqual([row['name'] for row in qs.values('name').order_by('name')], ['Velo', 'Voiture'])
+        self.assertEqual(translation.get_language(), 'en')
+
+    def testDefaultOrdering(self):
+        cat1 = FooCategory.objects.create(name='A')
+        cat1.translate(language='fr', name='Z')
+        cat1.save()
+        cat2 = FooCategory.objects.create(name='B')
+        cat2.translate(language='fr', name='Y')
+        cat2.save()
+
+        self.assertEqual(list(FooCategory.objects.all()), [cat1, cat2])
+        self.assertEqual(list(FooCategory.objects.for_language('fr')), [cat2, cat1])
+        self.assertEqual(list(FooCategory.objects.all().in_language('fr').order_by('pk')), [cat1, cat2])
+
+    def testClonesKeepLanguage(self):
+        qs = Foo.objects.all().in_language('fr').filter(price__gte=1).exclude(price=2)
+        self.assertEqual(list(qs.filter(name='Voiture')), [self.car])
+
+        obj = qs.get()
+        self.assertEqual(obj.name, 'Voiture')
+
+    def testBindingOnlyAffectsLaterCalls(self):
+        truck = Foo.objects.create(name='Truck', price=3)
+        truck.translate(language='fr', name='Camion')
+        truck.save()
+
+        # The lookups and ordering applied before binding stay in the active language
+        qs = Foo.objects.filter(name__in=['Car', 'Truck']).order_by('name').in_language('fr')
+        self.assertEqual([obj.name for obj in qs], ['Voiture', 'Camion'])
+        qs = Foo.objects.order_by('name').in_language('fr')
+        self.assertEqual(list(qs), [self.bike, self.car, truck])
+
+        # The ones applied after binding are in the bound language
+        qs = Foo.objects.all().in_language('fr').filter(name__in=['Camion', 'Car']).order_by('name')
+        self.assertEqual(list(qs), [truck])
+        self.assertEqual(list(Foo.objects.all().in_language('fr').order_by('name')), [truck, self.bike, self.car])
+
+    def testBoundInstances(self):
+        obj = Foo.objects.for_language('fr').get(pk=self.car.pk)
+        self.assertEqual(obj.name, 'Voiture')
+        self.assertEqual(obj.name_en, 'Car')
+        obj.name = 'Automobile'
+        obj.save()
+
+        obj = Foo.objects.get(pk=self.car.pk)
+        self.assertEqual(obj.name, 'Car')
+        self.assertEqual(obj.name_fr, 'Automobile')
+
+        translation.activate('fr')
+        obj = Foo.objects.for_language('en').get(pk=self.car.pk)
+        self.assertEqual(obj.name, 'Car')
+
+    def testCreate(self):
+        obj = Foo.objects.for_language('fr').create(name='Camion', price=3)
+        self.assertEqual(obj.name, 'Camion')
+        self.assertEqual(obj.name_fr, 'Camion')
+        self.assertEqual(obj.name_en, '')
+
+        obj, created = Foo.objects.for_language('fr').get_or_create(name='Velo', price=2)
+        self.assertFalse(created)
+        self.assertEqual(obj.pk, self.bike.pk)
+        obj, created = Foo.objects.for_language('fr').get_or_create(name='Moto', price=4)
+        self.assertTrue(created)
+        self.assertEqual(Foo.objects.get(pk=obj.pk).name_fr, 'Moto')
+
+    def testPrefetch(self):
+        cat = FooCategory.objects.create(name='Vehicle')
+        cat.translate(language='fr', name='Vehicule')
+        cat.save()
+        self.car.categories.add(cat)
+
+        foo = Foo.objects.for_language('fr').prefetch_related('categories').get(pk=self.car.pk)
+        self.assertEqual([c.name for c in foo.categories.all()], ['Vehicule'])
+
+    def testInvalidLanguage(self):
+        self.assertRaises(MultilingualFieldError, Foo.objects.for_language, 'xx')
+        self.assertRaises(MultilingualFieldError, Foo.objects.all().in_language, 'xx')
+
+
+class LanguagePropagationTests(LinguoTests):
+
+    def setUp(self):
+        super(LanguagePropagationTests, self).setUp()
+        self.foo = Foo.objects.create(name='Car', price=1)
+        self.foo.translate(language='fr', name='Voiture')
+        self.foo.save()
+
+    def testConcurrentThreads(self):
+        results = {}
+
+        def work(index):
+            time.sleep(0.001)  # Let the other threads interleave
+            sql = str(Foo.objects.filter(name='Car').query).split('WHERE')[1]
+            results[index] = (get_current_language(), 'name_fr' in sql, self.foo.name)
+
+        threads = []
+        for index in range(50):
+            translation.activate('fr' if index % 2 else 'en')
+            threads.append(threading.Thread(target=propagate_language(work), args=(index,)))
+        translation.activate('en')
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for index in range(50):
+            if index % 2:
+                self.assertEqual(results[index], ('fr', True, 'Voiture'))
+            else:
+                self.assertEqual(results[index], ('en', False, 'Car'))
+
+    def testRestoresLanguage(self):
+        translation.activate('fr')
+        wrapped = propagate_language(lambda: self.foo.name)
+        translation.activate('en')
+        self.assertEqual(wrapped(), 'Voiture')
+        self.assertEqual(translation.get_language(), 'en')
+
+
+class FormFactoryTests(LinguoTests):
+
+    def testFieldsInLanguages(self):
+        form_class = multilingual_modelform_factory(Bar, ['fr'])
+        self.assertEqual(
+            list(form_class.base_fields.keys()),
+            ['price', 'name_fr', 'quantity', 'description_fr', 'categories']
+        )
+
+        form_class = multilingual_modelform_factory(Bar, ['en', 'fr'], fields=['name', 'price'])
+        self.assertEqual(list(form_class.base_fields.keys()), ['name', 'name_fr', 'price'])
+
+        # Languages that are not stored in columns are left out
+        form_class = multilingual_modelform_factory(Art, ['fr'])
+        self.assertEqual(list(form_class.base_fields.keys()), ['title_fr'])
+
+    def testCachedFormClasses(self):
+        form_class = multilingual_modelform_factory(Bar, ['fr'], fields=['name'])
+        self.assertTrue(multilingual_modelform_factory(Bar, ('fr',), fields=('name',)) is form_class)
+        self.assertFalse(multilingual_modelform_factory(Bar, ['en'], fields=['name']) is form_class)
+        self.assertFalse(multilingual_modelform_factory(Bar, ['fr']) is form_class)
+
+    def testInvalidLanguage(self):
+        self.assertRaises(MultilingualFieldError, multilingual_modelform_factory, Bar, ['xx'])
+
+    def testCreate(self):
+        form_class = multilingual_modelform_factory(Bar, ['en', 'fr'], fields=['name', 'price', 'quantity'])
+        form = form_class(data={'name': 'Bar', 'name_fr': 'French Bar', 'price': 1, 'quantity': 2})
+        self.assertTrue(form.is_valid())
+        instance = Bar.objects.get(pk=form.save().pk)
+        self.assertEqual(instance.name, 'Bar')
+        self.assertEqual(instance.name_fr, 'French Bar')
+
+    def testSaveOnlyUpdatesFormFields(self):
+        instance = Bar.objects.create(name='Bar', price=1, quantity=2, description='Description')
+        # Modified after the instance was loaded
+        Bar.objects.filter(pk=instance.pk).update(name='Other', description='Other description')
+
+        form_class = multilingual_modelform_factory(Bar, ['fr'], fields=['name', 'description'])
+        form = form_class(instance=instance, data={'name_fr': 'French Bar', 'description_fr': 'Description FR'})
+        self.assertTrue(form.is_valid())
+        with CaptureQueriesContext(connection) as queries:
+            form.save()
+        for query in queries.captured_queries:
+            self.assertFalse('"name" =' in query['sql'])
+
+        instance = Bar.objects.get(pk=instance.pk)
+        self.assertEqual(instance.name, 'Other')
+        self.assertEqual(instance.description, 'Other description')
+        self.assertEqual(instance.name_fr, 'French Bar')
+        self.assertEqual(instance.description_fr, 'Description FR')
+
+
+class TranslationFormSetTests(LinguoTests):
+
+    def setUp(self):
+        super(TranslationFormSetTests, self).setUp()
+        self.foos = []
+        for index in range(3):
+            foo = Foo.objects.create(name='Foo %s' % index, price=index)
+            foo.translate(language='fr', name='French Foo %s' % index)
+            foo.save()
+            self.foos.append(foo)
+
+    def getData(self, formset, **changes):
+        data = {
+            'form-TOTAL_FORMS': len(formset.forms),
+            'form-INITIAL_FORMS': len(formset.forms),
+            'form-MAX_NUM_FORMS': 1000,
+        }
+        for index, form in enumerate(formset.forms):
+            for name in form.fields:
+                value = form[name].value()
+                data['form-%s-%s' % (index, name)] = value if value is not None else ''
+        data.update(changes)
+        return data
+
+    def testFields(self):
+        formset_class = translation_formset_factory(Bar, 'fr')
+        self.assertEqual(list(formset_class.form.base_fields.keys()), ['name_fr', 'description_fr'])
+
+        formset_class = translation_formset_factory(Art, 'fr')
+        self.assertEqual(list(formset_class.form.base_fields.keys()), ['title_fr'])
+
+    def testLoadsOnlyFormFields(self):
+        formset_class = translation_formset_factory(Foo, 'fr', fields=['name'])
+        formset = formset_class()
+        self.assertEqual(len(formset.forms), 3)
+        self.assertEqual(formset.forms[0].initial['name_fr'], 'French Foo 0')
+        sql = str(formset.get_queryset().query).split('FROM')[0]
+        self.assertTrue('name_fr' in sql)
+        self.assertFalse('"price"' in sql)
+
+    def testSave(self):
+        formset_class = translation_formset_factory(Foo, 'fr', fields=['name'])
+        data = self.getData(formset_class(), **{'form-0-name_fr': 'Changed 0', 'form-2-name_fr': 'Changed 2'})
+        # Modified after the formset was loaded
+        Foo.objects.filter(pk=self.foos[0].pk).update(name='Other', price=10)
+
+        formset = formset_class(data=data)
+        self.assertTrue(formset.is_valid())
+        with self.assertNumQueries(1):
+            saved = formset.save()
+        self.assertEqual(sorted(obj.pk for obj in saved), [self.foos[0].pk, self.foos[2].pk])
+
+        foos = list(Foo.objects.order_by('pk'))
+        self.assertEqual([foo.name_fr for foo in foos], ['Changed 0', 'French Foo 1', 'Changed 2'])
+        self.assertEqual((foos[0].name, foos[0].price), ('Other', 10))
+
+    def testSaveInheritedFields(self):
+        bars = [Bar.objects.create(name='Bar %s' % i, price=10 + i, quantity=1, description='D') for i in range(2)]
+        formset_class = translation_formset_factory(Bar, 'fr')
+        data = self.getData(formset_class(), **{
+            'form-0-name_fr': 'Bar FR', 'form-0-description_fr': 'D FR',
+            'form-1-name_fr': 'Bar FR 1', 'form-1-description_fr': 'D FR 1',
+        })
+        formset = formset_class(data=data)
+        self.assertTrue(formset.is_valid())
+        with self.assertNumQueries(3):  # One UPDATE per table (and the primary keys for the parent table)
+            formset.save()
+
+        bars = list(Bar.objects.order_by('pk'))
+        self.assertEqual([(bar.name_fr, bar.description_fr) for bar in bars], [('Bar FR', 'D FR'), ('Bar FR 1', 'D FR 1')])
+        self.assertEqual([bar.name for bar in bars], ['Bar 0', 'Bar 1'])
+
+    def testUniqueChecksInBulk(self):
+        other = Foo.objects.create(name='Other', price=5)
+        other.translate(language='fr', name='Taken')
+        other.save()
+        queryset = Foo.objects.exclude(pk=other.pk)
+
+        formset_class = translation_formset_factory(Foo, 'fr', fields=['name', 'price'])
+        data = self.getData(formset_class(queryset=queryset), **{'form-1-name_fr': 'Taken', 'form-1-price': 5})
+
+        formset = formset_class(data=data, queryset=queryset)
+        formset.forms  # Loads the objects
+        with self.assertNumQueries(1):
+            self.assertFalse(formset.is_valid())
+        self.assertEqual([bool(form.errors) for form in formset.forms], [False, True, False])
+        self.assertTrue('already exists' in str(formset.forms[1].errors))
+
+        # The values of the object itself do not conflict
+        data['form-1-name_fr'] = 'French Foo 1'
+        data['form-1-price'] = 1
+        self.assertTrue(formset_class(data=data, queryset=queryset).is_valid())
+
+    def testTimestamps(self):
+        pag = Pag.objects.create(title='Title', body='Body')
+        formset_class = translation_formset_factory(Pag, 'fr')
+        data = self.getData(formset_class(), **{'form-0-title_fr': 'Titre'})
+        formset = formset_class(data=data)
+        self.assertTrue(formset.is_valid())
+        formset.save()
+
+        pag = Pag.objects.get(pk=pag.pk)
+        self.assertEqual(pag.title_fr, 'Titre')
+        self.assertTrue(pag.translated_at_fr is not None)
+
+
+class UniqueValidationTests(LinguoTests):
+
+    def setUp(self):
+        super(UniqueValidationTests, self).setUp()
+        self.foo = Foo.objects.create(name='Car', price=1)
+        self.foo.translate(language='fr', name='Voiture')
+        self.foo.save()
+
+    def testLanguagesCheckedInOneQuery(self):
+        foo = Foo(name='Bike', price=1)
+        foo.translate(language='fr', name='Velo')
+        with self.assertNumQueries(1):
+            foo.validate_unique()
+        with self.assertNumQueries(1):
+            self.foo.validate_unique()
+
+    def testViolatedConstraint(self):
+        foo = Foo(name='Bike', price=1)
+        foo.translate(language='fr', name='Voiture')
+        try:
+            foo.validate_unique()
+        except ValidationError as e:
+            self.assertEqual(list(e.message_dict.keys()), [NON_FIELD_ERRORS])
+            self.assertEqual(len(e.message_dict[NON_FIELD_ERRORS]), 1)
+            self.assertTrue('already exists' in e.message_dict[NON_FIELD_ERRORS][0])
+        else:
+            self.fail('ValidationError not raised')
+
+    def testPrimaryLanguageCheckedInOtherLanguage(self):
+        translation.activate('fr')
+        foo = Foo(price=1)
+        foo.translate(language='en', name='Car')
+        foo.translate(language='fr', name='Other')
+        self.assertRaises(ValidationError, foo.validate_unique)
+
+    def testBulk(self):
+        foos = [Foo(name='Foo %s' % index, price=1) for index in range(3)]
+        foos[1].translate(language='fr', name='Voiture')
+        foos.append(self.foo)  # Does not conflict with itself
+
+        with self.assertNumQueries(2):  # One per language
+            results = validate_unique_in_bulk(foos)
+        self.assertEqual(len(results), 1)
+        self.assertTrue(results[0][0] is foos[1])
+        self.assertEqual(list(results[0][1].keys()), [NON_FIELD_ERRORS])
+
+        self.assertEqual(validate_unique_in_bulk(foos, exclude=['price']), [])
+        with self.assertNumQueries(4):
+            self.assertEqual(len(validate_unique_in_bulk(foos, batch_size=2)), 1)
+
+
+class MultilingualAdminTests(LinguoTests):
+
+    def setUp(self):
+        super(MultilingualAdminTests, self).setUp()
+        self.user = User.objects.create_user(username='test', password='test', email='test@test.com')
+        self.user.is_staff = True
+        self.user.is_superuser = True
+        self.user.save()
+        self.client.login(username='test', password='test')
+
+        self.car = Foo.objects.create(name='Car', price=1)
+        self.car.translate(language='fr', name='Voiture')
+        self.car.save()
+        self.bike = Foo.objects.create(name='Bike', price=2)
+        self.bike.translate(language='fr', name='Velo')
+        self.bike.save()
+
+    def testChangelistDefersOtherLanguages(self):
+        response = self.client.get(reverse('admin:tests_foo_changelist'))
+        self.assertContains(response, 'Car')
+        self.assertNotContains(response, 'Voiture')
+        self.assertEqual(response.context['cl'].result_list.query.deferred_loading, (set(['name_fr']), True))
+
+        translation.activate('fr')
+        response = self.client.get(reverse('admin:tests_foo_changelist'))
+        self.assertContains(response, 'Voiture')
+        self.assertEqual(response.context['cl'].result_list.query.deferred_loading, (set(), True))
+
+    def testSearchInAllLanguages(self):
+        url = reverse('admin:tests_foo_changelist')
+        self.assertEqual(list(self.client.get(url, {'q': 'voit'}).context['cl'].result_list), [self.car])
+        self.assertEqual(list(self.client.get(url, {'q': 'bike'}).context['cl'].result_list), [self.bike])
+
+        translation.activate('fr')
+        self.assertEqual(list(self.client.get(url, {'q': 'bike'}).context['cl'].result_list), [self.bike])
+
+    def testSearchWithoutSearchFields(self):
+        class NoSearchFooAdmin(MultilingualModelAdmin):
+            search_languages = ('en', 'fr',)
+
+        model_admin = NoSearchFooAdmin(Foo, admin.site)
+        queryset, use_distinct = model_admin.get_search_results(None, Foo.objects.order_by('pk'), 'car')
+        self.assertEqual(list(queryset), [self.car, self.bike])
+        self.assertFalse(use_distinct)
+
+    def testChangeFormTabs(self):
+        url = reverse('admin:tests_foo_change', args=[self.car.pk])
+        response = self.client.get(url)
+        self.assertEqual(list(response.context['adminform'].form.fields.keys()), ['price', 'name', 'name_fr', 'categories'])
+        self.assertContains(response, '?_language=fr')
+
+        response = self.client.get(url, {'_language': 'fr'})
+        self.assertEqual(list(response.context['adminform'].form.fields.keys()), ['price', 'name_fr', 'categories'])
+        self.assertEqual(response.context['adminform'].form.initial['name_fr'], 'Voiture')
+
+    def testChangeFormTabSubmission(self):
+        url = reverse('admin:tests_foo_change', args=[self.car.pk])
+        # Modified after the form was displayed
+        Foo.objects.filter(pk=self.car.pk).update(name='Automobile')
+
+        response = self.client.post('%s?_language=fr' % url, data={'name_fr': 'Auto', 'price': 3})
+        self.assertEqual(response.status_code, 302)
+        car = Foo.objects.get(pk=self.car.pk)
+        self.assertEqual((car.name, car.name_fr, car.price), ('Automobile', 'Auto', 3))
+
+
+class TranslationOperationTests(LinguoTests):
+
+    def setUp(self):
+        super(TranslationOperationTests, self).setUp()
+        self.pags = []
+        for index in range(3):
+            pag = Pag.objects.create(title='Title %s' % index, body='Body %s' % index, position=index)
+            pag.translate(language='fr', title='Titre %s' % index)
+            pag.save()
+            self.pags.append(pag)
+
+    def testCopyTranslations(self):
+        with self.assertNumQueries(1):
+            count = Pag.objects.filter(position__lt=2).copy_translations('en', 'fr')
+        self.assertEqual(count, 2)
+        pags = list(Pag.objects.order_by('position'))
+        self.assertEqual([(pag.title_fr, pag.body_fr) for pag in pags],
+            [('Title 0', 'Body 0'), ('Title 1', 'Body 1'), ('Titre 2', '')])
+        self.assertTrue(pags[0].translated_at_fr > self.pags[0].translated_at_fr)
+
+        Pag.objects.copy_translations('fr', 'en', fields=['title'])
+        self.assertEqual(Pag.objects.get(position=2).title_en, 'Titre 2')
+
+        self.assertRaises(MultilingualFieldError, Art.objects.copy_translations, 'en', 'fr', fields=['body'])
+        self.assertRaises(MultilingualFieldError, Pag.objects.copy_translations, 'en', 'xx')
+
+    def testClearTranslations(self):
+        translation.activate('fr')
+        with self.assertNumQueries(1):
+            self.assertEqual(Pag.objects.filter(position=0).clear_translations('fr'), 1)
+        pag = Pag.objects.get(position=0)
+        self.assertEqual((pag.title_fr, pag.title_en, pag.translated_at_fr), ('', 'Title 0', None))
+        self.assertEqual(Pag.objects.get(position=1).title_fr, 'Titre 1')
+
+        self.assertRaises(MultilingualFieldError, Pag.objects.clear_translations, 'en')
+
+        art = Art.objects.create(title='Title', body='Body')
+        art.translate(language='fr', title='Titre', body='Corps')
+        art.save()
+        translation_model = Art._meta.translation_models['body']
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(Art.objects.clear_translations('fr'), 1)
+        # The UPDATE of the columns, and the DELETE of the translations (with a subquery)
+        queries = [query['sql'] for query in context.captured_queries if 'SAVEPOINT' not in query['sql']]
+        self.assertEqual(len(queries), 2)
+        self.assertFalse(translation_model.objects.filter(language='fr').exists())
+        translation.activate('fr')
+        art = Art.objects.get(pk=art.pk)
+        self.assertEqual((art.title, art.body), ('', ''))
+
+        self.assertEqual(Art.objects.clear_translations('fr', fields=['body']), 1)
+
+    def testMarkStale(self):
+        self.assertEqual(Pag.objects.stale_translations('fr').count(), 0)
+        with self.assertNumQueries(1):
+            Pag.objects.filter(position=1).mark_stale('fr')
+        self.assertEqual(list(Pag.objects.stale_translations('fr')), [self.pags[1]])
+        # Still told apart from the missing translations
+        missing = Pag.objects.create(title='Only English', position=3)
+        self.assertEqual(Pag.objects.mark_stale('fr'), 3)
+        self.assertEqual(list(Pag.objects.stale_translations('fr', missing=False).order_by('position')), self.pags)
+        self.assertEqual(list(Pag.objects.missing_translation('fr', fields=['title'])), [missing])
+        self.assertTrue(Pag.objects.get(pk=self.pags[1].pk).translated_at_fr is not None)
+
+        self.assertRaises(MultilingualFieldError, Foo.objects.mark_stale, 'fr')
+        self.assertRaises(MultilingualFieldError, Pag.objects.mark_stale, 'en')
+
+
+class TableTranslationUpdateTests(LinguoTests):
+
+    def testUpdate(self):
+        arts = [Art.objects.create(title='Title %d' % index, body='Body') for index in range(3)]
+        translation_model = Art._meta.translation_models['body']
+        translation.activate('fr')
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(Art.objects.filter(pk__in=[arts[0].pk, arts[1].pk]).update(body='Corps'), 2)
+        # The objects of the queryset are not ordered (by the ordering of the model)
+        self.assertFalse([query for query in context.captured_queries if 'ORDER BY' in query['sql']])
+        self.assertEqual(
+            sorted(translation_model.objects.filter(language='fr').values_list('object', 'value')),
+            [(arts[0].pk, 'Corps'), (arts[1].pk, 'Corps')]
+        )
+
+        # The default value deletes the translations
+        self.assertEqual(Art.objects.filter(pk=arts[0].pk).update(body=''), 1)
+        self.assertEqual(list(translation_model.objects.values_list('object', flat=True)), [arts[1].pk])
+
+    def testFailedSaveKeepsTheTranslations(self):
+        art = Art.objects.create(title='Title', body='Body')
+        art.translate(language='fr', body='Corps')
+        art.save()
+        translation_model = Art._meta.translation_models['body']
+
+        art.translate(language='fr', body='Nouveau corps')
+        original = models.query.QuerySet.bulk_create
+
+        def bulk_create(*args, **kwargs):
+            raise IntegrityError('Failed')
+        models.query.QuerySet.bulk_create = bulk_create
+        try:
+            self.assertRaises(IntegrityError, art.save)
+        finally:
+            models.query.QuerySet.bulk_create = original
+        self.assertEqual(translation_model.objects.get(language='fr').value, 'Corps')
+
+
+class TranslationAdminActionTests(LinguoTests):
+
+    def setUp(self):
+        super(TranslationAdminActionTests, self).setUp()
+        self.user = User.objects.create_user(username='test', password='test', email='test@test.com')
+        self.user.is_staff = True
+        self.user.is_superuser = True
+        self.user.save()
+        self.client.login(username='test', password='test')
+
+        self.pags = []
+        for index in range(3):
+            pag = Pag.objects.create(title='Title %s' % index, body='Body', position=index)
+            pag.translate(language='fr', title='Titre %s' % index)
+            pag.save()
+            self.pags.append(pag)
+        self.url = reverse('admin:tests_pag_changelist')
+
+    def getData(self, action, **data):
+        data.update({'action': action, '_selected_action': [pag.pk for pag in self.pags[:2]]})
+        return data
+
+    def testActions(self):
+        response = self.client.get(self.url)
+        self.assertContains(response, 'copy_translations')
+        self.assertContains(response, 'mark_translations_stale')
+        Foo.objects.create(name='Foo', price=1)
+        response = self.client.get(reverse('admin:tests_foo_changelist'))
+        self.assertContains(response, 'clear_translations')
+        self.assertNotContains(response, 'mark_translations_stale')
+
+    @override_settings(LANGUAGES=(('en', 'English'),))
+    def testActionsWithoutOtherLanguages(self):
+        request = RequestFactory().get(self.url)
+        request.user = self.user
+        actions = admin.site._registry[Pag].get_actions(request)
+        self.assertFalse('clear_translations' in actions)
+        self.assertFalse('mark_translations_stale' in actions)
+
+        # An action that is posted anyway only displays its empty form
+        request = RequestFactory().post(self.url, self.getData('clear_translations'))
+        request.user = self.user
+        response = admin.site._registry[Pag].clear_translations(request, Pag.objects.all())
+        self.assertEqual(response.context_data['count'], None)
+        self.assertEqual(response.context_data['form'].fields['language'].choices, [])
+
+    def testConfirmationCount(self):
+        data = self.getData('clear_translations', index=0)
+        response = self.client.post(self.url, data)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['count'], 2)
+
+        data = self.getData('copy_translations', source='en', language='fr')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, data)
+        self.assertEqual(response.context['count'], 2)
+        # The changelist counts all the objects, the action counts the changed ones
+        counts = [query for query in queries.captured_queries if 'COUNT' in query['sql'] and 'title_fr' in query['sql']]
+        self.assertEqual(len(counts), 1)
+        self.assertEqual(Pag.objects.get(pk=self.pags[0].pk).title_fr, 'Titre 0')  # Not performed yet
+
+        data = self.getData('copy_translations', source='fr', language='fr')
+        response = self.client.post(self.url, data)
+        self.assertEqual(response.context['count'], None)
+        self.assertTrue(response.context['form'].errors)
+
+    def testPerformAction(self):
+        data = self.getData('copy_translations', source='en', language='fr', post='yes')
+        response = self.client.post(self.url, data)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual([pag.title_fr for pag in Pag.objects.order_by('position')], ['Title 0', 'Title 1', 'Titre 2'])
+
+        data = self.getData('mark_translations_stale', language='fr', post='yes')
+        self.client.post(self.url, data)
+        self.assertEqual(Pag.objects.stale_translations('fr').count(), 2)
+
+
+class StatsTests(LinguoTests):
+
+    def setUp(self):
+        super(StatsTests, self).setUp()
+        stats.reset()
+        stats.enable()
+
+    def tearDown(self):
+        stats.disable()
+        stats.reset()
+        super(StatsTests, self).tearDown()
+
+    def testDisabledByDefault(self):
+        stats.disable()
+        Foo.objects.create(name='Car', price=1)
+        list(Foo.objects.filter(name='Car'))
+        self.assertEqual(stats.snapshot(), {'counters': {}, 'timings': {}})
+
+    def testRewriteLookupKey(self):
+        list(Foo.objects.filter(name='Car'))
+        list(FooRel.objects.filter(myfoo__name='Car'))
+        snapshot = stats.snapshot()
+        # The nested lookup of the relation is counted once
+        self.assertEqual(snapshot['counters']['rewrite_lookup_key'], 2)
+        self.assertTrue(snapshot['timings']['rewrite_lookup_key'] >= 0)
+        self.assertTrue(snapshot['counters']['translatable_relations.hit'] >= 1)
+
+    def testDescriptors(self):
+        foo = Foo(price=1)
+        stats.reset()  # Initializing sets the fields in the primary language
+        foo.name = 'Car'
+        translation.activate('fr')
+        foo.name = 'Voiture'
+        foo.name
+        foo.name
+        counters = stats.snapshot()['counters']
+        self.assertEqual(counters['descriptor.set.en'], 1)
+        self.assertEqual(counters['descriptor.set.fr'], 1)
+        self.assertEqual(counters['descriptor.get.fr'], 2)
+        self.assertNotIn('descriptor.get.en', counters)
+
+    def testFallbackCache(self):
+        obj = Tip.objects.create(title='Hello', body='Body')
+        translation.activate('fr')
+        stats.reset()
+        obj.title
+        obj.title
+        counters = stats.snapshot()['counters']
+        self.assertEqual(counters['descriptor.fallback.miss'], 1)
+        self.assertEqual(counters['descriptor.fallback.hit'], 1)
+
+    def testInitAndSave(self):
+        foo = Foo.objects.create(name='Car', price=1)
+        list(Foo.objects.all())
+        foo.save()
+        counters = stats.snapshot()['counters']
+        self.assertEqual(counters['model.init.slow'], 1)
+        self.assertEqual(counters['model.init.fast'], 1)
+        self.assertEqual(counters['model.save.forced'], 2)
+
+    def testQuerysetsAndReset(self):
+        Foo.objects.all()
+        self.assertEqual(stats.snapshot()['counters']['queryset.init'], 1)
+        snapshot = stats.snapshot()
+        stats.reset()
+        self.assertEqual(stats.snapshot(), {'counters': {}, 'timings': {}})
+        # The snapshots are copies
+        self.assertEqual(snapshot['counters']['queryset.init'], 1)
+
+    def testSetting(self):
+        stats.disable()
+        with override_settings(LINGUO_STATS=True):
+            self.assertTrue(stats.enabled)
+        self.assertFalse(stats.enabled)
+
+
+@override_settings(
+    DEBUG=True,
+    MIDDLEWARE_CLASSES=settings.MIDDLEWARE_CLASSES + ('linguo.middleware.LinguoProfileMiddleware',),
+)
+class ProfileMiddlewareTests(LinguoTests):
+
+    def setUp(self):
+        super(ProfileMiddlewareTests, self).setUp()
+        for name, french in (('Car', 'Voiture'), ('Boat', 'Bateau')):
+            foo = Foo.objects.create(name=name, price=1)
+            foo.translate(language='fr', name=french)
+            foo.save()
+
+    def tearDown(self):
+        stats.disable()
+        stats.reset()
+        super(ProfileMiddlewareTests, self).tearDown()
+
+    def testReport(self):
+        response = self.client.get('/foos/')
+        self.assertEqual(response.content.decode('utf-8').split(), ['Car', 'Boat'])
+        self.assertEqual(
+            response['X-Linguo-Profile'], 'lookups=1; languages=en; objects=2; overfetched=1'
+        )
+
+    def testPrimaryLanguageIsNotOverfetched(self):
+        translation.activate('fr')
+        response = self.client.get('/foos/')
+        self.assertEqual(response.content.decode('utf-8').split(), ['Voiture', 'Bateau'])
+        self.assertEqual(
+            response['X-Linguo-Profile'], 'lookups=1; languages=fr; objects=2; overfetched=0'
+        )
+
+    def testDeferredTranslations(self):
+        response = self.client.get('/foos/deferred/')
+        self.assertEqual(
+            response['X-Linguo-Profile'], 'lookups=1; languages=en; objects=2; overfetched=0'
+        )
+
+    def testRecorder(self):
+        stats.enable()
+        with stats.record() as recorder:
+            [foo.name for foo in Foo.objects.all()]
+            [foo.name for foo in Foo.objects.defer_translations('en')]
+        self.assertEqual(recorder.get_models(), {
+            'tests.Foo': {'objects': 4, 'fetched': set(['en', 'fr']), 'used': set(['en'])},
+        })
+        self.assertEqual(len(recorder.get_overfetched_queries()), 1)
+        self.assertEqual(recorder.get_report().splitlines()[1], 'tests.Foo: 4 objects, fetched en,fr, used en')
+        self.assertFalse(stats.is_recording())
+
+    @override_settings(DEBUG=False)
+    def testNotUsedWithoutDebug(self):
+        response = self.client.get('/foos/')
+        self.assertNotIn('X-Linguo-Profile', response)
+
+
+class FetchTrackingTests(LinguoTests):
+
+    def setUp(self):
+        super(FetchTrackingTests, self).setUp()
+        for name, french in (('Car', 'Voiture'), ('Boat', 'Bateau')):
+            foo = Foo.objects.create(name=name, price=1)
+            foo.translate(language='fr', name=french)
+            foo.save()
+        stats.reset()
+        stats.enable_tracking()
+
+    def tearDown(self):
+        stats.disable()
+        stats.reset()
+        super(FetchTrackingTests, self).tearDown()
+
+    def testSites(self):
+        for i in range(2):
+            [foo.name for foo in Foo.objects.all()]
+        [foo.price for foo in Foo.objects.defer_translations('en')]
+
+        sites = stats.get_fetch_sites()
+        self.assertEqual(len(sites), 2)
+        self.assertEqual(sites[0].location[0].rstrip('c'), __file__.rstrip('c'))
+        self.assertEqual(sites[0].location[2], 'testSites')
+        self.assertEqual((sites[0].queries, sites[0].objects), (2, 4))
+        self.assertEqual((sites[0].fetched, sites[0].used), (set(['en', 'fr']), set(['en'])))
+        self.assertEqual(sites[0].get_unused_languages(), set(['fr']))
+        self.assertEqual(sites[0].get_suggestion(), ".defer_translations('en')")
+        # Only the primary language is loaded
+        self.assertEqual(sites[1].fetched, set(['en']))
+        self.assertEqual(sites[1].get_suggestion(), None)
+
+    def testSiteOfTemplate(self):
+        foos = Foo.objects.order_by('pk')
+        template = Template('{% for foo in foos %}{{ foo.name }}{% endfor %}')
+        self.assertEqual(template.render(Context({'foos': foos})), 'CarBoat')
+
+        # The site is where the queryset was created, not in the template engine
+        site, = stats.get_fetch_sites()
+        self.assertEqual(site.location[0].rstrip('c'), __file__.rstrip('c'))
+        self.assertEqual(site.location[2], 'testSiteOfTemplate')
+        self.assertEqual(site.get_suggestion(), ".defer_translations('en')")
+
+        # Evaluated by a paginator
+        stats.reset()
+        page = Paginator(Foo.objects.order_by('pk'), 1).page(2)
+        self.assertEqual([foo.name for foo in page], ['Boat'])
+        site, = stats.get_fetch_sites()
+        self.assertEqual(site.location[2], 'testSiteOfTemplate')
+
+    def testOnlySuggestion(self):
+        Pag.objects.create(title='Hello', body='Body')
+        translation.activate('fr')
+        [obj.title for obj in Pag.objects.all()]
+        site, = stats.get_fetch_sites()
+        self.assertEqual(site.read_fields, set([('title', 'fr')]))
+        self.assertEqual(site.get_unused_translations(), set([('body', 'fr')]))
+        self.assertEqual(
+            site.get_suggestion(), ".only('id', 'position', 'translated_at', 'translated_at_fr', 'translation_stale_fr', 'title_fr')"
+        )
+
+        stats.reset()
+        [obj.title for obj in Pag.objects.only('id', 'position', 'translated_at', 'translated_at_fr', 'translation_stale_fr', 'title_fr')]
+        site, = stats.get_fetch_sites()
+        self.assertEqual(site.get_suggestion(), None)
+
+    def testNotTrackedWhenDisabled(self):
+        stats.disable()
+        foo = Foo.objects.all()[0]
+        foo.name
+        self.assertEqual(stats.get_fetch_sites(), [])
+        self.assertNotIn('_recorded_query', foo.__dict__)
+
+    def testSetting(self):
+        stats.disable()
+        with override_settings(LINGUO_TRACK_FETCHES=True):
+            self.assertTrue(stats.enabled)
+            self.assertTrue(stats.tracking)
+        self.assertFalse(stats.enabled)
+        self.assertFalse(stats.tracking)
+
+
+class SystemCheckTests(LinguoTests):
+
+    def get_warnings(self, modelclass):
+        return [
+            (error.id, error.msg) for error in check_multilingual_models([apps.get_app_config('tests')])
+            if error.obj is modelclass
+        ]
+
+    def testOrderingIndex(self):
+        self.assertEqual(self.get_warnings(FooCategory), [
+            ('linguo.W001', 'The model is ordered by the translatable field "name", but "name", "name_fr" are not indexed.'),
+        ])
+
+        class Idx(MultilingualModel):
+            name = models.CharField(max_length=255, db_index=True)
+            note = models.CharField(max_length=255)
+
+            class Meta:
+                app_label = 'tests'
+                apps = Apps()
+                ordering = ('-name', 'note')
+                translate = ('name', 'note')
+                index_together = (('note', 'name'), ('note_fr', 'name_fr'))
+        self.assertEqual(check_ordering_indexes(Idx), [])
+
+    def testManagers(self):
+        self.assertEqual(self.get_warnings(Moo), [
+            ('linguo.W004', 'The manager "objects" is not a MultilingualManager.'),
+        ])
+        self.assertEqual(self.get_warnings(Foo), [])
+
+    @override_settings(LINGUO_MAX_TEXT_LANGUAGES=1)
+    def testTextLanguages(self):
+        self.assertEqual(self.get_warnings(Pag), [
+            ('linguo.W002', 'The TextField "body" is translated into 2 languages, which are all loaded with the objects.'),
+        ])
+        # The translations in a table are not loaded with the objects
+        self.assertEqual(self.get_warnings(Art), [])
+
+    @override_settings(LINGUO_MAX_UNIQUE_CONSTRAINTS=1)
+    def testUniqueTogether(self):
+        self.assertEqual(self.get_warnings(Foo), [
+            ('linguo.W003', 'The model has 2 unique_together constraints once they are rewritten for each language.'),
+        ])
+
+
+class TestingHelperTests(LinguoTests):
+
+    def setUp(self):
+        super(TestingHelperTests, self).setUp()
+        foo = Foo.objects.create(name='Car', price=1)
+        foo.translate(language='fr', name='Voiture')
+        foo.save()
+
+    def testNumTranslationColumns(self):
+        with self.assertNumTranslationColumns(2):
+            list(Foo.objects.all())
+        with self.assertNumTranslationColumns(1, model=Foo):
+            list(Foo.objects.defer_translations('en'))
+        with self.assertNumTranslationColumns(0):
+            list(Foo.objects.values_list('price', flat=True))
+
+        with self.assertRaises(AssertionError):
+            with self.assertNumTranslationColumns(1):
+                list(Foo.objects.all())
+
+    def testSelectedLanguages(self):
+        translation.activate('fr')
+        with self.assertSelectedLanguages(['fr'], model=Foo):
+            list(Foo.objects.all())
+        with self.assertSelectedLanguages([]):
+            list(Foo.objects.defer_translations('en'))
+
+        with self.assertRaises(AssertionError):
+            with self.assertSelectedLanguages([]):
+                list(Foo.objects.all())
+
+    def testMaxQueries(self):
+        with self.assertMaxQueries(1):
+            list(Foo.objects.all())
+        with self.assertRaises(AssertionError):
+            with self.assertMaxQueries(1):
+                list(Foo.objects.all())
+                list(Foo.objects.all())
+
+    def testForEachLanguage(self):
+        languages = []
+
+        @for_each_language
+        def test(self):
+            languages.append(get_current_language())
+            with self.assertSelectedLanguages([get_current_language()]), self.assertMaxQueries(1):
+                list(Foo.objects.defer_translations())
+        test(self)
+        self.assertEqual(languages, ['en', 'fr'])
+        self.assertEqual(get_current_language(), 'en')
+
+        @for_each_language
+        def test_failure(self):
+            self.assertEqual(Foo.objects.get().name, 'Car')
+        try:
+            test_failure(self)
+        except AssertionError as e:
+            self.assertIn('(in the language "fr")', str(e))
+        else:
+            self.fail('The test did not fail in French')
+
+
+class ModelCreationBenchmark(LinguoTests):
+    """
+    Checks the work done to create a translatable model class (ie. the import time of a
+    models module). Apart from copying the fields, linguo's work is done once per field and
+    once per language: the calls to linguo's functions must not grow with the number of
+    language copies. The calls are counted rather than timed, so that the result is deterministic.
+    """
+    NUM_FIELDS = 100
+    NUM_LANGUAGES = 30
+
+    def get_languages(self, count):
+        return [('en', 'English')] + [('l%d' % i, 'Language %d' % i) for i in range(count - 1)]
+
+    def create_translatable_model(self, name):
+        attrs = {'__module__': __name__}
+        for i in range(self.NUM_FIELDS):
+            attrs['field%d' % i] = models.CharField(max_length=255, verbose_name=_('field %d' % i))
+        fields = tuple(key for key in attrs if key.startswith('field'))
+
+        class Meta:
+            app_label = 'tests'
+            apps = Apps()
+            translate = fields
+        attrs['Meta'] = Meta
+        return MultilingualModelBase(name, (MultilingualModel,), attrs)
+
+    def create_plain_model(self, name, languages):
+        attrs = {'__module__': __name__}
+        for i in range(self.NUM_FIELDS):
+            attrs['field%d' % i] = models.CharField(max_length=255, verbose_name=_('field %d' % i))
+            for code, lang_name in languages[1:]:
+                attrs['field%d_%s' % (i, code)] = models.CharField(max_length=255,
+                    verbose_name=_(u'field %d (%s)' % (i, lang_name))
+                )
+
+        class Meta:
+            app_label = 'tests'
+            apps = Apps()
+        attrs['Meta'] = Meta
+        return models.base.ModelBase(name, (models.Model,), attrs)
+
+    def count_linguo_calls(self, name, num_languages):
+        # The calls to the functions of linguo (not its tests) while the model is created
+        package = os.path.dirname(os.path.abspath(sys.modules[MultilingualModel.__module__].__file__))
+        tests = os.path.dirname(os.path.abspath(__file__))
+        calls = [0]
+
+        def profile(frame, event, arg):
+            if event == 'call':
+                filename = os.path.abspath(frame.f_code.co_filename)
+                if filename.startswith(package) and not filename.startswith(tests):
+                    calls[0] += 1
+
+        with override_settings(LANGUAGES=self.get_languages(num_languages)):
+            self.create_translatable_model('%sWarmUp' % name)  # The language tables are computed once
+            previous = sys.getprofile()
+            sys.setprofile(profile)
+            try:
+                self.create_translatable_model(name)
+            finally:
+                sys.setprofile(previous)
+        return calls[0]
+
+    def testModelCreationWork(self):
+        few = self.count_linguo_calls('FewLanguages', 2)
+        many = self.count_linguo_calls('ManyLanguages', self.NUM_LANGUAGES)
+        # A few calls for each additional language, none for each of the additional copies
+        self.assertTrue(many - few <= 5 * (self.NUM_LANGUAGES - 2),
+            'Creating the model made %d calls with %d languages (%d calls with 2 languages)' % (
+                many, self.NUM_LANGUAGES, few
+            )
+        )
+
+    def testModelCreationFields(self):
+        languages = self.get_languages(self.NUM_LANGUAGES)
+        with override_settings(LANGUAGES=languages):
+            model = self.create_translatable_model('Benchmark')
+            plain = self.create_plain_model('PlainBenchmark', languages)
+
+        self.assertEqual(len(model._meta.fields), 1 + self.NUM_FIELDS * self.NUM_LANGUAGES)
+        self.assertEqual(
+            [(f.name, f.verbose_name) for f in model._meta.fields],
+            [(f.name, f.verbose_name) for f in plain._meta.fields]
+        )
+
+
 class TestsForUnupportedFeatures(object):  # LinguoTests):
 
     def testTransFieldHasNotNullConstraint(self):
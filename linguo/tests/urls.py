@@ -7,4 +7,6 @@ admin.autodiscover()
 
 urlpatterns = patterns('',
     url(r'^admin/', include(admin.site.urls)),
+    url(r'^foos/$', 'linguo.tests.views.foo_list'),
+    url(r'^foos/deferred/$', 'linguo.tests.views.foo_list_deferred'),
 )
@@ -0,0 +1,12 @@
+from django.http import HttpResponse
+
+from linguo.tests.models import Foo
+
+
+def foo_list(request):
+    return HttpResponse('\n'.join([foo.name for foo in Foo.objects.filter(price__gt=0)]))
+
+
+def foo_list_deferred(request):
+    foos = Foo.objects.filter(price__gt=0).defer_translations()
+    return HttpResponse('\n'.join([foo.name for foo in foos]))
@@ -1,5 +1,25 @@
+import functools
+
 from django.conf import settings
+from django.db.models import Field
+from django.dispatch import receiver
 from django.utils import translation
+from django.utils.encoding import force_text
+
+try:
+    from django.core.signals import setting_changed
+except ImportError:  # Django < 1.8
+    from django.test.signals import setting_changed
+
+
+# Cache of the values computed from settings.LANGUAGES (see get_language_table, get_language_suffixes and get_language_chains)
+_language_cache = {}
+
+
+@receiver(setting_changed)
+def clear_language_cache(**kwargs):
+    if kwargs['setting'] == 'LANGUAGES':
+        _language_cache.clear()
 
 
 def get_real_field_name(field_name, language):
@@ -11,14 +31,45 @@ def get_real_field_name(field_name, language):
     if lang_code == get_normalized_language(settings.LANGUAGES[0][0]):
         return field_name
     else:
-        return '%s_%s' % (field_name, language)
+        return '%s_%s' % (field_name, get_language_suffix(lang_code))
+
+
+def get_language_suffix(language):
+    """
+    Returns the suffix of the fields in the given (normalized) language.
+    For example, 'pt-br' becomes 'pt_br'.
+    """
+    return language.replace('-', '_')
+
+
+def get_field_language(model, field_name, language):
+    """
+    Returns the language in which the translatable field `field_name` of `model`
+    is stored for the given language. This is the language itself, unless the
+    field is not translated into it, in which case it is the first language of its
+    fallback chain that the field is translated into (see get_language_chains).
+    """
+    lang_code = get_normalized_language(language)
+    resolution = model._meta.translation_resolution[field_name]
+    if lang_code in resolution:
+        return resolution[lang_code]
+    else:
+        return get_normalized_language(settings.LANGUAGES[0][0])
 
 
 def get_normalized_language(language_code):
     """
-    Returns the actual language extracted from the given language code
-    (ie. locale stripped off). For example, 'en-us' becomes 'en'.
+    Returns the actual language of the given language code. This is the code itself
+    if it is one of settings.LANGUAGES (so regional variants such as 'pt-br' can have
+    their own fields), otherwise the locale is stripped off. For example, 'en-us'
+    becomes 'en' (unless 'en-us' is in settings.LANGUAGES).
     """
+    chains = get_language_chains()
+    if language_code in chains:
+        return language_code
+    language_code = language_code.lower()
+    if language_code in chains:
+        return language_code
     return language_code.split('-')[0]
 
 
@@ -28,3 +79,146 @@ def get_current_language():
     language code.
     """
     return get_normalized_language(translation.get_language())
+
+
+def propagate_language(func):
+    """
+    Returns a wrapper of `func` that runs it in the language that is active when
+    the wrapper is created (rather than the language of the thread that runs it).
+
+    The active language is local to each thread, so code submitted to a thread pool
+    (eg. with concurrent.futures) would otherwise filter and read the translatable
+    fields in the default language. The language of the worker thread is restored
+    once `func` returns.
+    """
+    language = translation.get_language()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with translation.override(language):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def get_language_table():
+    """
+    Returns a tuple of (language code, normalized language code, language name)
+    for each language in settings.LANGUAGES (the primary language first).
+
+    It is only computed once (per LANGUAGES setting), so that creating the fields
+    of each translatable model does not evaluate the (lazy) names of the languages
+    over and over again.
+    """
+    if 'table' not in _language_cache:
+        _language_cache['table'] = tuple([
+            (code, code.lower(), force_text(name)) for code, name in settings.LANGUAGES
+        ])
+    return _language_cache['table']
+
+
+def get_language_suffixes():
+    """
+    Returns a dict of the normalized code of each language in settings.LANGUAGES
+    to the suffix of its fields (see get_language_suffix).
+
+    It is only computed once (per LANGUAGES setting), so that naming the fields of each
+    translatable model is a dict lookup per language.
+    """
+    if 'suffixes' not in _language_cache:
+        _language_cache['suffixes'] = dict([
+            (normalized_code, get_language_suffix(normalized_code))
+            for code, normalized_code, name in get_language_table()
+        ])
+    return _language_cache['suffixes']
+
+
+def get_language_chains():
+    """
+    Returns the fallback chain of each language in settings.LANGUAGES, as a dict of
+    normalized language code to a tuple of language codes: the language itself, its
+    base language (if it is in settings.LANGUAGES) and the primary language.
+    For example, 'pt-br' falls back to 'pt' and then 'en'.
+
+    It is only computed once (per LANGUAGES setting), resolving a chain is a dict lookup.
+    """
+    if 'chains' not in _language_cache:
+        languages = [code.lower() for code, name in settings.LANGUAGES]
+        chains = dict([(code, None) for code in languages])
+        for code in languages:
+            chain = [code]
+            base = code.split('-')[0]
+            if base != code and base in chains:
+                chain.append(base)
+            if languages[0] not in chain:
+                chain.append(languages[0])
+            chains[code] = tuple(chain)
+        _language_cache['chains'] = chains
+    return _language_cache['chains']
+
+
+def get_language_resolution(languages):
+    """
+    Returns a dict of the (normalized) code of each language in settings.LANGUAGES
+    to the language in which a field translated into `languages` is stored for it
+    (the first language of its fallback chain that is in `languages`).
+
+    It is only computed once per set of languages (and LANGUAGES setting), the fields
+    of a model are usually all translated into the same languages. The dict is shared,
+    it must not be modified.
+    """
+    languages = frozenset(languages)
+    resolutions = _language_cache.setdefault('resolutions', {})
+    if languages not in resolutions:
+        resolution = {}
+        for code, chain in get_language_chains().items():
+            for lang in chain:
+                if lang in languages:
+                    resolution[code] = lang
+                    break
+        resolutions[languages] = resolution
+    return resolutions[languages]
+
+
+def get_language_fallbacks(languages):
+    """
+    Returns a dict of each language in `languages` to the languages of its fallback chain
+    that are in `languages` (whose value is used when its translation is empty).
+
+    Like get_language_resolution, it is only computed once per set of languages and
+    the dict is shared.
+    """
+    languages = frozenset(languages)
+    all_fallbacks = _language_cache.setdefault('fallbacks', {})
+    if languages not in all_fallbacks:
+        chains = get_language_chains()
+        all_fallbacks[languages] = dict([
+            (lang, tuple([code for code in chains.get(lang, (lang,)) if code in languages])) for lang in languages
+        ])
+    return all_fallbacks[languages]
+
+
+def clear_fallback_values(instance):
+    """
+    Clears the values that the translatable fields of the instance resolved
+    to with their fallback chains (see `translate_fallback`).
+    """
+    instance.__dict__.pop('_fallback_values', None)
+
+
+def renumber_creation_counters(groups):
+    """
+    Gives new creation counters to the fields of `groups`, a list of lists of fields where
+    each list is a field followed by its copies (which have the creation_counter of the field).
+
+    The groups are numbered in the order of the creation_counter of their field, so the copies
+    are ordered right after the original field and before the next field. Only the groups are
+    sorted, not every copy. The counters are integers taken from Field.creation_counter (like
+    the ones of new fields): the ordering is exact for any number of copies, and gives the same
+    ordering in every process.
+    """
+    # The index breaks the ties, so that the fields themselves are never compared
+    numbering = sorted([(group[0].creation_counter, index, group) for index, group in enumerate(groups)])
+    for creation_counter, index, group in numbering:
+        for field in group:
+            field.creation_counter = Field.creation_counter
+            Field.creation_counter += 1
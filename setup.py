@@ -6,7 +6,7 @@ import linguo
 setup(
     name='django-linguo',
     packages=['linguo', 'linguo.tests'],
-    package_data={'linguo': ['tests/locale/*/LC_MESSAGES/*']},
+    package_data={'linguo': ['templates/linguo/admin/*.html', 'tests/locale/*/LC_MESSAGES/*']},
     version=linguo.__version__,
     description=linguo.__doc__,
     long_description=open('README.rst').read(),